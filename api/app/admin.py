@@ -0,0 +1,226 @@
+"""The Flask-Admin portal at /admin, registered by app/__init__.py (see init_admin) when ADMIN_ENABLED is set."""
+
+from flask import flash, redirect, request, url_for
+from flask_admin import Admin, AdminIndexView, expose
+from flask_admin.contrib.sqla import ModelView
+import flask_login as login
+from sqlalchemy import false, func, text
+from sqlalchemy.orm import joinedload, load_only
+from wtforms import form, fields, validators
+
+from app import app, db, LOGGER
+from app.applicationModel.models import Question, Section
+from app.email_template.models import EmailTemplate
+from app.events.models import Event, EventRole
+from app.invitationletter.models import InvitationTemplate, InvitationLetterRequest
+from app.registration.models import Offer, RegistrationForm, RegistrationSection, RegistrationQuestion, Registration, RegistrationAnswer
+from app.responses.models import Response, Answer, ResponseReviewer
+from app.reviews.models import ReviewForm, ReviewQuestion
+from app.users.models import UserCategory, AppUser, UserComment
+from app.users.passwords import check_password
+
+# set optional bootswatch theme
+app.config['FLASK_ADMIN_SWATCH'] = 'darkly'
+
+# Define login and registration forms (for flask-login)
+class LoginForm(form.Form):
+    email = fields.TextField(validators=[validators.required()])
+    password = fields.PasswordField(validators=[validators.required()])
+
+    def validate(self):
+        user = self.get_user()
+
+        if user is None:
+            raise validators.ValidationError('Invalid user')
+
+
+        if not check_password(user.password, self.password.data):
+            raise validators.ValidationError('Invalid password')
+
+        if not user.is_admin:
+            raise validators.ValidationError("Adminstrator rights required")
+
+        LOGGER.debug("Successful authentication for email: %s", self.email.data)
+        return True
+
+    def get_user(self):
+        # TODO: What organisation should we use to query here?
+        return db.session.query(AppUser).filter(AppUser.email==self.email.data).first()
+
+# Initialize flask-login
+def init_login():
+    login_manager = login.LoginManager()
+    login_manager.init_app(app)
+
+    # Create user loader function
+    @login_manager.user_loader
+    def load_user(user_id):
+        return db.session.query(AppUser).get(user_id)
+
+
+
+# Create customized index view class that handles login & registration
+class BaobabAdminIndexView(AdminIndexView):
+
+    @expose('/')
+    def index(self):
+        if not login.current_user.is_authenticated:
+            return redirect(url_for('.login_view'))
+        return super(BaobabAdminIndexView, self).index()
+
+    @expose('/login/', methods=('GET', 'POST'))
+    def login_view(self):
+        try:
+
+            # handle user login
+            form = LoginForm(request.form)
+            if request.method == 'POST': 
+                if form.validate():
+                    user = form.get_user()
+                    login.login_user(user)
+
+                if login.current_user.is_authenticated:
+                    return redirect(url_for('.index'))
+        except validators.ValidationError as error:
+            flash(str(error))
+
+        self._template_args['form'] = form
+        return super(BaobabAdminIndexView, self).index()
+
+
+    @expose('/logout/')
+    def logout_view(self):
+        login.logout_user()
+        return redirect(url_for('.index'))
+
+class BaobabModelView(ModelView):
+    def is_accessible(self):
+        return login.current_user.is_authenticated and login.current_user.is_admin
+
+    def inaccessible_callback(self, name, **kwargs):
+        # redirect to login page if user doesn't have access
+        return redirect(url_for('admin.login_view', next=request.url))
+
+
+def estimated_row_count(session, model):
+    """The number of rows in the model's table. On PostgreSQL this is the planner's estimate from pg_class,
+    since counting every row of a large table scans all of it."""
+    if session.get_bind().dialect.name == 'postgresql':
+        estimate = session.execute(text('SELECT reltuples FROM pg_class WHERE oid = CAST(:table AS regclass)'),
+                                   {'table': model.__table__.name}).scalar()
+        # A table that hasn't been analyzed yet has no estimate
+        if estimate > 0:
+            return int(estimate)
+    return session.query(func.count('*')).select_from(model).scalar()
+
+
+class LargeTableModelView(BaobabModelView):
+    """A list view for tables too large to count or page through row by row.
+
+    Subclasses list the columns to load in column_list, the relationships shown in it in
+    column_select_related_list, and filter on indexed columns in column_filters rather than searching text.
+    """
+
+    page_size = 50
+    can_set_page_size = False
+    # Filtered lists aren't counted, they show previous and next links instead of page numbers
+    simple_list_pager = True
+    column_display_pk = True
+    column_default_sort = ('id', True)
+    column_sortable_list = ('id',)
+
+    def get_query(self):
+        columns = [getattr(self.model, name) for name in self.column_list or ()
+                   if name in self.model.__table__.columns]
+        query = super(LargeTableModelView, self).get_query()
+        if app.config['ADMIN_STATEMENT_TIMEOUT_MS'] and self.session.get_bind().dialect.name == 'postgresql':
+            # Stop a slow admin query before it holds up the production workload
+            self.session.execute('SET LOCAL statement_timeout = %d' % app.config['ADMIN_STATEMENT_TIMEOUT_MS'])
+        return query.options(load_only(*columns)) if columns else query
+
+    def get_list(self, page, sort_column, sort_desc, search, filters, execute=True, page_size=None):
+        if search or filters or sort_column not in (None, 'id'):
+            return super(LargeTableModelView, self).get_list(
+                page, sort_column, sort_desc, search, filters, execute, page_size)
+
+        page_size = page_size or self.page_size
+        key = getattr(self.model, self._primary_key)
+        descending = sort_desc if sort_column else True
+        order = key.desc() if descending else key.asc()
+        query = self.get_query()
+        if page:
+            # Skip to the page's first key over the primary key index alone, then read only the page's rows,
+            # rather than reading and discarding every row on the pages before it
+            first_key = self.session.query(key).order_by(order).offset(page * page_size).limit(1).scalar()
+            if first_key is None:
+                query = query.filter(false())
+            else:
+                query = query.filter(key <= first_key if descending else key >= first_key)
+        for relationship in self._auto_joins:
+            query = query.options(joinedload(relationship))
+        query = query.order_by(order).limit(page_size)
+
+        return estimated_row_count(self.session, self.model), query.all() if execute else query
+
+
+class ResponseView(LargeTableModelView):
+    column_list = ('id', 'application_form_id', 'user.email', 'language', 'is_submitted',
+                   'submitted_timestamp', 'is_withdrawn', 'started_timestamp')
+    column_select_related_list = ('user',)
+    column_filters = ('application_form_id', 'user_id')
+
+
+class AnswerView(LargeTableModelView):
+    column_list = ('id', 'response_id', 'question_id', 'value')
+    column_filters = ('response_id', 'question_id')
+
+
+class AppUserView(LargeTableModelView):
+    column_list = ('id', 'email', 'firstname', 'lastname', 'organisation_id', 'is_admin', 'active',
+                   'verified_email', 'is_deleted')
+    # Equal to an email and organisation is looked up by org_email_unique
+    column_filters = ('email', 'organisation_id')
+
+
+class RegistrationAnswerView(LargeTableModelView):
+    column_list = ('id', 'registration_id', 'registration_question_id', 'value')
+    column_filters = ('registration_id', 'registration_question_id')
+
+
+class ResponseReviewerView(LargeTableModelView):
+    column_list = ('id', 'response_id', 'user.email', 'active')
+    column_select_related_list = ('user',)
+    column_filters = ('response_id', 'reviewer_user_id')
+
+
+def init_admin():
+    """Serve the admin portal at /admin."""
+    init_login()
+
+    admin = Admin(app, name='Deep Learning Indaba Admin Portal', index_view=BaobabAdminIndexView(), template_mode='bootstrap3')
+
+    admin.add_view(BaobabModelView(Question, db.session))
+    admin.add_view(BaobabModelView(Section, db.session))
+    admin.add_view(ResponseView(Response, db.session))
+    admin.add_view(AnswerView(Answer, db.session))
+
+    admin.add_view(BaobabModelView(Event, db.session))
+    admin.add_view(BaobabModelView(EventRole, db.session))
+    admin.add_view(BaobabModelView(UserCategory, db.session))
+    admin.add_view(AppUserView(AppUser, db.session))
+
+    admin.add_view(ResponseReviewerView(ResponseReviewer, db.session))
+    admin.add_view(BaobabModelView(UserComment, db.session))
+    admin.add_view(BaobabModelView(ReviewForm, db.session))
+    admin.add_view(BaobabModelView(ReviewQuestion, db.session))
+    admin.add_view(BaobabModelView(Offer, db.session))
+    admin.add_view(BaobabModelView(RegistrationForm, db.session))
+    admin.add_view(BaobabModelView(RegistrationSection, db.session))
+    admin.add_view(BaobabModelView(RegistrationQuestion, db.session))
+    admin.add_view(BaobabModelView(Registration, db.session))
+    admin.add_view(RegistrationAnswerView(RegistrationAnswer, db.session))
+
+    admin.add_view(BaobabModelView(InvitationTemplate, db.session))
+    admin.add_view(BaobabModelView(InvitationLetterRequest, db.session))
+    admin.add_view(BaobabModelView(EmailTemplate, db.session))
+    return admin
@@ -9,9 +9,10 @@ from app.applicationModel.mixins import ApplicationFormMixin
 from app.applicationModel.models import ApplicationForm, Question, Section
 from app.applicationModel.repository import ApplicationFormRepository as application_form_repository
 from app.utils.auth import auth_required
+from app.utils.sql_instrumentation import query_budget
 from app.utils.errors import EVENT_NOT_FOUND, QUESTION_NOT_FOUND, SECTION_NOT_FOUND, DB_NOT_AVAILABLE, FORM_NOT_FOUND, APPLICATIONS_CLOSED
 
-from app import db, bcrypt
+from app import db
 from app import LOGGER
 
 def get_form_fields(form, language):
@@ -60,6 +61,7 @@ def get_form_fields(form, language):
 
 class ApplicationFormAPI(ApplicationFormMixin, restful.Resource):
 
+    @query_budget(8)
     @auth_required
     def get(self):
         args = self.req_parser.parse_args()
@@ -1,4 +1,4 @@
-from app import db, bcrypt
+from app import db
 import app
 
 
@@ -33,7 +33,7 @@ class Question(db.Model):
 
     application_form = db.relationship('ApplicationForm', foreign_keys=[application_form_id])
     section = db.relationship('Section', foreign_keys=[section_id])
-    question_translations = db.relationship('QuestionTranslation', lazy='dynamic')
+    question_translations = db.relationship('QuestionTranslation')
 
     def __init__(self, application_form_id, section_id, order, questionType, is_required=True):
         self.application_form_id = application_form_id
@@ -43,8 +43,8 @@ class Question(db.Model):
         self.is_required = is_required
     
     def get_translation(self, language):
-        question_translation = self.question_translations.filter_by(language=language).first()
-        return question_translation
+        # Filtered in Python so that the translations can be eager loaded with the question
+        return next((t for t in self.question_translations if t.language == language), None)
 
 
 class Section(db.Model):
@@ -57,7 +57,7 @@ class Section(db.Model):
     key = db.Column(db.String(255), nullable=True)
 
     application_form = db.relationship('ApplicationForm', foreign_keys=[application_form_id])
-    section_translations = db.relationship('SectionTranslation', lazy='dynamic')
+    section_translations = db.relationship('SectionTranslation')
     questions = db.relationship('Question', primaryjoin=id==Question.section_id, order_by='Question.order')
 
     def __init__(self, application_form_id, order, depends_on_question_id=None, key=None):
@@ -67,8 +67,7 @@ class Section(db.Model):
         self.key = key
 
     def get_translation(self, language):
-        section_translation = self.section_translations.filter_by(language=language).first()
-        return section_translation
+        return next((t for t in self.section_translations if t.language == language), None)
 
 
 class SectionTranslation(db.Model):
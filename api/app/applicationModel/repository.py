@@ -1,7 +1,16 @@
+from sqlalchemy.orm import selectinload
+
 from app import db
-from app.applicationModel.models import ApplicationForm
+from app.applicationModel.models import ApplicationForm, Question, Section
 from app.events.models import Event
 
+# Loads a form's sections and questions with their translations in one query per table rather than per row
+_FORM_CONTENTS = (
+    selectinload(ApplicationForm.sections).selectinload(Section.section_translations),
+    selectinload(ApplicationForm.sections).selectinload(Section.questions)
+    .selectinload(Question.question_translations)
+)
+
 
 class ApplicationFormRepository():
 
@@ -9,8 +18,18 @@ class ApplicationFormRepository():
     def get_by_id(id):
         return db.session.query(ApplicationForm).get(id)
 
+    @staticmethod
+    def get_by_id_with_contents(id):
+        """The form with its sections, questions and their translations loaded."""
+        return db.session.query(ApplicationForm)\
+            .filter_by(id=id)\
+            .options(*_FORM_CONTENTS)\
+            .first()
+
     @staticmethod
     def get_by_event_id(event_id):
+        """The event's form with its sections, questions and their translations loaded."""
         return db.session.query(ApplicationForm)\
             .filter_by(event_id=event_id)\
+            .options(*_FORM_CONTENTS)\
             .first()
@@ -128,4 +128,13 @@ class ApplicationFormApiTest(ApiTestCase):
         self.assertEqual(data['sections'][0]['questions'][0]['placeholder'], 'Espace reserve Francais')
         self.assertEqual(data['sections'][0]['questions'][0]['validation_regex'], '^\\W*(\\w+(\\W+|$)){0,200}$')
         self.assertEqual(data['sections'][0]['questions'][0]['validation_text'], 'Entrez un maximum de 200 mots')
-        self.assertEqual(data['sections'][0]['questions'][0]['show_for_values'], ['oui'])
\ No newline at end of file
+        self.assertEqual(data['sections'][0]['questions'][0]['show_for_values'], ['oui'])
+
+    def test_query_count_independent_of_question_count(self):
+        form_id, event_id = self.form.id, self.event.id
+        header = self.get_auth_header_for(self.test_user.email)
+        self.assert_query_budget(
+            8,
+            lambda n: self.add_questions_in_sections(form_id, n),
+            lambda: self.app.get('/api/v1/application-form', headers=header,
+                                 query_string={'event_id': event_id, 'language': 'en'}))
@@ -1,23 +1,23 @@
 from flask import g
 import flask_restful as restful
-from flask_restful import reqparse, fields, marshal_with
+from flask_restful import reqparse, fields, marshal, marshal_with
+from sqlalchemy.exc import IntegrityError
 from app import db
-from app.attendance.mixins import AttendanceMixin
+from app.attendance.mixins import AttendanceMixin, AttendanceBatchMixin
 from app.attendance.models import Attendance
 from app.attendance.repository import AttendanceRepository as attendance_repository
 from app.events.repository import EventRepository as event_repository
+from app.roster.repository import RosterRepository as roster_repository
 from app.users.repository import UserRepository as user_repository
 from app.utils.auth import auth_required
 from app.utils.emailer import email_user
-from app.utils.errors import ATTENDANCE_ALREADY_CONFIRMED, ATTENDANCE_NOT_FOUND, EVENT_NOT_FOUND, FORBIDDEN, USER_NOT_FOUND, OFFER_NOT_FOUND, REGISTRATION_NOT_FOUND
-from app.registration.models import RegistrationQuestion
-from app.registration.models import Offer
-from app.invitedGuest.models import GuestRegistration
-from app.registration.models import RegistrationForm
-from app.registration.models import Registration
-from app.registration.models import get_registration_answer_based_headline
-from app.events.models import EventRole
-from app.invitedGuest.models import InvitedGuest
+from app.utils.errors import ATTENDANCE_ALREADY_CONFIRMED, ATTENDANCE_NOT_FOUND, EVENT_NOT_FOUND, FORBIDDEN, USER_NOT_FOUND
+
+# Keys of the registration questions whose answers are shown to the volunteer at check-in
+CHECK_IN_QUESTION_KEYS = {
+    'shirt_size': 'tshirt_size',
+    'bringing_poster': 'bringing_poster'
+}
 
 attendance_fields = {
     'id': fields.Integer,
@@ -48,6 +48,24 @@ class AttendanceUser():
         self.invitedguest_role = invitedguest_role
 
 
+def _check_in_details(check_in):
+    """Get the (accommodation_award, shirt_size, is_invitedguest, bringing_poster, invitedguest_role)
+    shown to the volunteer from a row returned by get_check_in_details."""
+    offer = check_in.Offer
+    invited_guest = check_in.InvitedGuest
+
+    accommodation_award = None
+    if offer:
+        accommodation_award = offer.accommodation_award and offer.accepted_accommodation_award
+
+    return (
+        accommodation_award,
+        check_in.shirt_size,
+        True if invited_guest else None,
+        check_in.bringing_poster == 'yes',
+        invited_guest.role if invited_guest else None)
+
+
 class AttendanceAPI(AttendanceMixin, restful.Resource):
 
     @auth_required
@@ -92,57 +110,34 @@ class AttendanceAPI(AttendanceMixin, restful.Resource):
         if event is None:
             return EVENT_NOT_FOUND
 
-        user = user_repository.get_by_id(user_id)
-        if user is None:
+        details = attendance_repository.get_check_in_details(event_id, [user_id], CHECK_IN_QUESTION_KEYS)
+        if user_id not in details:
             return USER_NOT_FOUND
 
-        if attendance_repository.exists(event_id, user_id):
+        check_in = details[user_id]
+        if check_in.Attendance is not None:
             return ATTENDANCE_ALREADY_CONFIRMED
 
+        # Read everything we need before the commit expires the loaded rows
+        check_in_details = _check_in_details(check_in)
+
         attendance = Attendance(event_id, user_id, registration_user_id)
-        attendance_repository.create(attendance)
+        try:
+            attendance_repository.create(attendance)
+        except IntegrityError:
+            # Checked in by another desk since the details were read
+            return ATTENDANCE_ALREADY_CONFIRMED
+        roster_repository.refresh(event_id, [user_id])
+        db.session.commit()
 
         email_user(
             'attendance-confirmation',
             event=event,
-            user=user
+            user=check_in.AppUser,
+            deferred=True
         )
 
-        # Other Fields
-        unavailable_response = None
-        invitedguest_role = unavailable_response
-        is_invited_guest = unavailable_response
-        has_accepted_accom_award = unavailable_response
-
-        offer = db.session.query(Offer).filter(
-            Offer.user_id == user_id).filter(Offer.event_id == event_id).first()
-        if offer:
-            has_accepted_accom_award = (
-                offer.accommodation_award and offer.accepted_accommodation_award)
-        
-        # Check if invited guest
-        invited_guest = db.session.query(InvitedGuest).filter(
-                    InvitedGuest.event_id == event_id).filter(InvitedGuest.user_id == user.id).first()
-        if(invited_guest):
-            is_invited_guest = True
-            invitedguest_role = invited_guest.role
-        
-
-        # Shirt Size
-        shirt_answer = (get_registration_answer_based_headline(
-            user_id, "T-Shirt Size") and get_registration_answer_based_headline(
-            user_id, "T-Shirt Size").value) or unavailable_response
-
-        # Poster registration
-        bringing_poster = False
-        poster_answer = get_registration_answer_based_headline(
-            user_id, "Will you be bringing a poster?")
-        if (poster_answer is not None and poster_answer.value == 'yes'):
-            bringing_poster = True
-
-        attendance_user = AttendanceUser(
-            attendance, has_accepted_accom_award, shirt_answer, is_invited_guest, bringing_poster, invitedguest_role)
-        return attendance_user, 201
+        return AttendanceUser(attendance, *check_in_details), 201
 
     @auth_required
     def delete(self):
@@ -168,5 +163,79 @@ class AttendanceAPI(AttendanceMixin, restful.Resource):
             return ATTENDANCE_NOT_FOUND
 
         attendance_repository.delete(attendance)
+        roster_repository.refresh(event_id, [user_id])
+        db.session.commit()
 
         return 200
+
+
+class AttendanceBatchAPI(AttendanceBatchMixin, restful.Resource):
+    """Check in several users at once, e.g. when an offline registration desk syncs its scans.
+    Users that are already checked in or don't exist are reported per user rather than failing the batch."""
+
+    @auth_required
+    def post(self):
+        args = self.req_parser.parse_args()
+        event_id = args['event_id']
+        user_ids = args['user_ids']
+        registration_user_id = g.current_user['id']
+
+        registration_user = user_repository.get_by_id(registration_user_id)
+        if not registration_user.is_registration_volunteer(event_id):
+            return FORBIDDEN
+
+        event = event_repository.get_by_id(event_id)
+        if event is None:
+            return EVENT_NOT_FOUND
+
+        details = attendance_repository.get_check_in_details(event_id, user_ids, CHECK_IN_QUESTION_KEYS)
+
+        results = []
+        checked_in = []
+        seen = set()
+        for user_id in user_ids:
+            check_in = details.get(user_id)
+            if check_in is None:
+                results.append({'user_id': user_id, 'status': 'user_not_found', 'attendance': None})
+            elif check_in.Attendance is not None or user_id in seen:
+                results.append({'user_id': user_id, 'status': 'already_confirmed', 'attendance': None})
+            else:
+                attendance = Attendance(event_id, user_id, registration_user_id)
+                checked_in.append((attendance, check_in, _check_in_details(check_in)))
+                results.append({'user_id': user_id, 'status': 'checked_in', 'attendance': None})
+            seen.add(user_id)
+
+        while True:
+            try:
+                attendance_repository.create_all([c[0] for c in checked_in])
+                break
+            except IntegrityError:
+                # Some of the users were checked in by another desk since the details were read,
+                # report them as already confirmed and check in the rest
+                confirmed = attendance_repository.get_checked_in_user_ids(
+                    event_id, [c[0].user_id for c in checked_in])
+                if not confirmed:
+                    raise
+                checked_in = [c for c in checked_in if c[0].user_id not in confirmed]
+                for result in results:
+                    if result['status'] == 'checked_in' and result['user_id'] in confirmed:
+                        result['status'] = 'already_confirmed'
+
+        roster_repository.refresh(event_id, [c[0].user_id for c in checked_in])
+        db.session.commit()
+
+        check_ins_by_user = {}
+        for attendance, check_in, check_in_details in checked_in:
+            email_user(
+                'attendance-confirmation',
+                event=event,
+                user=check_in.AppUser,
+                deferred=True
+            )
+            check_ins_by_user[attendance.user_id] = marshal(AttendanceUser(attendance, *check_in_details), attendance_fields)
+
+        for result in results:
+            if result['status'] == 'checked_in':
+                result['attendance'] = check_ins_by_user[result['user_id']]
+
+        return results, 200
@@ -1,6 +1,22 @@
 from flask_restful import reqparse
+import six
+
+MAX_BATCH_SIZE = 500
+
+
+def user_id_list(value):
+    if (not isinstance(value, list) or len(value) > MAX_BATCH_SIZE
+            or not all(isinstance(user_id, six.integer_types) and not isinstance(user_id, bool) for user_id in value)):
+        raise ValueError('user_ids must be a list of at most {} integer user ids'.format(MAX_BATCH_SIZE))
+    return value
+
 
 class AttendanceMixin(object):
     req_parser = reqparse.RequestParser()
     req_parser.add_argument('event_id', type=int, required=True)
-    req_parser.add_argument('user_id', type=int, required=True)
\ No newline at end of file
+    req_parser.add_argument('user_id', type=int, required=True)
+
+class AttendanceBatchMixin(object):
+    req_parser = reqparse.RequestParser()
+    req_parser.add_argument('event_id', type=int, required=True, location='json')
+    req_parser.add_argument('user_ids', type=user_id_list, required=True, location='json')
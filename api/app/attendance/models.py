@@ -3,6 +3,10 @@ from datetime import datetime
 from app import db
 
 class Attendance(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('event_id', 'user_id', name='uq_attendance_event_user'),
+    )
+
     id = db.Column(db.Integer(), primary_key=True)
     event_id = db.Column(db.Integer(), db.ForeignKey('event.id'), nullable=False)
     user_id = db.Column(db.Integer(), db.ForeignKey('app_user.id'), nullable=False)
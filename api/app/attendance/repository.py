@@ -1,5 +1,13 @@
+from sqlalchemy import and_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+
 from app import db
 from app.attendance.models import Attendance
+from app.invitedGuest.models import InvitedGuest
+from app.registration.models import Offer, Registration, RegistrationAnswer, RegistrationQuestion
+from app.users.models import AppUser
+
 
 class AttendanceRepository():
 
@@ -15,12 +23,57 @@ class AttendanceRepository():
                          .filter_by(event_id=event_id, user_id=user_id)\
                          .first()
 
+    @staticmethod
+    def get_check_in_details(event_id, user_ids, question_keys):
+        """Get everything needed to check users in to an event in a single query.
+        Returns a dict of user_id to a row with AppUser, Offer, InvitedGuest and Attendance
+        entities, plus one column per entry in question_keys (a dict of label to question key)
+        holding the user's registration answer to that question on the event's registration form."""
+        query = db.session.query(AppUser, Offer, InvitedGuest, Attendance)\
+                          .outerjoin(Offer, and_(Offer.user_id == AppUser.id, Offer.event_id == event_id))\
+                          .outerjoin(InvitedGuest, and_(InvitedGuest.user_id == AppUser.id, InvitedGuest.event_id == event_id))\
+                          .outerjoin(Attendance, and_(Attendance.user_id == AppUser.id, Attendance.event_id == event_id))\
+                          .outerjoin(Registration, Registration.offer_id == Offer.id)
+
+        for label, key in question_keys.items():
+            question = aliased(RegistrationQuestion)
+            answer = aliased(RegistrationAnswer)
+            query = query.outerjoin(question, and_(
+                                question.registration_form_id == Registration.registration_form_id,
+                                question.key == key))\
+                         .outerjoin(answer, and_(
+                                answer.registration_id == Registration.id,
+                                answer.registration_question_id == question.id))\
+                         .add_columns(answer.value.label(label))
+
+        rows = query.filter(AppUser.id.in_(user_ids)).order_by(AppUser.id).all()
+
+        details = {}
+        for row in rows:
+            details.setdefault(row.AppUser.id, row)
+        return details
+
+    @staticmethod
+    def get_checked_in_user_ids(event_id, user_ids):
+        return set(user_id for user_id, in db.session.query(Attendance.user_id)
+                   .filter(Attendance.event_id == event_id, Attendance.user_id.in_(user_ids)))
+
     @staticmethod
     def create(attendance):
-        db.session.add(attendance)
-        db.session.commit()
+        AttendanceRepository.create_all([attendance])
+
+    @staticmethod
+    def create_all(attendances):
+        """Add the attendances in one commit. If one of the users has been checked in since they were read,
+        the session is rolled back and IntegrityError is raised."""
+        db.session.add_all(attendances)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            raise
 
     @staticmethod
     def delete(attendance):
         db.session.delete(attendance)
-        db.session.commit()
\ No newline at end of file
+        db.session.commit()
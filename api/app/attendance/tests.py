@@ -2,6 +2,7 @@ from datetime import datetime
 import json
 
 from app import db
+from app.attendance.mixins import MAX_BATCH_SIZE
 from app.attendance.models import Attendance
 from app.attendance.repository import AttendanceRepository as attendance_repository
 from app.events.models import Event, EventRole
@@ -18,6 +19,7 @@ from app.invitedGuest.models import InvitedGuest
 from datetime import datetime, timedelta
 from app.registrationResponse.repository import RegistrationRepository
 from app import LOGGER
+from mock import patch
 import json
 from app.organisation.models import Organisation
 from app.events.models import EventType
@@ -85,7 +87,8 @@ class AttendanceApiTest(ApiTestCase):
             placeholder="the placeholder",
             headline="Will you be bringing a poster?",
             validation_regex="[]/",
-            validation_text=" text"
+            validation_text=" text",
+            key="bringing_poster"
         )
         db.session.add(rq)
         db.session.commit()
@@ -317,3 +320,111 @@ class AttendanceApiTest(ApiTestCase):
         attendance = attendance_repository.get(1, 1)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(attendance, None)
+
+    def test_post_attendance_only_uses_answers_for_event(self):
+        """Check that answers to a question with the same headline on another event's form are ignored."""
+        self.seed_static_data()
+        other_event = self.add_event({'en': 'indaba 2020'}, {'en': 'The Deep Learning Indaba 2020'},
+                                     datetime(2020, 8, 25), datetime(2020, 8, 31), 'INDABA2020')
+        other_form = RegistrationForm(event_id=other_event.id)
+        db.session.add(other_form)
+        db.session.commit()
+        other_section = RegistrationSection(other_form.id, 'Section', 'desc', 1, None, None, None)
+        db.session.add(other_section)
+        db.session.commit()
+        shirt_question = RegistrationQuestion(registration_form_id=other_form.id, section_id=other_section.id,
+                                              headline='T-Shirt Size', placeholder='', order=1, type='multi-choice',
+                                              validation_regex=None, description='T-Shirt Size',
+                                              key='tshirt_size')
+        db.session.add(shirt_question)
+        db.session.commit()
+        other_offer = Offer(user_id=self.attendee.id, event_id=other_event.id, offer_date=datetime.now(),
+                            expiry_date=datetime.now() + timedelta(days=15), payment_required=False,
+                            accommodation_award=False, travel_award=False)
+        db.session.add(other_offer)
+        db.session.commit()
+        other_registration = Registration(offer_id=other_offer.id, registration_form_id=other_form.id, confirmed=True)
+        db.session.add(other_registration)
+        db.session.commit()
+        db.session.add(RegistrationAnswer(registration_id=other_registration.id,
+                                          registration_question_id=shirt_question.id, value='XL'))
+        db.session.commit()
+
+        header = self.get_auth_header_for('ra@ra.com')
+        response = self.app.post('/api/v1/attendance', headers=header, data={'user_id': 1, 'event_id': 1})
+
+        data = json.loads(response.data)
+        self.assertEqual(response.status_code, 201)
+        self.assertIsNone(data['shirt_size'])
+        self.assertEqual(data['bringing_poster'], True)
+
+    def test_batch_attendance(self):
+        """Check that a batch of check-ins reports a result per user."""
+        self.seed_static_data()
+        attendee_id = self.attendee.id
+        attendee2_id = self.add_user('attendee2@mail.com').id
+        header = self.get_auth_header_for('ra@ra.com')
+        body = {'event_id': 1, 'user_ids': [attendee_id, attendee2_id, attendee_id, 123]}
+
+        response = self.app.post('/api/v1/attendance/batch', headers=header,
+                                 data=json.dumps(body), content_type='application/json')
+
+        data = json.loads(response.data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['status'] for r in data],
+                         ['checked_in', 'checked_in', 'already_confirmed', 'user_not_found'])
+        self.assertEqual(data[0]['attendance']['bringing_poster'], True)
+        self.assertEqual(data[0]['attendance']['accommodation_award'], True)
+        self.assertEqual(data[1]['attendance']['bringing_poster'], False)
+        self.assertIsNotNone(attendance_repository.get(1, attendee_id))
+        self.assertIsNotNone(attendance_repository.get(1, attendee2_id))
+
+        response = self.app.post('/api/v1/attendance/batch', headers=header,
+                                 data=json.dumps(body), content_type='application/json')
+        data = json.loads(response.data)
+        self.assertEqual([r['status'] for r in data],
+                         ['already_confirmed', 'already_confirmed', 'already_confirmed', 'user_not_found'])
+
+    def test_batch_attendance_rejects_invalid_user_ids(self):
+        self.seed_static_data()
+        header = self.get_auth_header_for('ra@ra.com')
+
+        for user_ids in (['5'], [1, 'x'], [1.5], list(range(MAX_BATCH_SIZE + 1))):
+            response = self.app.post('/api/v1/attendance/batch', headers=header,
+                                     data=json.dumps({'event_id': 1, 'user_ids': user_ids}),
+                                     content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+
+    def test_batch_attendance_reports_concurrent_check_in(self):
+        """Check that a user checked in by another desk while the batch is processed is reported, not an error."""
+        self.seed_static_data()
+        attendee_id = self.attendee.id
+        attendee2_id = self.add_user('attendee2@mail.com').id
+        header = self.get_auth_header_for('ra@ra.com')
+        get_check_in_details = attendance_repository.get_check_in_details
+
+        def check_in_elsewhere(event_id, user_ids, question_keys):
+            details = get_check_in_details(event_id, user_ids, question_keys)
+            db.session.add(Attendance(event_id, attendee_id, attendee2_id))
+            db.session.commit()
+            return details
+
+        with patch.object(attendance_repository, 'get_check_in_details', side_effect=check_in_elsewhere):
+            response = self.app.post('/api/v1/attendance/batch', headers=header,
+                                     data=json.dumps({'event_id': 1, 'user_ids': [attendee_id, attendee2_id]}),
+                                     content_type='application/json')
+
+        data = json.loads(response.data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['status'] for r in data], ['already_confirmed', 'checked_in'])
+        self.assertEqual(db.session.query(Attendance).filter_by(event_id=1).count(), 2)
+
+    def test_non_volunteer_cannot_batch_attendance(self):
+        self.seed_static_data()
+        header = self.get_auth_header_for('attendee@mail.com')
+        body = {'event_id': 1, 'user_ids': [1]}
+
+        response = self.app.post('/api/v1/attendance/batch', headers=header,
+                                 data=json.dumps(body), content_type='application/json')
+
+        self.assertEqual(response.status_code, FORBIDDEN[1])
@@ -1,84 +1,56 @@
-from datetime import datetime
-
+from flask import Response, request
 import flask_restful as restful
-from flask_restful import reqparse, fields, marshal_with
+from werkzeug.http import quote_etag
 
-from app.users.models import Country, UserCategory
-from app import db
+from app import app
+from app.content.reference_data import ReferenceData
 
 
-country_fields = {
-    'value': fields.Integer(attribute='id'),
-    'label': fields.String(attribute='name')
-}
+def _reference_response(reference_list):
+    """Serve a ReferenceList with its version as a strong ETag, or a 304 if the client has that version."""
+    headers = {
+        'ETag': quote_etag(reference_list.version),
+        'Cache-Control': 'public, max-age={}'.format(app.config['CONTENT_CACHE_MAX_AGE'])
+    }
+    if request.if_none_match.contains_weak(reference_list.version):
+        return Response(status=304, headers=headers)
+    return reference_list.items, 200, headers
 
-category_fields = {
-    'value': fields.Integer(attribute='id'),
-    'label': fields.String(attribute='name')
-}
 
+class ReferenceDataAPI(restful.Resource):
+    """Serves the reference list called name (see ReferenceData)."""
+    name = None
 
-class CountryContentAPI(restful.Resource):
-    @marshal_with(country_fields)
     def get(self):
-        countries = db.session.query(Country).order_by(Country.id).all()
-        return countries
+        return _reference_response(ReferenceData.load(self.name))
 
 
-class CategoryContentAPI(restful.Resource):
-    @marshal_with(category_fields)
-    def get(self):
-        countries = db.session.query(
-            UserCategory).order_by(UserCategory.id).all()
-        return countries
+class CountryContentAPI(ReferenceDataAPI):
+    name = 'countries'
 
 
-class EthnicityContentAPI(restful.Resource):
+class CategoryContentAPI(ReferenceDataAPI):
+    name = 'categories'
 
-    def get(self):
-        return [
-            {"label": "Black", "value": 'black'},
-            {"label": "Coloured / Mixed Descent", "value": 'coloured/mixed'},
-            {"label": "White", "value": 'white'},
-            {"label": "Indian Descent", "value": 'indian'},
-            {"label": "Other", "value": "other"}
-        ]
 
+class EthnicityContentAPI(ReferenceDataAPI):
+    name = 'ethnicity'
+
+
+class TitleContentAPI(ReferenceDataAPI):
+    name = 'title'
+
+
+class GenderContentAPI(ReferenceDataAPI):
+    name = 'gender'
+
+
+class DisabilityContentAPI(ReferenceDataAPI):
+    name = 'disability'
 
-class TitleContentAPI(restful.Resource):
-    def get(self):
-        return [
-            {"value": "Mr", "label": "Mr"},
-            {"value": "Mrs", "label": "Mrs"},
-            {"value": "Ms", "label": "Ms"},
-            {"value": "Hon", "label": "Hon"},
-            {"value": "Prof", "label": "Prof"},
-            {"value": "Dr", "label": "Dr"},
-            {"value": "Mx", "label": "Mx"}
-        ]
-
-
-class GenderContentAPI(restful.Resource):
-    def get(self):
-        return [
-            {"value": "male", "label": "Male"},
-            {"value": "female", "label": "Female"},
-            {"value": "other", "label": "Other"},
-            {"value": "prefer_not_to_say", "label": "Prefer not to say"}
-        ]
 
+class ContentBundleAPI(restful.Resource):
+    """Serves every reference list in one response, keyed by the name each is served under."""
 
-class DisabilityContentAPI(restful.Resource):
     def get(self):
-        return[
-            {"label": "No disabilities", "value": "none"},
-            {"label": "Sight disability", "value": "sight"},
-            {"label": "Hearing disability", "value": "hearing"},
-            {"label": "Communication disability", "value": "communication"},
-            {"label": "Physical disability(e.g. difficulty in walking)",
-             "value": "physical"},
-            {"label": "Mental disability(e.g. difficulty in remembering or concentrating)",
-             "value": "mental"},
-            {"label": "Difficulty in self-care", "value": "self-care"},
-            {"label": "Other", "value": "other"},
-        ]
+        return _reference_response(ReferenceData.load_bundle())
@@ -0,0 +1,107 @@
+import hashlib
+import json
+from collections import OrderedDict
+
+from flask_restful import fields, marshal
+
+from app import db
+from app.users.models import Country, UserCategory
+from app.utils.cache import ModelCache
+
+country_fields = {
+    'value': fields.Integer(attribute='id'),
+    'label': fields.String(attribute='name')
+}
+
+category_fields = {
+    'value': fields.Integer(attribute='id'),
+    'label': fields.String(attribute='name')
+}
+
+ETHNICITIES = [
+    {"label": "Black", "value": 'black'},
+    {"label": "Coloured / Mixed Descent", "value": 'coloured/mixed'},
+    {"label": "White", "value": 'white'},
+    {"label": "Indian Descent", "value": 'indian'},
+    {"label": "Other", "value": "other"}
+]
+
+TITLES = [
+    {"value": "Mr", "label": "Mr"},
+    {"value": "Mrs", "label": "Mrs"},
+    {"value": "Ms", "label": "Ms"},
+    {"value": "Hon", "label": "Hon"},
+    {"value": "Prof", "label": "Prof"},
+    {"value": "Dr", "label": "Dr"},
+    {"value": "Mx", "label": "Mx"}
+]
+
+GENDERS = [
+    {"value": "male", "label": "Male"},
+    {"value": "female", "label": "Female"},
+    {"value": "other", "label": "Other"},
+    {"value": "prefer_not_to_say", "label": "Prefer not to say"}
+]
+
+DISABILITIES = [
+    {"label": "No disabilities", "value": "none"},
+    {"label": "Sight disability", "value": "sight"},
+    {"label": "Hearing disability", "value": "hearing"},
+    {"label": "Communication disability", "value": "communication"},
+    {"label": "Physical disability(e.g. difficulty in walking)",
+     "value": "physical"},
+    {"label": "Mental disability(e.g. difficulty in remembering or concentrating)",
+     "value": "mental"},
+    {"label": "Difficulty in self-care", "value": "self-care"},
+    {"label": "Other", "value": "other"},
+]
+
+
+def _countries():
+    return marshal(db.session.query(Country).order_by(Country.id).all(), country_fields)
+
+
+def _categories():
+    return marshal(db.session.query(UserCategory).order_by(UserCategory.id).all(), category_fields)
+
+
+# The reference lists by the name they are served under, with the function that reads each one
+_LOADERS = OrderedDict([
+    ('countries', _countries),
+    ('categories', _categories),
+    ('ethnicity', lambda: ETHNICITIES),
+    ('title', lambda: TITLES),
+    ('disability', lambda: DISABILITIES),
+    ('gender', lambda: GENDERS),
+])
+
+# Lists are grouped by name
+_reference_lists = ModelCache('reference_data')
+_reference_lists.depends_on(Country, lambda country: 'countries')
+_reference_lists.depends_on(UserCategory, lambda category: 'categories')
+
+
+class ReferenceList():
+    """A reference list's items with its version, a hash of the items, so every worker gives
+    the same list the same version."""
+    def __init__(self, items, version=None):
+        self.items = items
+        self.version = version or hashlib.sha1(json.dumps(items, sort_keys=True)).hexdigest()
+
+
+class ReferenceData():
+    """Caches the reference lists that the signup and profile pages offer as options, since they
+    rarely change. A list is dropped when its table is changed."""
+
+    @classmethod
+    def load(cls, name):
+        """Get the named ReferenceList."""
+        return _reference_lists.load(name, name, lambda: (ReferenceList(_LOADERS[name]()), None))
+
+    @classmethod
+    def load_bundle(cls):
+        """Get every reference list as one ReferenceList, whose items map each name to its list."""
+        reference_lists = [(name, cls.load(name)) for name in _LOADERS]
+        version = hashlib.sha1(':'.join(reference_list.version for _, reference_list in reference_lists)).hexdigest()
+        return ReferenceList(OrderedDict((name, reference_list.items) for name, reference_list in reference_lists),
+                             version)
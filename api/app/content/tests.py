@@ -0,0 +1,53 @@
+import json
+
+from app import db
+from app.content.reference_data import TITLES
+from app.users.models import Country
+from app.utils.testing import ApiTestCase, count_queries
+
+
+class ContentApiTest(ApiTestCase):
+
+    def test_countries(self):
+        response = self.app.get('/api/v1/content/countries')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data), [{'value': self.country.id, 'label': 'South Africa'}])
+        self.assertTrue(response.headers['ETag'])
+        self.assertIn('max-age', response.headers['Cache-Control'])
+
+    def test_not_modified_if_client_has_version(self):
+        etag = self.app.get('/api/v1/content/title').headers['ETag']
+
+        response = self.app.get('/api/v1/content/title', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(response.headers['ETag'], etag)
+
+        response = self.app.get('/api/v1/content/title', headers={'If-None-Match': '"older"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data), TITLES)
+
+    def test_lists_cached_until_changed(self):
+        first = self.app.get('/api/v1/content/countries')
+        with count_queries() as queries:
+            self.app.get('/api/v1/content/countries')
+        self.assertEqual(queries.count, 0)
+
+        db.session.add(Country('Kenya'))
+        db.session.commit()
+
+        response = self.app.get('/api/v1/content/countries')
+        self.assertEqual([c['label'] for c in json.loads(response.data)], ['South Africa', 'Kenya'])
+        self.assertNotEqual(response.headers['ETag'], first.headers['ETag'])
+
+    def test_bundle(self):
+        response = self.app.get('/api/v1/content/bundle')
+        self.assertEqual(response.status_code, 200)
+        bundle = json.loads(response.data)
+        self.assertEqual(sorted(bundle.keys()),
+                         ['categories', 'countries', 'disability', 'ethnicity', 'gender', 'title'])
+        for name, items in bundle.items():
+            self.assertEqual(items, json.loads(self.app.get('/api/v1/content/' + name).data))
+
+        response = self.app.get('/api/v1/content/bundle', headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
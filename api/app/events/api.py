@@ -18,7 +18,7 @@ from app.registration.repository import OfferRepository as offer_repository
 from app.registration.repository import RegistrationRepository as registration_repository
 from app.guestRegistrations.repository import GuestRegistrationRepository as guest_registration_repository
 
-from app import db, bcrypt, LOGGER
+from app import db, LOGGER
 from app.utils.errors import (
     EVENT_NOT_FOUND,
     FORBIDDEN,
@@ -31,10 +31,12 @@ from app.utils.errors import (
 
 from app.utils.auth import auth_optional, auth_required, event_admin_required
 from app.utils.emailer import email_user
+from app.utils.sql_instrumentation import query_budget
 from app.events.repository import EventRepository as event_repository
 from app.organisation.models import Organisation
 from app.events.models import EventType
 import app.events.status as event_status
+from app.events.catalogue import EventCatalogue as event_catalogue, event_details
 from app.reviews.repository import ReviewRepository as review_repository
 from app.reviews.repository import ReviewConfigurationRepository as review_config_repository
 
@@ -52,34 +54,10 @@ def status_info(status):
     }
 
 def event_info(user_id, event, status, language):
-    return {
-        'id': event.id,
-        'name': event.get_name(language),
-        'description': event.get_description(language),
-        'key': event.key,
-        'start_date': event.start_date.strftime("%d %B %Y"),
-        'end_date': event.end_date.strftime("%d %B %Y"),
-        'status': status_info(status),
-        'email_from': event.email_from,
-        'organisation_name': event.organisation.name,
-        'organisation_id': event.organisation.id,
-        'url': event.url,
-        'event_type': event.event_type.value.upper(),
-        'is_application_open': event.is_application_open,
-        'is_application_opening': event.is_application_opening,
-        'is_review_open': event.is_review_open,
-        'is_review_opening': event.is_review_opening,
-        'is_selection_open': event.is_selection_open,
-        'is_selection_opening': event.is_selection_opening,
-        'is_offer_open': event.is_offer_open,
-        'is_offer_opening': event.is_offer_opening,
-        'is_registration_open': event.is_registration_open,
-        'is_registration_opening': event.is_registration_opening,
-        'is_event_open': event.is_event_open,
-        'is_event_opening': event.is_event_opening,
-        'travel_grant': event.travel_grant,
-        "miniconf_url": event.miniconf_url
-    }
+    translations = {t.language: t for t in event.event_translations.filter_by(language=language)}
+    info = event_details(event, language, translations)
+    info['status'] = status_info(status)
+    return info
 
 
 event_fields = {
@@ -111,8 +89,7 @@ event_fields = {
 def get_user_event_response_status(user_id, event_id):
 
     def _log_application_status(context):
-        LOGGER.debug("Application {} for user_id: {}, event_id: {}".format(
-            context, user_id, event_id))
+        LOGGER.debug("Application %s for user_id: %s, event_id: %s", context, user_id, event_id)
 
     try:
         applicationForm = db.session.query(ApplicationForm).filter(
@@ -268,24 +245,26 @@ class EventAPI(EventMixin, restful.Resource):
 
 class EventsAPI(restful.Resource):
 
+    @query_budget(12)
     @auth_required
     def get(self):
         user_id = g.current_user["id"]
         language = request.args['language']
-        default_language = 'en'
 
-        upcoming_events = event_repository.get_upcoming_for_organisation(g.organisation.id)
-        attended_events = event_repository.get_attended_by_user_for_organisation(g.organisation.id, user_id)
+        upcoming_events = event_catalogue.get_upcoming(g.organisation.id, language)
+        attended_event_ids = event_repository.get_attended_ids_by_user_for_organisation(g.organisation.id, user_id)
+        attended_events = event_catalogue.get_by_ids(g.organisation.id, language, attended_event_ids)
+
+        events = list(itertools.chain(upcoming_events, attended_events))
+        statuses = {} if user_id == 0 else event_status.get_event_statuses(user_id, [e.event_id for e in events])
 
         returnEvents = []
 
-        for event in itertools.chain(upcoming_events, attended_events):
-            if not event.has_specific_translation(language):
-                LOGGER.error('Missing {} translation for event {}.'.format(language, event.id))
-                language = default_language
-            status = None if user_id == 0 else event_status.get_event_status(event.id, user_id)
-            returnEvents.append(event_info(user_id, event, status, language))
-            language = request.args['language']
+        for event in events:
+            if not event.has_translation:
+                LOGGER.error('Missing {} translation for event {}.'.format(language, event.event_id))
+            status = None if user_id == 0 else statuses[event.event_id]
+            returnEvents.append(dict(event.details, status=status_info(status)))
 
         return returnEvents, 200
 
@@ -389,6 +368,14 @@ class EventsByKeyAPI(EventsKeyMixin, restful.Resource):
             default_language = 'en'
             language = default_language
 
+        catalogue_event = event_catalogue.get_by_key(g.organisation.id, language, args['event_key'])
+        if catalogue_event is not None:
+            if not catalogue_event.has_translation:
+                return EVENT_WITH_TRANSLATION_NOT_FOUND
+            status = event_status.get_event_status(catalogue_event.event_id, user_id)
+            return dict(catalogue_event.details, status=status_info(status)), 200
+
+        # Events of other organisations aren't in the catalogue
         event = event_repository.get_by_key(args['event_key'])
         if not event:
             return EVENT_WITH_KEY_NOT_FOUND
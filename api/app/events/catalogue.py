@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import joinedload
+
+from app import db
+from app.events.models import Event, EventTranslation
+from app.organisation.models import Organisation
+from app.utils.cache import ALL, ModelCache
+
+DEFAULT_LANGUAGE = 'en'
+
+# The event dates at which one of the phase flags (is_application_open etc) changes
+_PHASE_DATE_FIELDS = (
+    'start_date', 'end_date',
+    'application_open', 'application_close',
+    'review_open', 'review_close',
+    'selection_open', 'selection_close',
+    'offer_open', 'offer_close',
+    'registration_open', 'registration_close',
+)
+
+
+def event_details(event, language, translations):
+    """Serialize the event fields that are the same for every user.
+    translations maps language to the event's EventTranslation."""
+    translation = translations.get(language)
+    return {
+        'id': event.id,
+        'name': translation.name if translation else None,
+        'description': translation.description if translation else None,
+        'key': event.key,
+        'start_date': event.start_date.strftime("%d %B %Y"),
+        'end_date': event.end_date.strftime("%d %B %Y"),
+        'email_from': event.email_from,
+        'organisation_name': event.organisation.name,
+        'organisation_id': event.organisation.id,
+        'url': event.url,
+        'event_type': event.event_type.value.upper(),
+        'is_application_open': event.is_application_open,
+        'is_application_opening': event.is_application_opening,
+        'is_review_open': event.is_review_open,
+        'is_review_opening': event.is_review_opening,
+        'is_selection_open': event.is_selection_open,
+        'is_selection_opening': event.is_selection_opening,
+        'is_offer_open': event.is_offer_open,
+        'is_offer_opening': event.is_offer_opening,
+        'is_registration_open': event.is_registration_open,
+        'is_registration_opening': event.is_registration_opening,
+        'is_event_open': event.is_event_open,
+        'is_event_opening': event.is_event_opening,
+        'travel_grant': event.travel_grant,
+        "miniconf_url": event.miniconf_url
+    }
+
+
+class CatalogueEvent():
+    """An organisation's event as held in the catalogue. details are the serialized fields
+    (see event_details) in the catalogue language, or the default language if the event
+    has no translation for it."""
+    def __init__(self, event_id, key, end_date, has_translation, details):
+        self.event_id = event_id
+        self.key = key
+        self.end_date = end_date
+        self.has_translation = has_translation
+        self.details = details
+
+
+# Catalogues are grouped by organisation
+_catalogues = ModelCache('event_catalogue')
+_catalogues.depends_on(Event, lambda event: event.organisation_id)
+_catalogues.depends_on(Organisation, lambda organisation: organisation.id)
+# The translation's event may not be loaded, so don't look up its organisation
+_catalogues.depends_on(EventTranslation, lambda translation: ALL)
+
+
+class EventCatalogue():
+    """Caches the serialized events of an organisation per language, since they are the same for
+    every user. A catalogue is dropped when one of the organisation's events or translations is
+    changed, and when the next phase date of one of its events is reached so the phase flags stay
+    correct."""
+
+    @classmethod
+    def load(cls, organisation_id, language):
+        """Get the CatalogueEvents of all of the organisation's events, ordered by id."""
+        return _catalogues.load((organisation_id, language), organisation_id,
+                                lambda: cls._build(organisation_id, language))
+
+    @classmethod
+    def _build(cls, organisation_id, language):
+        events = (db.session.query(Event)
+                  .filter(Event.organisation_id == organisation_id)
+                  .options(joinedload(Event.organisation))
+                  .order_by(Event.id)
+                  .all())
+
+        translations = {}
+        if events:
+            for translation in (db.session.query(EventTranslation)
+                                .filter(EventTranslation.event_id.in_([e.id for e in events]))
+                                .all()):
+                translations.setdefault(translation.event_id, {})[translation.language] = translation
+
+        now = datetime.now()
+        expires_at = now + timedelta(seconds=_catalogues.ttl_seconds)
+        catalogue = []
+        for event in events:
+            event_translations = translations.get(event.id, {})
+            has_translation = language in event_translations
+            details = event_details(event, language if has_translation else DEFAULT_LANGUAGE, event_translations)
+            catalogue.append(CatalogueEvent(event.id, event.key, event.end_date, has_translation, details))
+
+            for field in _PHASE_DATE_FIELDS:
+                phase_date = getattr(event, field)
+                if now < phase_date < expires_at:
+                    expires_at = phase_date
+
+        return catalogue, (expires_at - now).total_seconds()
+
+    @classmethod
+    def get_upcoming(cls, organisation_id, language):
+        now = datetime.now()
+        return [e for e in cls.load(organisation_id, language) if e.end_date >= now]
+
+    @classmethod
+    def get_by_ids(cls, organisation_id, language, event_ids):
+        event_ids = set(event_ids)
+        return [e for e in cls.load(organisation_id, language) if e.event_id in event_ids]
+
+    @classmethod
+    def get_by_key(cls, organisation_id, language, event_key):
+        for catalogue_event in cls.load(organisation_id, language):
+            if catalogue_event.key == event_key:
+                return catalogue_event
+        return None
@@ -44,14 +44,15 @@ class EventRepository():
                          .all()
 
     @staticmethod
-    def get_attended_by_user_for_organisation(organisation_id, user_id):
-        return db.session.query(Event)\
+    def get_attended_ids_by_user_for_organisation(organisation_id, user_id):
+        rows = db.session.query(Event.id)\
                          .filter(Event.end_date < datetime.now())\
                          .filter_by(organisation_id=organisation_id)\
                          .outerjoin(Offer, and_(Event.id == Offer.event_id, Offer.user_id == user_id, Offer.candidate_response == True))\
                          .outerjoin(InvitedGuest, and_(Event.id == InvitedGuest.event_id, InvitedGuest.user_id == user_id))\
                          .filter(or_(Offer.id != None, InvitedGuest.id != None))\
                          .all()
+        return [row.id for row in rows]
 
     @staticmethod
     def add(event):
@@ -41,46 +41,89 @@ def _get_registration_status(registration):
         return 'Not Confirmed'
 
 
-def get_event_status(event_id, user_id):
-    invited_guest = invited_guest_repository.get_for_event_and_user(event_id, user_id)
-    if invited_guest:
-        registration = invited_guest_repository.get_registration_for_event_and_user(event_id, user_id)
-        # If they're an invited guest, we don't bother with whether they applied or not
-        return EventStatus(invited_guest=invited_guest.role, 
-                           registration_status=_get_registration_status(registration))
-    
-    response = response_repository.get_by_user_id_for_event(user_id, event_id)
+def _get_application_status(response):
     if response is None:
-        application_status = None
+        return None
     elif response.is_submitted:
-        application_status = 'Submitted'
+        return 'Submitted'
     elif response.is_withdrawn:
-        application_status = 'Withdrawn'
+        return 'Withdrawn'
     else:
-        application_status = 'Not Submitted'
+        return 'Not Submitted'
 
-    outcome = outcome_repository.get_latest_by_user_for_event(user_id, event_id)
-    if outcome is None:
-        outcome_status = None
-    else:
-        outcome_status = outcome.status.name
 
-    offer = offer_repository.get_by_user_id_for_event(user_id, event_id)
+def _get_offer_status(offer):
     if offer is None:
-        offer_status = None
+        return None
     elif offer.candidate_response:
-        offer_status = 'Accepted'
+        return 'Accepted'
     elif offer.candidate_response == False:
-        offer_status = 'Rejected'
+        return 'Rejected'
     elif offer.is_expired():
-        offer_status = 'Expired'
+        return 'Expired'
     else:
-        offer_status = 'Pending'
+        return 'Pending'
+
+
+def _build_event_status(invited_guest, guest_registration, response, outcome, offer, registration):
+    if invited_guest:
+        # If they're an invited guest, we don't bother with whether they applied or not
+        return EventStatus(invited_guest=invited_guest.role,
+                           registration_status=_get_registration_status(guest_registration))
+
+    return EventStatus(application_status=_get_application_status(response),
+                       outcome_status=None if outcome is None else outcome.status.name,
+                       offer_status=_get_offer_status(offer),
+                       registration_status=_get_registration_status(registration))
+
+
+def get_event_status(event_id, user_id):
+    invited_guest = invited_guest_repository.get_for_event_and_user(event_id, user_id)
+    if invited_guest:
+        registration = invited_guest_repository.get_registration_for_event_and_user(event_id, user_id)
+        return _build_event_status(invited_guest, registration, None, None, None, None)
+
+    return _build_event_status(
+        None,
+        None,
+        response_repository.get_by_user_id_for_event(user_id, event_id),
+        outcome_repository.get_latest_by_user_for_event(user_id, event_id),
+        offer_repository.get_by_user_id_for_event(user_id, event_id),
+        registration_repository.get_by_user_id(user_id, event_id))
+
+
+def _first_by_event(pairs):
+    """Map event id to the first item for that event, from (event_id, item) pairs."""
+    by_event = {}
+    for event_id, item in pairs:
+        by_event.setdefault(event_id, item)
+    return by_event
+
+
+def get_event_statuses(user_id, event_ids):
+    """Get the user's status at each of the events as a dict by event id,
+    using a fixed number of queries however many events there are."""
+    event_ids = list(set(event_ids))
+    if not event_ids:
+        return {}
 
-    registration = registration_repository.get_by_user_id(user_id, event_id)
-    registration_status = _get_registration_status(registration)
+    invited_guests = _first_by_event(
+        (g.event_id, g) for g in invited_guest_repository.get_for_events_and_user(event_ids, user_id))
+    guest_registrations = _first_by_event(
+        invited_guest_repository.get_registrations_for_events_and_user(event_ids, user_id))
+    responses = _first_by_event(response_repository.get_by_user_id_for_events(user_id, event_ids))
+    outcomes = _first_by_event(
+        (o.event_id, o) for o in outcome_repository.get_latest_by_user_for_events(user_id, event_ids))
+    offers = _first_by_event(
+        (o.event_id, o) for o in offer_repository.get_by_user_id_for_events(user_id, event_ids))
+    registrations = _first_by_event(registration_repository.get_by_user_id_for_events(user_id, event_ids))
 
-    return EventStatus(application_status=application_status,
-                       outcome_status=outcome_status,
-                       offer_status=offer_status,
-                       registration_status=registration_status)
+    return {
+        event_id: _build_event_status(invited_guests.get(event_id),
+                                      guest_registrations.get(event_id),
+                                      responses.get(event_id),
+                                      outcomes.get(event_id),
+                                      offers.get(event_id),
+                                      registrations.get(event_id))
+        for event_id in event_ids
+    }
@@ -1,4 +1,5 @@
 import json
+import time
 
 from datetime import datetime, date, timedelta
 from app import app, db, LOGGER
@@ -16,6 +17,7 @@ from app.outcome.models import Outcome
 from app.outcome.models import Status as OutcomeStatus
 from app.invitedGuest.models import InvitedGuest, GuestRegistration
 import app.events.status as event_status
+from app.events.catalogue import EventCatalogue, _catalogues
 from app.registration.models import RegistrationForm, Offer, Registration
 
 class EventsAPITest(ApiTestCase):
@@ -73,6 +75,20 @@ class EventsAPITest(ApiTestCase):
         self.assertEqual(data[0]["description"], 'Event Description')
         self.assertEqual(data[0]["status"]['application_status'], 'Submitted')
 
+    def test_events_query_count_independent_of_event_count(self):
+        self.seed_static_data()
+        user_id = self.test_user.id
+        header = self.get_auth_header_for('something@email.com')
+
+        def add_events(n):
+            for _ in range(n):
+                event = self.add_event(key='EVENT{}'.format(db.session.query(Event).count()))
+                form = self.create_application_form(event.id)
+                self.add_response(form.id, user_id, is_submitted=True)
+
+        self.assert_query_budget(
+            12, add_events, lambda: self.app.get('/api/v1/events', headers=header, query_string={'language': 'en'}))
+
     def test_get_events_withdrawn(self):
         self.seed_static_data()
 
@@ -869,3 +885,76 @@ class EventStatusTest(ApiTestCase):
 
         status = event_status.get_event_status(self.event.id, self.user1.id)
         self.assertEqual(status.registration_status, 'Confirmed')
+
+    def test_event_statuses(self):
+        """Check that bulk statuses match the statuses of each event."""
+        self.seed_static_data()
+        event3 = self.add_event({'en': 'Third event'}, key='third_event')
+
+        outcome = Outcome(self.event.id, self.user1.id, OutcomeStatus.ACCEPTED, self.user2.id)
+        db.session.add(outcome)
+        self.add_response(self.application_form.id, self.user1.id, is_submitted=True)
+        offer = Offer(
+            user_id=self.user1.id,
+            event_id=self.event.id,
+            offer_date=date.today(),
+            expiry_date=date.today() + timedelta(days=1),
+            payment_required=False,
+            travel_award=False,
+            accommodation_award=False,
+            candidate_response=True)
+        db.session.add(offer)
+        db.session.commit()
+        db.session.add(Registration(offer.id, self.registration_form.id))
+
+        invited = InvitedGuest(event_id=self.event2.id, user_id=self.user1.id, role='Mentor')
+        db.session.add(invited)
+        db.session.commit()
+
+        event_ids = [self.event.id, self.event2.id, event3.id]
+        statuses = event_status.get_event_statuses(self.user1.id, event_ids)
+        self.assertEqual(sorted(statuses.keys()), sorted(event_ids))
+
+        for event_id in event_ids:
+            expected = event_status.get_event_status(event_id, self.user1.id)
+            self.assertEqual(vars(statuses[event_id]), vars(expected))
+
+        self.assertEqual(statuses[self.event.id].registration_status, 'Not Confirmed')
+        self.assertEqual(statuses[self.event2.id].invited_guest, 'Mentor')
+        self.assertIsNone(statuses[event3.id].application_status)
+        self.assertEqual(event_status.get_event_statuses(self.user1.id, []), {})
+
+
+class EventCatalogueTest(ApiTestCase):
+
+    def test_catalogue_refreshed_on_event_write(self):
+        """Check that changing an event replaces its cached catalogue."""
+        event = self.add_event({'en': 'Test Event', 'fr': 'Evenement'}, {'en': 'Description', 'fr': 'La description'})
+
+        catalogue = EventCatalogue.load(1, 'fr')
+        self.assertEqual([e.details['name'] for e in catalogue], ['Evenement'])
+        self.assertIs(EventCatalogue.load(1, 'fr'), catalogue)
+
+        event.url = 'new.url'
+        db.session.commit()
+
+        catalogue = EventCatalogue.load(1, 'fr')
+        self.assertEqual(catalogue[0].details['url'], 'new.url')
+
+    def test_catalogue_expires_at_next_phase_date(self):
+        """Check that a catalogue expires when the next phase of one of its events starts."""
+        application_close = datetime.now() + timedelta(minutes=2)
+        self.add_event(application_close=application_close)
+
+        EventCatalogue.load(1, 'en')
+        _, _, expires_at, _ = _catalogues._entries[(1, 'en')]
+        self.assertAlmostEqual(expires_at, time.mktime(application_close.timetuple()), delta=1)
+
+    def test_missing_translation_uses_default_language(self):
+        """Check that events without a translation in the catalogue language fall back to English."""
+        self.add_event({'en': 'Test Event'}, {'en': 'Description'})
+
+        catalogue_event = EventCatalogue.get_by_key(1, 'fr', 'INDABA2025')
+        self.assertFalse(catalogue_event.has_translation)
+        self.assertEqual(catalogue_event.details['name'], 'Test Event')
+        self.assertIsNone(EventCatalogue.get_by_key(1, 'fr', 'missing'))
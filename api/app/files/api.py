@@ -12,6 +12,7 @@ import tempfile
 
 from app import LOGGER
 from app.utils import storage
+from app.utils.metrics import timed
 
 
 class FileUploadAPI(FileUploadMixin, restful.Resource):
@@ -21,21 +22,18 @@ class FileUploadAPI(FileUploadMixin, restful.Resource):
         req_parser.add_argument('filename', type=str, required=True)
         args = req_parser.parse_args()
 
-        bucket = storage.get_storage_bucket()
-
-        blob = bucket.blob(args['filename'])
         with tempfile.NamedTemporaryFile() as temp:
-            blob.download_to_filename(temp.name)
+            with timed('gcs'):
+                bucket = storage.get_storage_bucket()
+                blob = bucket.blob(args['filename'])
+                blob.download_to_filename(temp.name)
             return send_file(temp.name, as_attachment=True, attachment_filename=args['filename'], mimetype='application/pdf')
 
 
     def post(self):
         args = self.req_parser.parse_args()
 
-        bucket = storage.get_storage_bucket()
-        
         unique_name = str(uuid.uuid4().hex)
-        blob = bucket.blob(unique_name)
 
         file = args['file']
         bytes_file = file.read()
@@ -43,10 +41,13 @@ class FileUploadAPI(FileUploadMixin, restful.Resource):
         file_size = len(bytes_file) 
 
         if file_size > FILE_SIZE_LIMIT:
-            LOGGER.debug('File size of {} exceeds limit of {}'.format(file_size, FILE_SIZE_EXCEEDED))
+            LOGGER.debug('File size of %s exceeds limit of %s', file_size, FILE_SIZE_EXCEEDED)
             return FILE_SIZE_EXCEEDED
 
-        blob.upload_from_string(bytes_file, content_type=content_type)
+        with timed('gcs'):
+            bucket = storage.get_storage_bucket()
+            blob = bucket.blob(unique_name)
+            blob.upload_from_string(bytes_file, content_type=content_type)
 
         return {
             'file_id': unique_name,
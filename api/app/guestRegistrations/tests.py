@@ -10,6 +10,8 @@ from app import app, db
 
 from app import db, LOGGER
 from app.organisation.models import Organisation
+from app.invitedGuest.models import GuestRegistration
+from mock import patch
 
 
 class GuestRegistrationApiTest(ApiTestCase):
@@ -161,6 +163,23 @@ class GuestRegistrationApiTest(ApiTestCase):
             content_type='application/json',
             headers=self.headers)
         self.assertEqual(response.status_code, 201)
+        self.assertIsNotNone(json.loads(response.data)['confirmation_email_sent_at'])
+
+    def test_confirmation_not_marked_sent_if_sending_fails(self):
+        self.seed_static_data()
+        registration_data = {
+            'registration_form_id': self.form_id,
+            'answers': [{'registration_question_id': self.question_id, 'value': 'Answer 1'}]
+        }
+        with patch('app.utils.emailer.send_mail', side_effect=Exception('SMTP unavailable')):
+            response = self.app.post(
+                '/api/v1/guest-registration',
+                data=json.dumps(registration_data),
+                content_type='application/json',
+                headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+        registration = db.session.query(GuestRegistration).get(json.loads(response.data)['id'])
+        self.assertIsNone(registration.confirmation_email_sent_at)
 
     def test_get_registration(self):
         self.seed_static_data()
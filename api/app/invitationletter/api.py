@@ -4,7 +4,7 @@ from sqlalchemy.exc import IntegrityError
 from app.utils.auth import verify_token
 from flask import g, request
 from app.invitationletter.models import InvitationTemplate
-from app.registration.models import Offer, Registration, RegistrationAnswer, RegistrationQuestion, Registration, RegistrationForm
+from app.registration.models import Offer, Registration, Registration, RegistrationForm
 from app.invitationletter.mixins import InvitationMixin
 from app.invitationletter.models import InvitationLetterRequest
 from app.invitationletter.generator import generate
@@ -13,6 +13,7 @@ from app import db, LOGGER
 from app.utils import errors
 from app.utils.auth import auth_required
 from app.events.repository import EventRepository
+from app.registration.repository import RegistrationRepository as registration_repository
 from app.invitedGuest.models import GuestRegistration
 
 
@@ -154,18 +155,9 @@ class InvitationLetterAPI(InvitationMixin, restful.Resource):
 
         # Poster registration
         bringing_poster = ""
-        poster_registration_question = db.session.query(RegistrationQuestion).filter(RegistrationQuestion.headline == "Will you be bringing a poster?").first()
-        if poster_registration_question is not None:
-            poster_answer = (
-                db.session.query(RegistrationAnswer)
-                .join(Registration, RegistrationAnswer.registration_id == Registration.id)
-                .join(Offer, Offer.id == Registration.offer_id)
-                .filter(Offer.user_id == user_id)
-                .filter(RegistrationAnswer.registration_question_id == poster_registration_question.id)
-                .first()
-            )
-            if poster_answer is not None and poster_answer.value == 'yes':
-                bringing_poster = "The participant will be presenting a poster of their research."
+        answers = registration_repository.get_answers_by_question_keys(user_id, event_id, ['bringing_poster'])
+        if answers.get('bringing_poster') == 'yes':
+            bringing_poster = "The participant will be presenting a poster of their research."
 
         # Handling fields
         invitation_letter_request.invitation_letter_sent_at=datetime.now()
@@ -1,22 +1,24 @@
-from mailmerge import MailMerge
 from app import LOGGER
 from config import GCP_CREDENTIALS_DICT, GCP_PROJECT_NAME, GCP_BUCKET_NAME, FILE_SIZE_LIMIT
 from config import GCP_BUCKET_NAME
 import json
-from google.cloud import storage
 import os
 from app.utils import emailer
 from app.utils import pdfconvertor
 from app.events.models import Event
 from app import db
 from app.utils import errors
+from app.utils.metrics import timed
 
-from google.oauth2 import service_account
 from six import string_types
 
 
+@timed('gcs')
 def download_blob(bucket_name, source_blob_name, destination_file_name):
     """Downloads a blob from the bucket."""
+    # Imported here rather than with the app, like in app.utils.storage
+    from google.cloud import storage
+    from google.oauth2 import service_account
 
     if GCP_CREDENTIALS_DICT['private_key'] == 'dummy':
         LOGGER.debug('Setting dummy storage client')
@@ -82,8 +84,9 @@ def generate(template_path, event_id, work_address, addressed_to, residential_ad
     if not os.path.exists(template):
         return errors.TEMPLATE_NOT_FOUND
 
+    from mailmerge import MailMerge
     document = MailMerge(template)
-    LOGGER.debug("merge-fields.... {} .".format(document.get_merge_fields()))
+    LOGGER.debug("merge-fields.... %s .", document.get_merge_fields())
     document.merge(
         TITLE=user_title,
         FIRSTNAME=firstname,
@@ -112,7 +112,8 @@ class InvitationLetterTests(ApiTestCase):
             placeholder="the placeholder",
             headline="Will you be bringing a poster?",
             validation_regex="[]/",
-            validation_text=" text"
+            validation_text=" text",
+            key="bringing_poster"
         )
         db.session.add(rq)
         db.session.commit()
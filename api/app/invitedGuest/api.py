@@ -6,7 +6,7 @@ from sqlalchemy.exc import IntegrityError
 from app.applicationModel.mixins import ApplicationFormMixin
 from app.utils.auth import auth_required
 from app import LOGGER
-from app import db, bcrypt
+from app import db
 from flask import g, request
 import random
 import string
@@ -19,6 +19,7 @@ from app.users import api as UserAPI
 from app.users.mixins import SignupMixin
 from app.users.repository import UserRepository as user_repository
 from app.events.repository import EventRepository as event_repository
+from app.roster.repository import RosterRepository as roster_repository
 from sqlalchemy import func
 from app.utils import misc
 from app.utils.emailer import email_user
@@ -67,6 +68,7 @@ class InvitedGuestAPI(InvitedGuestMixin, restful.Resource):
         db.session.add(invitedGuest)
 
         try:
+            roster_repository.refresh(event_id, [user.id])
             db.session.commit()
         except IntegrityError:
             LOGGER.error(
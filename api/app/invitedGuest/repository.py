@@ -18,3 +18,21 @@ class InvitedGuestRepository():
                 .filter(RegistrationForm.event_id == event_id)
                 .first())
 
+    @staticmethod
+    def get_for_events_and_user(event_ids, user_id):
+        """Get the user's invited guest records for several events, ordered by id."""
+        return (db.session.query(InvitedGuest)
+                .filter(InvitedGuest.event_id.in_(event_ids), InvitedGuest.user_id == user_id)
+                .order_by(InvitedGuest.id)
+                .all())
+
+    @staticmethod
+    def get_registrations_for_events_and_user(event_ids, user_id):
+        """Get the user's guest registrations for several events as (event_id, GuestRegistration), ordered by id."""
+        return (db.session.query(RegistrationForm.event_id, GuestRegistration)
+                .filter(GuestRegistration.user_id == user_id)
+                .join(RegistrationForm, GuestRegistration.registration_form_id == RegistrationForm.id)
+                .filter(RegistrationForm.event_id.in_(event_ids))
+                .order_by(GuestRegistration.id)
+                .all())
+
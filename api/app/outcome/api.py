@@ -1,5 +1,5 @@
 import traceback
-from flask_restful import reqparse, fields, marshal_with
+from flask_restful import reqparse, fields, marshal_with, marshal
 import flask_restful as restful
 from flask import g, request
 from sqlalchemy.exc import SQLAlchemyError
@@ -17,6 +17,9 @@ from app.utils import errors
 from app.utils import misc
 
 
+MAX_PER_PAGE = 500
+
+
 def _extract_status(outcome):
     if not isinstance(outcome, Outcome):
         return None
@@ -92,19 +95,14 @@ class OutcomeAPI(restful.Resource):
             return errors.OUTCOME_STATUS_NOT_VALID
 
         try:
-            # Set existing outcomes to no longer be the latest outcome
-            existing_outcomes = outcome_repository.get_all_by_user_for_event(args['user_id'], event_id)
-            for existing_outcome in existing_outcomes:
-                existing_outcome.reset_latest()
-
-            # Add new outcome
+            # Add the new outcome, replacing the existing latest outcome
             outcome = Outcome(
                     event_id,
                     args['user_id'],
                     status,
                     g.current_user['id'])
 
-            outcome_repository.add(outcome)
+            outcome_repository.supersede(outcome)
             db.session.commit()
 
             if status != Status.ACCEPTED:  # Email will be sent with offer for accepted candidates  
@@ -135,9 +133,19 @@ class OutcomeListAPI(restful.Resource):
         if not event:
             return errors.EVENT_NOT_FOUND
 
+        req_parser = reqparse.RequestParser()
+        req_parser.add_argument('page', type=int, required=False)
+        req_parser.add_argument('per_page', type=int, required=False, default=100)
+        args = req_parser.parse_args()
+
         try:
-            outcomes = outcome_repository.get_latest_for_event(event_id)
-            return outcomes
+            if args['page'] is None:
+                return outcome_repository.get_latest_for_event(event_id)
+
+            page = max(args['page'], 1)
+            per_page = min(max(args['per_page'], 1), MAX_PER_PAGE)
+            total, outcomes = outcome_repository.get_latest_for_event_page(event_id, page, per_page)
+            return outcomes, 200, {'X-Total-Count': str(total)}
         except SQLAlchemyError as e:
             LOGGER.error("Database error encountered: {}".format(e))            
             return errors.DB_NOT_AVAILABLE
@@ -146,5 +154,71 @@ class OutcomeListAPI(restful.Resource):
             return errors.DB_NOT_AVAILABLE
 
 
+class OutcomeBulkAPI(restful.Resource):
+    """Set the outcomes of several candidates at once, e.g. for a selection round.
+    Rows that can't be saved are reported per row rather than failing the whole request."""
 
-        
+    @event_admin_required
+    def post(self, event_id):
+        req_parser = reqparse.RequestParser()
+        req_parser.add_argument('outcomes', type=list, required=True, location='json')
+        args = req_parser.parse_args()
+
+        event = event_repository.get_by_id(event_id)
+        if not event:
+            return errors.EVENT_NOT_FOUND
+
+        rows = [row if isinstance(row, dict) else {} for row in args['outcomes']]
+        users = {user.id: user for user in user_repository.get_by_ids(
+            [row['user_id'] for row in rows if misc.is_id(row.get('user_id'))])}
+
+        try:
+            results = []
+            outcomes = []
+            seen = set()
+            for row in rows:
+                user_id = row.get('user_id')
+                status = Status.__members__.get(row.get('outcome')) if isinstance(row.get('outcome'), basestring) else None
+                if not misc.is_id(user_id) or user_id not in users:
+                    result = 'user_not_found'
+                elif status is None:
+                    result = 'invalid_status'
+                elif user_id in seen:
+                    result = 'duplicate'
+                else:
+                    result = 'created'
+                    outcomes.append(Outcome(event_id, user_id, status, g.current_user['id']))
+                    seen.add(user_id)
+                results.append({'user_id': user_id, 'result': result, 'outcome': None})
+
+            created_user_ids = [outcome.user_id for outcome in outcomes]
+            outcome_repository.reset_latest_for_users(event_id, created_user_ids)
+            outcome_repository.add_all(outcomes)
+            db.session.commit()
+
+            for outcome in outcomes:
+                if outcome.status != Status.ACCEPTED:  # Email will be sent with offer for accepted candidates
+                    email_user(
+                        'outcome-rejected' if outcome.status == Status.REJECTED else 'outcome-waitlist',
+                        template_parameters=dict(
+                            host=misc.get_baobab_host()
+                        ),
+                        event=event,
+                        user=users[outcome.user_id],
+                        deferred=True
+                    )
+
+            saved = {outcome.user_id: marshal(outcome, outcome_fields)
+                     for outcome in outcome_repository.get_latest_by_users_for_event(event_id, created_user_ids)}
+            for result in results:
+                if result['result'] == 'created':
+                    result['outcome'] = saved[result['user_id']]
+
+            return results, 201
+
+        except SQLAlchemyError as e:
+            LOGGER.error("Database error encountered: {}".format(e))
+            return errors.DB_NOT_AVAILABLE
+        except:
+            LOGGER.error("Encountered unknown error: {}".format(traceback.format_exc()))
+            return errors.DB_NOT_AVAILABLE
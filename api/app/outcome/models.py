@@ -8,6 +8,12 @@ class Status(Enum):
     WAITLIST = "waitlist"
 
 class Outcome(db.Model):
+    __table_args__ = (
+        # At most one latest outcome per user and event
+        db.Index('uq_outcome_event_user_latest', 'event_id', 'user_id', unique=True,
+                 postgresql_where=db.text('latest'), sqlite_where=db.text('latest')),
+    )
+
     id = db.Column(db.Integer(), primary_key = True, nullable = False)
     event_id = db.Column(db.Integer(), db.ForeignKey('event.id'), nullable = False)
     user_id = db.Column(db.Integer(), db.ForeignKey('app_user.id'), nullable = False)
@@ -34,4 +40,4 @@ class Outcome(db.Model):
         self.updated_by_user_id = updated_by_user_id
 
     def reset_latest(self):
-        self.latest = False
\ No newline at end of file
+        self.latest = False
@@ -1,3 +1,6 @@
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+
 from app import db
 from app.outcome.models import Outcome
 
@@ -10,6 +13,14 @@ class OutcomeRepository():
                         .filter_by(user_id=user_id, event_id=event_id, latest=True)
                         .first())
         return outcome
+
+    @staticmethod
+    def get_latest_by_user_for_events(user_id, event_ids):
+        outcomes = (db.session.query(Outcome)
+                        .filter(Outcome.user_id == user_id, Outcome.event_id.in_(event_ids), Outcome.latest == True)
+                        .order_by(Outcome.id)
+                        .all())
+        return outcomes
     
     @staticmethod
     def get_all_by_user_for_event(user_id, event_id):
@@ -18,15 +29,68 @@ class OutcomeRepository():
                         .all())
         return outcomes
 
+    @staticmethod
+    def _latest_for_event_query(event_id):
+        return (db.session.query(Outcome)
+                    .filter_by(latest=True, event_id=event_id)
+                    .options(joinedload(Outcome.user), joinedload(Outcome.updated_by_user))
+                    .order_by(Outcome.id))
+
     @staticmethod
     def get_latest_for_event(event_id):
-        outcomes = (db.session.query(Outcome)
-                        .filter_by(latest=True, event_id=event_id)
-                        .all())
+        outcomes = OutcomeRepository._latest_for_event_query(event_id).all()
         return outcomes
 
+    @staticmethod
+    def get_latest_for_event_page(event_id, page, per_page):
+        """Get a page of the latest outcomes for an event, as (total, outcomes)."""
+        total = (db.session.query(Outcome.id)
+                    .filter_by(latest=True, event_id=event_id)
+                    .count())
+        outcomes = (OutcomeRepository._latest_for_event_query(event_id)
+                    .limit(per_page)
+                    .offset((page - 1) * per_page)
+                    .all())
+        return total, outcomes
+
     @staticmethod
     def add(outcome):
         db.session.add(outcome)
 
-    
\ No newline at end of file
+    @staticmethod
+    def supersede(outcome):
+        """Add the outcome as the latest for its user and event, replacing the previous latest outcome
+        without committing. If a concurrent request inserted a latest outcome in between (violating
+        uq_outcome_event_user_latest), the swap is retried once."""
+        for attempt in range(2):
+            savepoint = db.session.begin_nested()
+            try:
+                OutcomeRepository.reset_latest_for_users(outcome.event_id, [outcome.user_id])
+                db.session.add(outcome)
+                savepoint.commit()
+                return outcome
+            except IntegrityError:
+                savepoint.rollback()
+                if attempt:
+                    raise
+
+    @staticmethod
+    def get_latest_by_users_for_event(event_id, user_ids):
+        outcomes = (db.session.query(Outcome)
+                        .filter(Outcome.event_id == event_id, Outcome.user_id.in_(user_ids), Outcome.latest == True)
+                        .all())
+        return outcomes
+
+    @staticmethod
+    def reset_latest_for_users(event_id, user_ids):
+        """Set the latest outcomes of the users to no longer be the latest, with a single UPDATE."""
+        if not user_ids:
+            return
+        (db.session.query(Outcome)
+            .filter(Outcome.event_id == event_id, Outcome.user_id.in_(user_ids), Outcome.latest == True)
+            .update({Outcome.latest: False}, synchronize_session=False))
+
+    @staticmethod
+    def add_all(outcomes):
+        """Insert several outcomes with a single executemany, without loading their ids."""
+        db.session.bulk_save_objects(outcomes)
@@ -5,6 +5,7 @@ from app import db, LOGGER
 from app.utils.testing import ApiTestCase
 from app.outcome.models import Outcome, Status
 from app.outcome.repository import OutcomeRepository as outcome_repository
+from sqlalchemy.exc import IntegrityError
 
 class OutcomeApiTest(ApiTestCase):
     def seed_static_data(self):
@@ -169,8 +170,69 @@ class OutcomeApiTest(ApiTestCase):
 
         self.assertEqual(len(data), 2)
         self.assertItemsEqual([o['user']['email'] for o in data], ['something@email.com', 'something_else@email.com'])
-    
 
+    def test_post_bulk(self):
+        """Test that bulk outcomes are saved and reported per row."""
+        self.seed_static_data()
+        test_user2_id = self.test_user2.id
+        response = self.app.post(
+            '/api/v1/outcome/bulk',
+            data=json.dumps({
+                'event_id': self.event1.id,
+                'outcomes': [
+                    {'user_id': self.test_user1_id, 'outcome': 'NOT_A_STATUS'},
+                    {'user_id': self.test_user1_id, 'outcome': 'REJECTED'},
+                    {'user_id': test_user2_id, 'outcome': 'WAITLIST'},
+                    {'user_id': test_user2_id, 'outcome': 'ACCEPTED'},
+                    {'user_id': 999, 'outcome': 'ACCEPTED'},
+                    {'user_id': True, 'outcome': 'ACCEPTED'}
+                ]
+            }),
+            content_type='application/json',
+            headers=self.get_auth_header_for('event1admin@email.com'))
+        data = json.loads(response.data)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([r['result'] for r in data],
+                         ['invalid_status', 'created', 'created', 'duplicate', 'user_not_found', 'user_not_found'])
+        self.assertEqual(data[1]['outcome']['status'], 'REJECTED')
+
+        outcomes = outcome_repository.get_all_by_user_for_event(self.test_user1_id, self.event1.id)
+        self.assertEqual(len(outcomes), 3)
+        latest = [o for o in outcomes if o.latest]
+        self.assertEqual(len(latest), 1)
+        self.assertEqual(latest[0].id, data[1]['outcome']['id'])
+        self.assertEqual(latest[0].status, Status.REJECTED)
+
+        latest = outcome_repository.get_latest_by_user_for_event(test_user2_id, self.event1.id)
+        self.assertEqual(latest.status, Status.WAITLIST)
+
+    def test_only_one_latest_outcome(self):
+        """Test that a second latest outcome for a user and event is rejected by the database."""
+        self.seed_static_data()
+        db.session.add(Outcome(self.event1.id, self.test_user1_id, Status.REJECTED, self.event1_admin.id))
+        with self.assertRaises(IntegrityError):
+            db.session.commit()
+        db.session.rollback()
 
+    def test_supersede(self):
+        """Test that supersede replaces the latest outcome."""
+        self.seed_static_data()
+        outcome = Outcome(self.event1.id, self.test_user1_id, Status.REJECTED, self.event1_admin.id)
+        outcome_repository.supersede(outcome)
+        db.session.commit()
 
+        latest = outcome_repository.get_latest_by_user_for_event(self.test_user1_id, self.event1.id)
+        self.assertEqual(latest.id, outcome.id)
+        self.assertEqual(len(outcome_repository.get_all_by_user_for_event(self.test_user1_id, self.event1.id)), 3)
 
+    def test_outcome_list_get_page(self):
+        """Test getting a page of the outcomes for an event."""
+        self.seed_static_data()
+        response = self.app.get(
+            '/api/v1/outcome-list',
+            data={'event_id': self.event1.id, 'page': 2, 'per_page': 1},
+            headers=self.get_auth_header_for('event1admin@email.com'))
+        data = json.loads(response.data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['X-Total-Count'], '2')
+        self.assertEqual([o['id'] for o in data], [self.event1_user2_outcome_id])
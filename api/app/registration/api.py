@@ -7,14 +7,17 @@ from app.registration.models import RegistrationSection
 from app.registration.models import RegistrationQuestion
 from app.registration.models import RegistrationForm
 from app.registration.mixins import RegistrationFormMixin, RegistrationSectionMixin, RegistrationQuestionMixin
+from app.registration.form_loader import RegistrationFormLoader
 from app.utils.auth import verify_token
 import traceback
 from flask import g, request
-from flask_restful import  fields, marshal_with, marshal
+from flask_restful import  fields, marshal_with
 from sqlalchemy.exc import SQLAlchemyError
 from app.events.models import Event
 from app.registration.models import Offer
-from app.registration.mixins import OfferMixin
+from app.registration.mixins import OfferMixin, OfferBulkMixin
+from app.registration.repository import OfferRepository as offer_repository
+from app.users.repository import UserRepository as user_repository
 from app.users.models import AppUser
 from app import db, LOGGER
 from app.utils import errors
@@ -139,10 +142,8 @@ class OfferAPI(OfferMixin, restful.Resource):
             return errors.DUPLICATE_OFFER
 
         existing_outcome = outcome_repository.get_latest_by_user_for_event(user_id, event_id)
-        if existing_outcome:
-            if existing_outcome.status == Status.REJECTED:
-                return errors.CANDIDATE_REJECTED
-            existing_outcome.reset_latest()
+        if existing_outcome and existing_outcome.status == Status.REJECTED:
+            return errors.CANDIDATE_REJECTED
 
         new_outcome = Outcome(
             event_id,
@@ -150,7 +151,7 @@ class OfferAPI(OfferMixin, restful.Resource):
             Status.ACCEPTED,
             g.current_user['id']
         )
-        outcome_repository.add(new_outcome)
+        outcome_repository.supersede(new_outcome)
 
         offer_entity = Offer(
             user_id=user_id,
@@ -206,6 +207,88 @@ class OfferAPI(OfferMixin, restful.Resource):
             return errors.DB_NOT_AVAILABLE
 
 
+class OfferBulkAPI(OfferBulkMixin, restful.Resource):
+    """Make offers to several candidates at once, accepting each of them.
+    Candidates that can't be made an offer are reported per row rather than failing the whole request."""
+
+    @admin_required
+    def post(self):
+        args = self.req_parser.parse_args()
+        event_id = args['event_id']
+        offer_date = datetime.strptime((args['offer_date']), '%Y-%m-%dT%H:%M:%S.%fZ')
+        expiry_date = datetime.strptime((args['expiry_date']), '%Y-%m-%dT%H:%M:%S.%fZ')
+
+        event = db.session.query(Event).filter(Event.id == event_id).first()
+        if not event:
+            return errors.EVENT_NOT_FOUND
+
+        rows = [row if isinstance(row, dict) else {} for row in args['offers']]
+        user_ids = [row['user_id'] for row in rows if misc.is_id(row.get('user_id'))]
+        users = {user.id: user for user in user_repository.get_by_ids(user_ids)}
+        offered_user_ids = set(offer.user_id for offer in offer_repository.get_by_user_ids_for_event(user_ids, event_id))
+        rejected_user_ids = set(outcome.user_id
+                                for outcome in outcome_repository.get_latest_by_users_for_event(event_id, user_ids)
+                                if outcome.status == Status.REJECTED)
+
+        results = []
+        offers = []
+        for row in rows:
+            user_id = row.get('user_id')
+            if not misc.is_id(user_id) or user_id not in users:
+                result = 'user_not_found'
+            elif not all(isinstance(row.get(award, False), bool)
+                         for award in ('payment_required', 'travel_award', 'accommodation_award')):
+                result = 'invalid_row'
+            elif user_id in offered_user_ids:
+                result = 'duplicate_offer'
+            elif user_id in rejected_user_ids:
+                result = 'candidate_rejected'
+            else:
+                result = 'created'
+                offered_user_ids.add(user_id)
+                offers.append(Offer(
+                    user_id=user_id,
+                    event_id=event_id,
+                    offer_date=offer_date,
+                    expiry_date=expiry_date,
+                    payment_required=row.get('payment_required', False),
+                    travel_award=row.get('travel_award', False),
+                    accommodation_award=row.get('accommodation_award', False)
+                ))
+            results.append({'user_id': user_id, 'result': result, 'offer': None})
+
+        created_user_ids = [offer.user_id for offer in offers]
+        try:
+            outcome_repository.reset_latest_for_users(event_id, created_user_ids)
+            outcome_repository.add_all([
+                Outcome(event_id, created_user_id, Status.ACCEPTED, g.current_user['id']) for created_user_id in created_user_ids])
+            offer_repository.add_all(offers)
+            db.session.commit()
+        except SQLAlchemyError as e:
+            LOGGER.error("Failed to add offers for event {} due to {}".format(event_id, e))
+            db.session.rollback()
+            return errors.ADD_OFFER_FAILED
+
+        for offer in offers:
+            email_user(
+                'offer',
+                template_parameters=dict(
+                    host=misc.get_baobab_host(),
+                    expiry_date=offer.expiry_date.strftime("%Y-%m-%d"),
+                    event_email_from=event.email_from
+                ),
+                event=event,
+                user=users[offer.user_id],
+                deferred=True)
+
+        saved = {offer.user_id: offer_info(offer)
+                 for offer in offer_repository.get_by_user_ids_for_event(created_user_ids, event_id)}
+        for result in results:
+            if result['result'] == 'created':
+                result['offer'] = saved[result['user_id']]
+
+        return results, 201
+
 def registration_form_info(registration_form):
     return {
         'registration_form_id': registration_form.id,
@@ -215,40 +298,6 @@ def registration_form_info(registration_form):
 
 class RegistrationFormAPI(RegistrationFormMixin, restful.Resource):
 
-    option_fields = {
-        'value': fields.String,
-        'label': fields.String
-    }
-
-    registration_question_fields = {
-        'id': fields.Integer,
-        'description': fields.String,
-        'headline': fields.String,
-        'placeholder': fields.String,
-        'validation_regex': fields.String,
-        'validation_text': fields.String,
-        'depends_on_question_id': fields.String,
-        'hide_for_dependent_value': fields.String,
-        'type': fields.String,
-        'is_required': fields.Boolean,
-        'order': fields.Integer,
-        'options': fields.List(fields.Nested(option_fields))
-    }
-
-    registration_section_fields = {
-        'id': fields.Integer,
-        'name': fields.String,
-        'description': fields.String,
-        'order': fields.Integer,
-        'registration_questions': fields.List(fields.Nested(registration_question_fields))
-    }
-
-    registration_form_fields = {
-        'id':fields.Integer,
-        'event_id': fields.Integer,
-        'registration_sections': fields.List(fields.Nested(registration_section_fields))
-    }
-
     @auth_required
     def get(self):
         args = self.req_parser.parse_args()
@@ -266,50 +315,11 @@ class RegistrationFormAPI(RegistrationFormMixin, restful.Resource):
             if not offer.candidate_response:
                 return errors.OFFER_NOT_ACCEPTED
 
-            registration_form = db.session.query(RegistrationForm).filter(
-                RegistrationForm.event_id == event_id).first()
-
-            if not registration_form:
-                return errors.REGISTRATION_FORM_NOT_FOUND
-
-            sections = db.session.query(RegistrationSection).filter(
-                RegistrationSection.registration_form_id == registration_form.id).all()
-
-            if not sections:
-                LOGGER.warn(
-                    'Sections not found for event_id: {}'.format(args['event_id']))
-                return errors.SECTION_NOT_FOUND
-
-            included_sections = []
-
-            for section in sections:
-
-                if (section.show_for_travel_award is None) and (section.show_for_accommodation_award is None) and  \
-                        (section.show_for_payment_required is None):
-                    included_sections.append(section)
-
-                elif (section.show_for_travel_award and offer.travel_award and offer.accepted_travel_award) or \
-                        (section.show_for_accommodation_award and offer.accommodation_award and offer.accepted_accommodation_award) or \
-                        (section.show_for_payment_required and offer.payment_required):
-                    included_sections.append(section)
-
-            registration_form.registration_sections = included_sections
-
-            questions = db.session.query(RegistrationQuestion).filter(
-                RegistrationQuestion.registration_form_id == registration_form.id).all()
-
-            if not questions:
-                LOGGER.warn(
-                    'Questions not found for  event_id: {}'.format(args['event_id']))
-                return errors.QUESTION_NOT_FOUND
-
-            for s in registration_form.registration_sections:
-                s.registration_questions = []
-                for q in questions:
-                    if q.section_id == s.id:
-                        s.registration_questions.append(q)
-
-            return marshal(registration_form, self.registration_form_fields), 201
+            return RegistrationFormLoader.load(
+                event_id,
+                travel_award=offer.travel_award and offer.accepted_travel_award,
+                accommodation_award=offer.accommodation_award and offer.accepted_accommodation_award,
+                payment_required=offer.payment_required), 201
 
         except SQLAlchemyError as e:
             LOGGER.error("Database error encountered: {}".format(e))
@@ -444,7 +454,8 @@ def registration_question_info(registration_question):
         'validation_text': registration_question.validation_text,
         'order': registration_question.order,
         'options': registration_question.options,
-        'is_required': registration_question.is_required
+        'is_required': registration_question.is_required,
+        'key': registration_question.key
     }
 
 
@@ -493,6 +504,8 @@ class RegistrationQuestionAPI(RegistrationQuestionMixin, restful.Resource):
         order = args['order']
         options = args['options']
         is_required = args['is_required']
+        # Questions whose answers are used elsewhere must have a key, see RegistrationQuestion
+        key = args.get('key')
 
         registration_form = db.session.query(RegistrationForm).filter(
             RegistrationForm.id == registration_form_id).first()
@@ -516,7 +529,8 @@ class RegistrationQuestionAPI(RegistrationQuestionMixin, restful.Resource):
             validation_text=validation_text,
             order=order,
             options=options,
-            is_required=is_required
+            is_required=is_required,
+            key=key
         )
 
         db.session.add(registration_question)
@@ -0,0 +1,115 @@
+from flask_restful import fields, marshal
+
+from app import db, LOGGER
+from app.registration.models import RegistrationForm, RegistrationSection, RegistrationQuestion
+from app.utils import errors
+from app.utils.cache import ModelCache
+
+option_fields = {
+    'value': fields.String,
+    'label': fields.String
+}
+
+registration_question_fields = {
+    'id': fields.Integer,
+    'key': fields.String,
+    'description': fields.String,
+    'headline': fields.String,
+    'placeholder': fields.String,
+    'validation_regex': fields.String,
+    'validation_text': fields.String,
+    'depends_on_question_id': fields.String,
+    'hide_for_dependent_value': fields.String,
+    'type': fields.String,
+    'is_required': fields.Boolean,
+    'order': fields.Integer,
+    'options': fields.List(fields.Nested(option_fields))
+}
+
+registration_section_fields = {
+    'id': fields.Integer,
+    'name': fields.String,
+    'description': fields.String,
+    'order': fields.Integer,
+    'registration_questions': fields.List(fields.Nested(registration_question_fields))
+}
+
+registration_form_fields = {
+    'id': fields.Integer,
+    'event_id': fields.Integer,
+    'registration_sections': fields.List(fields.Nested(registration_section_fields))
+}
+
+
+def _is_section_visible(section, travel_award, accommodation_award, payment_required):
+    if (section.show_for_travel_award is None) and (section.show_for_accommodation_award is None) and \
+            (section.show_for_payment_required is None):
+        return True
+
+    return bool((section.show_for_travel_award and travel_award) or
+                (section.show_for_accommodation_award and accommodation_award) or
+                (section.show_for_payment_required and payment_required))
+
+
+# Forms are grouped by form id
+_forms = ModelCache('registration_form')
+_forms.depends_on(RegistrationSection, lambda section: section.registration_form_id)
+_forms.depends_on(RegistrationQuestion, lambda question: question.registration_form_id)
+
+
+class RegistrationFormLoader():
+    """Assembles the marshalled registration form shown to a user and caches it per form and
+    award visibility, since every user with the same awards sees the same form.
+    Cached forms are dropped when one of their sections or questions is changed."""
+
+    @classmethod
+    def load(cls, event_id, travel_award=False, accommodation_award=False, payment_required=False):
+        """Get the registration form for an event, showing the sections for the given (accepted) awards.
+        Returns the marshalled form, or an error tuple."""
+        form_id = db.session.query(RegistrationForm.id).filter(RegistrationForm.event_id == event_id).scalar()
+        if form_id is None:
+            return errors.REGISTRATION_FORM_NOT_FOUND
+
+        key = (form_id, bool(travel_award), bool(accommodation_award), bool(payment_required))
+        return _forms.load(key, form_id, lambda: cls._build(event_id, *key))
+
+    @classmethod
+    def _build(cls, event_id, form_id, travel_award, accommodation_award, payment_required):
+        registration_form = cls._assemble(event_id, form_id, travel_award, accommodation_award, payment_required)
+        # Don't cache errors
+        return registration_form, 0 if isinstance(registration_form, tuple) else None
+
+    @classmethod
+    def _assemble(cls, event_id, form_id, travel_award, accommodation_award, payment_required):
+        sections = (db.session.query(RegistrationSection)
+                    .filter(RegistrationSection.registration_form_id == form_id)
+                    .order_by(RegistrationSection.order, RegistrationSection.id)
+                    .all())
+        sections = [s for s in sections if _is_section_visible(s, travel_award, accommodation_award, payment_required)]
+        if not sections:
+            LOGGER.warn('Sections not found for event_id: {}'.format(event_id))
+            return errors.SECTION_NOT_FOUND
+
+        questions = (db.session.query(RegistrationQuestion)
+                     .filter(RegistrationQuestion.registration_form_id == form_id)
+                     .order_by(RegistrationQuestion.order, RegistrationQuestion.id)
+                     .all())
+        if not questions:
+            LOGGER.warn('Questions not found for  event_id: {}'.format(event_id))
+            return errors.QUESTION_NOT_FOUND
+
+        questions_by_section = {}
+        for question in questions:
+            questions_by_section.setdefault(question.section_id, []).append(question)
+
+        return marshal({
+            'id': form_id,
+            'event_id': event_id,
+            'registration_sections': [{
+                'id': section.id,
+                'name': section.name,
+                'description': section.description,
+                'order': section.order,
+                'registration_questions': questions_by_section.get(section.id, [])
+            } for section in sections]
+        }, registration_form_fields)
@@ -20,6 +20,14 @@ class OfferMixin(object):
     req_parser.add_argument('email_template', type=str, required=False)
 
 
+class OfferBulkMixin(object):
+    req_parser = reqparse.RequestParser()
+    req_parser.add_argument('event_id', type=int, required=True, location='json')
+    req_parser.add_argument('offer_date', type=str, required=True, location='json')
+    req_parser.add_argument('expiry_date', type=str, required=True, location='json')
+    req_parser.add_argument('offers', type=list, required=True, location='json')
+
+
 class RegistrationFormMixin(object):
     req_parser = reqparse.RequestParser()
     req_parser.add_argument('event_id', type=int, required=True)
@@ -1,11 +1,13 @@
 from app import db
 from datetime import datetime, date, time
-from sqlalchemy import func
 
 
 class Offer(db.Model):
 
     __tablename__ = "offer"
+    __table_args__ = (
+        db.Index('ix_offer_user_event', 'user_id', 'event_id'),
+    )
 
     id = db.Column(db.Integer(), primary_key=True)
     user_id = db.Column(db.Integer(),  db.ForeignKey(
@@ -66,25 +68,16 @@ class RegistrationSection(db.Model):
         self.show_for_travel_award = show_for_travel_award
 
 
-def get_registration_answer_based_headline(user_id, headline):
-    question = db.session.query(RegistrationQuestion).filter(
-        func.lower(RegistrationQuestion.headline) == func.lower(headline)).first()
-    answer = None
-    if question is not None:
-        answer = (
-            db.session.query(RegistrationAnswer)
-            .join(Registration, RegistrationAnswer.registration_id == Registration.id)
-            .join(Offer, Offer.id == Registration.offer_id)
-            .filter(Offer.user_id == user_id)
-            .filter(RegistrationAnswer.registration_question_id == question.id)
-            .first()
-        )
-    return answer
-
-
 class RegistrationQuestion(db.Model):
+    """A question on an event's registration form. key identifies questions whose answers are
+    used elsewhere: check-in shows the 'tshirt_size' and 'bringing_poster' answers, and the invitation
+    letter mentions the poster. Answers are only looked up by key, so a new form must give those
+    questions their keys; a question without one is never matched on its headline."""
 
     __tablename__ = "registration_question"
+    __table_args__ = (
+        db.Index('ix_registration_question_form_key', 'registration_form_id', 'key'),
+    )
 
     id = db.Column(db.Integer(), primary_key=True)
     registration_form_id = db.Column(db.Integer(), db.ForeignKey(
@@ -104,8 +97,9 @@ class RegistrationQuestion(db.Model):
     depends_on_question_id = db.Column(db.Integer(), db.ForeignKey(
         "registration_question.id"), nullable=True)
     hide_for_dependent_value = db.Column(db.String(), nullable=True)
+    key = db.Column(db.String(255), nullable=True)
 
-    def __init__(self, registration_form_id, section_id, headline, placeholder, order, type, validation_regex, validation_text=None, is_required=True, description=None, options=None):
+    def __init__(self, registration_form_id, section_id, headline, placeholder, order, type, validation_regex, validation_text=None, is_required=True, description=None, options=None, key=None):
         self.registration_form_id = registration_form_id
         self.section_id = section_id
         self.headline = headline
@@ -117,6 +111,7 @@ class RegistrationQuestion(db.Model):
         self.is_required = is_required
         self.validation_regex = validation_regex
         self.validation_text = validation_text
+        self.key = key
 
 # Registration
 
@@ -146,6 +141,9 @@ class Registration(db.Model):
 
 class RegistrationAnswer(db.Model):
     __tablename__ = "registration_answer"
+    __table_args__ = (
+        db.Index('ix_registration_answer_registration_question', 'registration_id', 'registration_question_id'),
+    )
 
     id = db.Column(db.Integer(), primary_key=True)
     registration_id = db.Column(db.Integer(), db.ForeignKey(
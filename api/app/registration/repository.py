@@ -1,5 +1,5 @@
 from app import db
-from app.registration.models import Offer, Registration, RegistrationForm
+from app.registration.models import Offer, Registration, RegistrationForm, RegistrationQuestion, RegistrationAnswer
 from sqlalchemy import and_, func, cast, Date
 
 
@@ -9,6 +9,22 @@ class OfferRepository():
     def get_by_user_id_for_event(user_id, event_id):
         return db.session.query(Offer).filter_by(user_id=user_id, event_id=event_id).first()
 
+    @staticmethod
+    def get_by_user_id_for_events(user_id, event_ids):
+        return (db.session.query(Offer)
+                .filter(Offer.user_id == user_id, Offer.event_id.in_(event_ids))
+                .order_by(Offer.id)
+                .all())
+
+    @staticmethod
+    def get_by_user_ids_for_event(user_ids, event_id):
+        return db.session.query(Offer).filter(Offer.user_id.in_(user_ids), Offer.event_id == event_id).all()
+
+    @staticmethod
+    def add_all(offers):
+        """Insert several offers with a single executemany, without loading their ids."""
+        db.session.bulk_save_objects(offers)
+
     @staticmethod
     def count_offers_allocated(event_id):
         count = (db.session.query(Offer)
@@ -56,4 +72,19 @@ class RegistrationRepository():
                         .group_by(cast(Registration.created_at, Date))
                         .order_by(cast(Registration.created_at, Date))
                         .all())
-        return timeseries
\ No newline at end of file
+        return timeseries
+
+    @staticmethod
+    def get_answers_by_question_keys(user_id, event_id, keys):
+        """Get a user's registration answers for an event as a dict of question key to answer value.
+        Keys the user has no answer for are left out."""
+        answers = (db.session.query(RegistrationQuestion.key, RegistrationAnswer.value)
+                        .join(RegistrationAnswer, RegistrationAnswer.registration_question_id == RegistrationQuestion.id)
+                        .join(Registration, RegistrationAnswer.registration_id == Registration.id)
+                        .join(Offer, Registration.offer_id == Offer.id)
+                        .filter(Offer.user_id == user_id,
+                                Offer.event_id == event_id,
+                                RegistrationQuestion.registration_form_id == Registration.registration_form_id,
+                                RegistrationQuestion.key.in_(keys))
+                        .all())
+        return dict(answers)
@@ -0,0 +1,89 @@
+from app import db
+from app.registration.models import RegistrationQuestion
+
+
+def get_answer_value(value, question):
+    """Get the display value of an answer, e.g. the label of the chosen option."""
+    if question.type == 'multi-choice' and question.options is not None:
+        labels = [o['label'] for o in question.options if o['value'] == value]
+        if not labels:
+            return value
+        return labels[0]
+
+    if question.type == 'file' and value:
+        return 'Uploaded File'
+
+    return value
+
+
+def get_form_questions(registration_form_id, question_ids):
+    """Get the questions with the given ids that belong to the registration form, as a dict by id."""
+    if not question_ids:
+        return {}
+    questions = db.session.query(RegistrationQuestion).filter(
+        RegistrationQuestion.registration_form_id == registration_form_id,
+        RegistrationQuestion.id.in_(set(question_ids))).all()
+    return {question.id: question for question in questions}
+
+
+def save_answers(answer_model, registration_id_field, registration_id, registration_form_id, answers, new_registration,
+                 skip_unknown_questions=True):
+    """Insert or update the answers to a (guest) registration without committing.
+
+    answer_model is RegistrationAnswer or GuestRegistrationAnswer and registration_id_field the name of
+    its column referring to the registration. Answers to questions that aren't on the registration form
+    are skipped, or if skip_unknown_questions is False nothing is saved. Returns (answer_values, questions_by_id,
+    unknown_question_ids) where answer_values is a list of (question_id, value) of all the registration's answers,
+    for building the confirmation email."""
+    existing = []
+    if not new_registration:
+        existing = (db.session.query(answer_model)
+                    .filter(getattr(answer_model, registration_id_field) == registration_id)
+                    .order_by(answer_model.id)
+                    .all())
+    existing_by_question = {answer.registration_question_id: answer for answer in existing}
+
+    submitted_ids = [answer['registration_question_id'] for answer in answers]
+    questions_by_id = get_form_questions(registration_form_id, submitted_ids + list(existing_by_question.keys()))
+    unknown_question_ids = [question_id for question_id in submitted_ids if question_id not in questions_by_id]
+    if unknown_question_ids and not skip_unknown_questions:
+        return None, questions_by_id, unknown_question_ids
+
+    new_answers = []
+    new_values = {}
+    for answer_args in answers:
+        question_id = answer_args['registration_question_id']
+        if question_id not in questions_by_id:
+            continue
+        answer = existing_by_question.get(question_id)
+        if answer is not None:
+            answer.value = answer_args['value']
+        elif question_id in new_values:
+            # The same question was answered twice, keep the last answer
+            new_values[question_id]['value'] = answer_args['value']
+        else:
+            new_values[question_id] = {
+                registration_id_field: registration_id,
+                'registration_question_id': question_id,
+                'value': answer_args['value']
+            }
+            new_answers.append(new_values[question_id])
+
+    if new_answers:
+        # A single multi-row INSERT rather than one statement per answer
+        db.session.execute(answer_model.__table__.insert().values(new_answers))
+    db.session.flush()
+
+    answer_values = ([(a.registration_question_id, a.value) for a in existing] +
+                     [(a['registration_question_id'], a['value']) for a in new_answers])
+    return answer_values, questions_by_id, unknown_question_ids
+
+
+def build_summary(answer_values, questions_by_id):
+    """Build the question and answer summary included in confirmation emails."""
+    summary = ""
+    for question_id, value in answer_values:
+        question = questions_by_id.get(question_id)
+        if question is not None:
+            summary += "Question:" + question.headline + "\nAnswer:" + get_answer_value(value, question) + "\n"
+    return summary
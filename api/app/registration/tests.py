@@ -3,15 +3,19 @@ from app.registration.models import RegistrationQuestion
 from app.registration.models import RegistrationSection
 import json
 from datetime import datetime, timedelta
-from app import db, LOGGER
+from app import app, db, LOGGER
 from app.utils.testing import ApiTestCase
 from app.users.models import AppUser, UserCategory, Country
 from app.events.models import Event
 from app.registration.models import Offer
 from app.organisation.models import Organisation
 from app.outcome.repository import OutcomeRepository as outcome_repository
-from app.outcome.models import Status
+from app.outcome.models import Outcome, Status
 from app.responses.models import Response
+from app.registration.models import Registration, RegistrationAnswer
+from app.registration.repository import RegistrationRepository as registration_repository
+from app.registration.form_loader import RegistrationFormLoader
+from app.utils import errors
 
 
 OFFER_DATA = {
@@ -154,6 +158,57 @@ class OfferApiTest(ApiTestCase):
 
         self.assertEqual(response.status_code, 409)
 
+    def test_create_offers_bulk(self):
+        self.seed_static_data(add_offer=True)
+        second_user_id = self.add_user('second@email.com').id
+        rejected_user_id = self.add_user('rejected@email.com').id
+        db.session.add(Outcome(1, rejected_user_id, Status.REJECTED, 1))
+        db.session.commit()
+
+        response = self.app.post('/api/v1/offer/bulk', data=json.dumps({
+            'event_id': 1,
+            'offer_date': OFFER_DATA['offer_date'],
+            'expiry_date': OFFER_DATA['expiry_date'],
+            'offers': [
+                {'user_id': 1, 'travel_award': True},
+                {'user_id': second_user_id, 'travel_award': True},
+                {'user_id': rejected_user_id},
+                {'user_id': 999}
+            ]
+        }), content_type='application/json', headers=self.adminHeaders)
+        data = json.loads(response.data)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([r['result'] for r in data],
+                         ['duplicate_offer', 'created', 'candidate_rejected', 'user_not_found'])
+        self.assertTrue(data[1]['offer']['travel_award'])
+        self.assertFalse(data[1]['offer']['accommodation_award'])
+
+        offer = db.session.query(Offer).get(data[1]['offer']['id'])
+        self.assertEqual(offer.user_id, second_user_id)
+        outcome = outcome_repository.get_latest_by_user_for_event(second_user_id, 1)
+        self.assertEqual(outcome.status, Status.ACCEPTED)
+
+    def test_create_offers_bulk_invalid_rows(self):
+        self.seed_static_data()
+        second_user_id = self.add_user('second@email.com').id
+
+        response = self.app.post('/api/v1/offer/bulk', data=json.dumps({
+            'event_id': 1,
+            'offer_date': OFFER_DATA['offer_date'],
+            'expiry_date': OFFER_DATA['expiry_date'],
+            'offers': [
+                {'user_id': True},
+                {'user_id': second_user_id, 'travel_award': 'false'},
+                {'user_id': second_user_id, 'payment_required': 1}
+            ]
+        }), content_type='application/json', headers=self.adminHeaders)
+        data = json.loads(response.data)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([r['result'] for r in data], ['user_not_found', 'invalid_row', 'invalid_row'])
+        self.assertIsNone(db.session.query(Offer).filter_by(user_id=second_user_id).first())
+
     def test_get_offer(self):
         self.seed_static_data(add_offer=True)
 
@@ -322,3 +377,64 @@ class RegistrationTest(ApiTestCase):
         form = json.loads(response.data)
         assert form['registration_sections'][0]['registration_questions'][0]['type'] == 'short-text'
         assert form['registration_sections'][0]['name'] == 'Section 1'
+
+    def test_get_form_refreshed_when_question_added(self):
+        """Check that a cached form is dropped when one of its questions changes."""
+        self.seed_static_data()
+        url = "/api/v1/registration-form?offer_id=%d&event_id=%d" % (self.offer_id, self.event_id)
+        form = json.loads(self.app.get(url, headers=self.headers).data)
+        self.assertEqual(len(form['registration_sections'][0]['registration_questions']), 1)
+
+        question = RegistrationQuestion(form['id'], form['registration_sections'][0]['id'], 'New question', '', 2,
+                                        'short-text', None, description='New question', key='new_question')
+        db.session.add(question)
+        db.session.commit()
+
+        form = json.loads(self.app.get(url, headers=self.headers).data)
+        questions = form['registration_sections'][0]['registration_questions']
+        self.assertEqual([q['key'] for q in questions], [None, 'new_question'])
+
+    def test_form_sections_depend_on_awards(self):
+        """Check that sections tied to an award are only included for users with that award."""
+        self.seed_static_data()
+
+        with app.test_request_context():
+            form = RegistrationFormLoader.load(self.event_id, travel_award=True)
+            self.assertEqual([s['name'] for s in form['registration_sections']], ['Section 1', 'Section 2'])
+            self.assertEqual(RegistrationFormLoader.load(self.event_id), errors.SECTION_NOT_FOUND)
+
+
+class RegistrationAnswerKeyTest(ApiTestCase):
+
+    def seed_static_data(self):
+        self.user = self.add_user('attendee@mail.com')
+        self.add_event(key='EVENT1')
+        self.add_event(key='EVENT2')
+
+        for event_id, shirt_size in [(1, 'M'), (2, 'XL')]:
+            offer = self.add_offer(self.user.id, event_id=event_id)
+            form = self.create_registration_form(event_id=event_id)
+            section = RegistrationSection(form.id, 'Section', 'description', 1, None, None, None)
+            db.session.add(section)
+            db.session.commit()
+            shirt = RegistrationQuestion(form.id, section.id, 'T-Shirt Size', '', 1, 'multi-choice', None,
+                                         description='T-Shirt Size', key='tshirt_size')
+            poster = RegistrationQuestion(form.id, section.id, 'Poster?', '', 2, 'short-text', None,
+                                          description='Poster?', key='bringing_poster')
+            db.session.add_all([shirt, poster])
+            db.session.commit()
+            registration = Registration(offer.id, form.id, confirmed=True)
+            db.session.add(registration)
+            db.session.commit()
+            db.session.add(RegistrationAnswer(registration_id=registration.id,
+                                              registration_question_id=shirt.id, value=shirt_size))
+            db.session.commit()
+
+    def test_get_answers_by_question_keys(self):
+        """Check that answers are keyed by question key and limited to the event's registration."""
+        self.seed_static_data()
+
+        answers = registration_repository.get_answers_by_question_keys(
+            self.user.id, 2, ['tshirt_size', 'bringing_poster', 'unknown'])
+
+        self.assertEqual(answers, {'tshirt_size': 'XL'})
@@ -1,12 +1,13 @@
 from datetime import date, datetime
 import traceback
-from flask_restful import reqparse, fields, marshal_with, marshal
+from flask_restful import fields, marshal_with, marshal
 import flask_restful as restful
 from flask import g, request
 from sqlalchemy.exc import SQLAlchemyError
 from app.utils.auth import verify_token
 from app.registrationResponse.mixins import RegistrationResponseMixin, RegistrationAdminMixin, RegistrationConfirmMixin
-from app.registration.models import Offer, Registration, RegistrationAnswer, RegistrationForm, RegistrationQuestion
+from app.registration.models import Offer, Registration, RegistrationAnswer, RegistrationForm
+from app.registration import submission
 from app.users.models import AppUser
 from app.events.models import Event
 from app.utils.auth import auth_required, admin_required
@@ -18,25 +19,13 @@ from app.users.repository import UserRepository as user_repository
 from app.registrationResponse.repository import RegistrationRepository
 from app.guestRegistrations.repository import GuestRegistrationRepository
 from app.events.repository import EventRepository as event_repository
+from app.roster.repository import RosterRepository as roster_repository
 import itertools
 
 
 from app import db
 
 
-def _get_answer_value(answer, question):
-    if question.type == 'multi-choice' and question.options is not None:
-        value = [o for o in question.options if o['value'] == answer.value]
-        if not value:
-            return answer.value
-        return value[0]['label']
-
-    if question.type == 'file' and answer.value:
-        return 'Uploaded File'
-
-    return answer.value
-
-
 class RegistrationApi(RegistrationResponseMixin, restful.Resource):
     answer_fields = {
         'id': fields.Integer,
@@ -102,7 +91,6 @@ class RegistrationApi(RegistrationResponseMixin, restful.Resource):
     @auth_required
     def post(self):
         # Save a new response for the logged-in user.
-        req_parser = reqparse.RequestParser()
         args = self.req_parser.parse_args()
         offer_id = args['offer_id']
 
@@ -133,27 +121,16 @@ class RegistrationApi(RegistrationResponseMixin, restful.Resource):
             )
 
             db.session.add(registration)
-            db.session.commit()
-
-            event = event_repository.get_by_id(registration_form.event_id)
-
-            for answer_args in args['answers']:
-                if db.session.query(RegistrationQuestion).filter(
-                        RegistrationQuestion.id == answer_args['registration_question_id']).first():
-
-                    answer = RegistrationAnswer(registration_id=registration.id,
-                                                registration_question_id=answer_args['registration_question_id'],
-                                                value=answer_args['value'])
+            db.session.flush()
 
-                    db.session.add(answer)
+            answer_values, questions_by_id, _ = submission.save_answers(
+                RegistrationAnswer, 'registration_id', registration.id, registration_form.id,
+                args['answers'], new_registration=True)
+            roster_repository.refresh(offer.event_id, [offer.user_id])
             db.session.commit()
 
-            registration_answers = db.session.query(RegistrationAnswer).filter(
-                RegistrationAnswer.registration_id == registration.id).all()
-            registration_questions = db.session.query(RegistrationQuestion).filter(
-                RegistrationQuestion.registration_form_id == args['registration_form_id']).all()
-
-            self.send_confirmation(current_user, registration_questions, registration_answers, registration.confirmed, event)
+            event = event_repository.get_by_id(registration_form.event_id)
+            self.send_confirmation(current_user, questions_by_id, answer_values, registration.confirmed, event)
 
             # 201 is 'CREATED' status code
             return marshal(registration, self.registration_fields), 201
@@ -165,13 +142,10 @@ class RegistrationApi(RegistrationResponseMixin, restful.Resource):
             LOGGER.error("Encountered unknown error: {}".format(
                 traceback.format_exc()))
             return errors.DB_NOT_AVAILABLE
-        
-            
 
     @auth_required
     def put(self):
         # Update an existing response for the logged-in user.
-        req_parser = reqparse.RequestParser()
         args = self.req_parser.parse_args()
         try:
             user_id = verify_token(request.headers.get('Authorization'))['id']
@@ -190,63 +164,37 @@ class RegistrationApi(RegistrationResponseMixin, restful.Resource):
             if db_offer.user_id != user_id:
                 return errors.FORBIDDEN
 
-            registration.registration_form_id = args['registration_form_id']
-            db.session.commit()
-
-            for answer_args in args['answers']:
-                answer = db.session.query(RegistrationAnswer).filter(
-                    RegistrationAnswer.registration_question_id == answer_args[
-                        'registration_question_id'],
-                    RegistrationAnswer.registration_id == args['registration_id']).one_or_none()
-                if answer is not None:
-                    answer.value = answer_args['value']
+            registration_form = db.session.query(RegistrationForm).filter(
+                RegistrationForm.id == args['registration_form_id']).first()
 
-                elif db.session.query(RegistrationQuestion).filter(
-                        RegistrationQuestion.id == answer_args['registration_question_id']).one():
+            if not registration_form:
+                return errors.REGISTRATION_FORM_NOT_FOUND
 
-                    answer = RegistrationAnswer(registration_id=registration.id,
-                                                registration_question_id=answer_args['registration_question_id'],
-                                                value=answer_args['value'])
+            answer_values, questions_by_id, unknown_question_ids = submission.save_answers(
+                RegistrationAnswer, 'registration_id', registration.id, registration_form.id,
+                args['answers'], new_registration=False, skip_unknown_questions=False)
+            if unknown_question_ids:
+                return errors.REGISTRATION_QUESTION_NOT_FOUND
 
-                    db.session.add(answer)
+            registration.registration_form_id = registration_form.id
             db.session.commit()
 
             current_user = user_repository.get_by_id(user_id)
-
-            registration_answers = db.session.query(RegistrationAnswer).filter(
-                RegistrationAnswer.registration_id == registration.id).all()
-                
-            registration_questions = db.session.query(RegistrationQuestion).filter(
-                RegistrationQuestion.registration_form_id == args['registration_form_id']).all()
-
-            registration_form = db.session.query(RegistrationForm).filter(
-                RegistrationForm.id == args['registration_form_id']).first()
-
             event = event_repository.get_by_id(registration_form.event_id)
 
             self.send_confirmation(
-                current_user, registration_questions, registration_answers, registration.confirmed, event)
+                current_user, questions_by_id, answer_values, registration.confirmed, event)
 
             return 200
         except Exception as e:
             return 'Could not access DB', 400
 
-    def send_confirmation(self, user, questions, answers, confirmed, event):
-        if answers is None:
+    def send_confirmation(self, user, questions_by_id, answer_values, confirmed, event):
+        if not answer_values:
             LOGGER.warn(
                 'Found no answers associated with response with id {response_id}'.format(response_id=user.id))
-        if questions is None:
-            LOGGER.warn(
-                'Found no questions associated with application form with id {form_id}'.format(form_id=user.id))
         try:
-            # Building the summary, where the summary is a dictionary whose key is the question headline, and the value
-            # is the relevant answer
-            summary = ""
-            for answer in answers:
-                for question in questions:
-                    if answer.registration_question_id == question.id:
-                        summary += "Question:" + question.headline + "\nAnswer:" + _get_answer_value(
-                                answer, question) + "\n"
+            summary = submission.build_summary(answer_values, questions_by_id)
 
             emailer.email_user(
                 'registration-with-confirmation' if confirmed else 'registration-pending-confirmation',
@@ -254,7 +202,8 @@ class RegistrationApi(RegistrationResponseMixin, restful.Resource):
                     summary=summary
                 ),
                 event=event,
-                user=user)
+                user=user,
+                deferred=True)
 
         except Exception as e:
             LOGGER.error('Could not send confirmation email for response with id : {response_id}'.format(
@@ -404,6 +353,7 @@ class RegistrationConfirmAPI(RegistrationConfirmMixin, restful.Resource):
             if _send_registration_confirmation_mail(registration_user, registration_event):
                 registration.confirmation_email_sent_at = datetime.now()
 
+            roster_repository.refresh(offer.event_id, [offer.user_id])
             db.session.commit()
             return 'Confirmed Registration for {} {}'.format(registration_user.firstname, registration_user.lastname), 200
 
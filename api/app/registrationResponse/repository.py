@@ -27,6 +27,16 @@ class RegistrationRepository():
             Offer.event_id == event_id
         ).first()
 
+    @staticmethod
+    def get_by_user_id_for_events(user_id, event_ids):
+        """Get the user's registrations for several events as (event_id, Registration), ordered by id."""
+        return db.session.query(Offer.event_id, Registration).join(
+            Offer, Registration.offer_id == Offer.id
+        ).filter(
+            Offer.user_id == user_id,
+            Offer.event_id.in_(event_ids)
+        ).order_by(Registration.id).all()
+
     @staticmethod
     def get_all_for_event(event_id):
         """Get all registrations for an event"""
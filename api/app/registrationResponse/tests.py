@@ -1,4 +1,4 @@
-from app.registration.models import RegistrationForm, Registration
+from app.registration.models import RegistrationForm, Registration, RegistrationAnswer
 from app.registration.models import RegistrationSection
 import json
 from datetime import datetime, timedelta
@@ -9,6 +9,9 @@ from app.registration.models import Offer
 from app.registration.models import RegistrationQuestion
 from app import app, db
 from app.organisation.models import Organisation
+from app.email_template.models import EmailTemplate
+from app.utils.errors import REGISTRATION_QUESTION_NOT_FOUND
+from mock import patch
 
 
 class RegistrationApiTest(ApiTestCase):
@@ -327,6 +330,69 @@ class RegistrationApiTest(ApiTestCase):
             self.assertEqual(response.status_code, 404)
 
 
+    def test_update_upserts_answers(self):
+        """Test that an update changes existing answers, adds new ones and emails a summary of all of them."""
+        with app.app_context():
+            self.seed_static_data()
+            db.session.query(EmailTemplate).update({'template': '{summary}'})
+            db.session.commit()
+            question_ids = [self.question.id, self.question2.id, self.question3.id]
+            registration_data = {
+                'offer_id': self.offer.id,
+                'registration_form_id': self.form.id,
+                'answers': [{'registration_question_id': question_ids[0], 'value': 'Answer 1'},
+                            {'registration_question_id': 999, 'value': 'Not on the form'}]
+            }
+            response = self.app.post(
+                '/api/v1/registration-response',
+                data=json.dumps(registration_data),
+                content_type='application/json',
+                headers=self.headers)
+            registration_id = json.loads(response.data)['id']
+
+            put_registration_data = {
+                'registration_id': registration_id,
+                'offer_id': self.offer.id,
+                'registration_form_id': self.form.id,
+                'answers': [{'registration_question_id': question_ids[0], 'value': 'Updated 1'},
+                            {'registration_question_id': question_ids[2], 'value': 'Answer 3'}]
+            }
+            with patch('app.utils.emailer.send_mail') as send_mail:
+                response = self.app.put(
+                    '/api/v1/registration-response',
+                    data=json.dumps(put_registration_data),
+                    content_type='application/json',
+                    headers=self.headers)
+
+            self.assertEqual(response.status_code, 200)
+            answers = db.session.query(RegistrationAnswer).filter_by(
+                registration_id=registration_id).order_by(RegistrationAnswer.id).all()
+            self.assertEqual([(a.registration_question_id, a.value) for a in answers],
+                             [(question_ids[0], 'Updated 1'), (question_ids[2], 'Answer 3')])
+            body = send_mail.call_args[1]['body_text']
+            self.assertIn('Updated 1', body)
+            self.assertIn('Answer 3', body)
+
+    def test_update_unknown_question(self):
+        """Test that an update with an answer to a question that isn't on the form is rejected."""
+        with app.app_context():
+            self.seed_static_data(create_registration=True)
+            put_registration_data = {
+                'registration_id': self.registration1.id,
+                'offer_id': self.offer.id,
+                'registration_form_id': self.form.id,
+                'answers': [{'registration_question_id': self.question.id, 'value': 'Answer 1'},
+                            {'registration_question_id': 999, 'value': 'Not on the form'}]
+            }
+            response = self.app.put(
+                '/api/v1/registration-response',
+                data=json.dumps(put_registration_data),
+                content_type='application/json',
+                headers=self.headers)
+
+            self.assertEqual(response.status_code, REGISTRATION_QUESTION_NOT_FOUND[1])
+            self.assertEqual(db.session.query(RegistrationAnswer).count(), 0)
+
     def test_get_unconfirmed_not_event_admin(self):
         with app.app_context():
             self.seed_static_data()
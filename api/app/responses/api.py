@@ -2,22 +2,23 @@ import datetime
 import traceback
 
 import flask_restful as restful
-from flask import g, request
+from flask import Response as FlaskResponse, g, request, stream_with_context
 from flask_restful import fields, marshal_with, reqparse
 from sqlalchemy.exc import SQLAlchemyError
 
-from app import LOGGER, bcrypt, db
+from app import LOGGER, db
 from app.applicationModel.repository import ApplicationFormRepository as application_form_repository
 from app.applicationModel.models import ApplicationForm, Question
 from app.events.models import Event, EventType
 from app.events.repository import EventRepository as event_repository
-from app.responses.mixins import ResponseMixin
+from app.responses.mixins import ResponseMixin, ResponseExportMixin
+from app.responses import export
 from app.responses.models import Answer, Response
 from app.responses.repository import ResponseRepository as response_repository
 from app.users.models import AppUser
 from app.users.repository import UserRepository as user_repository
 from app.utils import emailer, errors, strings
-from app.utils.auth import auth_required
+from app.utils.auth import auth_required, event_admin_required
 
 
 class ResponseAPI(ResponseMixin, restful.Resource):
@@ -94,7 +95,7 @@ class ResponseAPI(ResponseMixin, restful.Resource):
 
         try:
             if response.is_submitted:
-                LOGGER.info('Sending confirmation email for response with ID : {id}'.format(id=response.id))
+                LOGGER.info('Sending confirmation email for response with ID : %s', response.id)
                 user = user_repository.get_by_id(user_id)
                 response = response_repository.get_by_id_and_user_id(response.id, user_id)
                 self.send_confirmation(user, response)
@@ -137,7 +138,7 @@ class ResponseAPI(ResponseMixin, restful.Resource):
 
         try:
             if response.is_submitted:
-                LOGGER.info('Sending confirmation email for response with ID : {id}'.format(id=response.id))
+                LOGGER.info('Sending confirmation email for response with ID : %s', response.id)
                 user = user_repository.get_by_id(user_id)
                 response = response_repository.get_by_id_and_user_id(response.id, user_id)
                 self.send_confirmation(user, response)
@@ -186,7 +187,7 @@ class ResponseAPI(ResponseMixin, restful.Resource):
             if not answers:
                 LOGGER.warn('Found no answers associated with response with id {response_id}'.format(response_id=response.id))
 
-            application_form = response.application_form
+            application_form = application_form_repository.get_by_id_with_contents(response.application_form_id)
             if application_form is None:
                 LOGGER.warn('Found no application form with id {form_id}'.format(form_id=response.application_form_id))
 
@@ -216,3 +217,29 @@ class ResponseAPI(ResponseMixin, restful.Resource):
 
         except Exception as e:
             LOGGER.error('Could not send confirmation email for response with id : {response_id} due to: {e}'.format(response_id=response.id, e=e))
+
+
+class ResponseExportAPI(ResponseExportMixin, restful.Resource):
+    """Download every response to an event's application form with the applicant's profile and answers,
+    one row per response, for offline selection. The export is streamed so memory use doesn't grow
+    with the number of responses."""
+
+    @event_admin_required
+    def get(self, event_id):
+        args = self.req_parser.parse_args()
+
+        event = event_repository.get_by_id(event_id)
+        if not event:
+            return errors.EVENT_NOT_FOUND
+        if not event.has_application_form():
+            return errors.FORM_NOT_FOUND
+
+        export_format = args['format']
+        chunks = export.export_responses(event.get_application_form().id, export_format, args['gzip'])
+
+        filename = '{}-responses.{}'.format(event.key, export_format)
+        headers = {'Content-Disposition': 'attachment; filename="{}"'.format(filename)}
+        if args['gzip']:
+            headers['Content-Encoding'] = 'gzip'
+        mimetype = 'application/x-ndjson' if export_format == 'ndjson' else 'text/csv'
+        return FlaskResponse(stream_with_context(chunks), mimetype=mimetype, headers=headers)
@@ -0,0 +1,173 @@
+import csv
+import itertools
+import json
+import zlib
+
+import six
+
+from app import db
+from app.applicationModel.models import Question, QuestionTranslation, Section
+from app.responses.models import Answer, Response
+from app.users.models import AppUser
+
+# Rows fetched from the database at a time
+BATCH_SIZE = 1000
+# Bytes of output collected before it is compressed and sent
+CHUNK_SIZE = 64 * 1024
+
+PROFILE_COLUMNS = (
+    ('response_id', Response.id),
+    ('user_id', AppUser.id),
+    ('email', AppUser.email),
+    ('user_title', AppUser.user_title),
+    ('firstname', AppUser.firstname),
+    ('lastname', AppUser.lastname),
+    ('language', Response.language),
+    ('is_submitted', Response.is_submitted),
+    ('submitted_timestamp', Response.submitted_timestamp),
+    ('is_withdrawn', Response.is_withdrawn),
+    ('withdrawn_timestamp', Response.withdrawn_timestamp),
+)
+
+
+class ExportColumns():
+    """The questions of an application form in form order, with their column labels and option labels."""
+
+    def __init__(self, application_form_id):
+        questions = (db.session.query(Question)
+                     .join(Section, Section.id == Question.section_id)
+                     .filter(Question.application_form_id == application_form_id)
+                     .order_by(Section.order, Question.order, Question.id)
+                     .all())
+        translations = (db.session.query(QuestionTranslation)
+                        .filter(QuestionTranslation.question_id.in_([q.id for q in questions]))
+                        .all()) if questions else []
+
+        translations_by_question = {}
+        for translation in translations:
+            translations_by_question.setdefault(translation.question_id, {})[translation.language] = translation
+
+        self.question_ids = [question.id for question in questions]
+        self.labels = []
+        # (question_id, language) -> {option value: option label}
+        self._option_labels = {}
+
+        used_labels = set(label for label, _ in PROFILE_COLUMNS)
+        for question in questions:
+            question_translations = translations_by_question.get(question.id, {})
+            english = question_translations.get('en')
+            label = english.headline if english else question.key or str(question.id)
+            if label in used_labels:
+                label = u'{} ({})'.format(label, question.id)
+            used_labels.add(label)
+            self.labels.append(label)
+
+            if question.type == 'multi-choice':
+                for language, translation in question_translations.items():
+                    if translation.options is not None:
+                        self._option_labels[(question.id, language)] = {
+                            option['value']: option['label'] for option in translation.options}
+
+    def value_display(self, question_id, language, value):
+        """The displayed answer, as Answer.value_display but without loading the question."""
+        option_labels = self._option_labels.get((question_id, language))
+        if option_labels is None:
+            option_labels = self._option_labels.get((question_id, 'en'), {})
+        return option_labels.get(value, value)
+
+
+def _export_rows(application_form_id, columns):
+    """Yield (profile values, {question_id: displayed answer}) for each response to the form,
+    reading the answers through a server-side cursor so memory doesn't grow with the event."""
+    query = (db.session.query(*([column for _, column in PROFILE_COLUMNS] + [Answer.question_id, Answer.value]))
+             .join(AppUser, AppUser.id == Response.user_id)
+             .outerjoin(Answer, Answer.response_id == Response.id)
+             .filter(Response.application_form_id == application_form_id)
+             .filter(AppUser.active == True, AppUser.is_deleted == False)
+             .order_by(Response.id)
+             .execution_options(stream_results=True)
+             .yield_per(BATCH_SIZE))
+
+    profile_size = len(PROFILE_COLUMNS)
+    language_index = [name for name, _ in PROFILE_COLUMNS].index('language')
+    for _, rows in itertools.groupby(query, key=lambda row: row[0]):
+        rows = list(rows)
+        profile = rows[0][:profile_size]
+        language = profile[language_index]
+        answers = {}
+        for row in rows:
+            question_id, value = row[profile_size], row[profile_size + 1]
+            if question_id is not None:
+                answers[question_id] = columns.value_display(question_id, language, value)
+        yield profile, answers
+
+
+def _json_value(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    return _json_value(value)
+
+
+def _csv_line(values):
+    output = six.StringIO()
+    writer = csv.writer(output)
+    if six.PY2:
+        values = [v.encode('utf-8') if isinstance(v, six.text_type) else v for v in values]
+    writer.writerow(values)
+    return output.getvalue()
+
+
+def _csv_lines(application_form_id, columns):
+    yield _csv_line([name for name, _ in PROFILE_COLUMNS] + columns.labels)
+    for profile, answers in _export_rows(application_form_id, columns):
+        yield _csv_line([_csv_value(v) for v in profile] +
+                        [answers.get(question_id, '') for question_id in columns.question_ids])
+
+
+def _ndjson_lines(application_form_id, columns):
+    names = [name for name, _ in PROFILE_COLUMNS]
+    for profile, answers in _export_rows(application_form_id, columns):
+        record = dict(zip(names, [_json_value(v) for v in profile]))
+        record['answers'] = {label: answers.get(question_id)
+                             for question_id, label in zip(columns.question_ids, columns.labels)}
+        yield json.dumps(record) + '\n'
+
+
+def _chunked(lines, compress):
+    """Join lines into chunks of about CHUNK_SIZE bytes, gzipping them if compress is set."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+    chunk = []
+    size = 0
+    for line in lines:
+        if isinstance(line, six.text_type):
+            line = line.encode('utf-8')
+        chunk.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            data = b''.join(chunk)
+            yield compressor.compress(data) if compressor else data
+            chunk = []
+            size = 0
+
+    data = b''.join(chunk)
+    if compressor:
+        yield compressor.compress(data) + compressor.flush()
+    elif data:
+        yield data
+
+
+def export_responses(application_form_id, export_format, compress):
+    """Generate the responses to an application form with their answers as CSV or NDJSON
+    (one JSON object per line), in chunks of bytes."""
+    columns = ExportColumns(application_form_id)
+    if export_format == 'ndjson':
+        lines = _ndjson_lines(application_form_id, columns)
+    else:
+        lines = _csv_lines(application_form_id, columns)
+    return _chunked(lines, compress)
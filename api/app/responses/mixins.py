@@ -1,4 +1,5 @@
 from flask_restful import reqparse
+from flask_restful.inputs import boolean
 
 class ResponseMixin(object):
     get_req_parser = reqparse.RequestParser()
@@ -18,4 +19,10 @@ class ResponseMixin(object):
     put_req_parser.add_argument('language', type=str, required=True)
 
     del_req_parser = reqparse.RequestParser()
-    del_req_parser.add_argument('id', type=int, required=True)
\ No newline at end of file
+    del_req_parser.add_argument('id', type=int, required=True)
+
+
+class ResponseExportMixin(object):
+    req_parser = reqparse.RequestParser()
+    req_parser.add_argument('format', type=str, required=False, default='csv', choices=('csv', 'ndjson'))
+    req_parser.add_argument('gzip', type=boolean, required=False, default=False)
@@ -11,6 +11,10 @@ from app.applicationModel.models import Question
 class Response(db.Model):
 
     __tablename__ = "response"
+    __table_args__ = (
+        db.Index('ix_response_application_form_user', 'application_form_id', 'user_id'),
+        db.Index('ix_response_user', 'user_id'),
+    )
 
     id = db.Column(db.Integer(), primary_key=True)
     application_form_id = db.Column(db.Integer(),db.ForeignKey("application_form.id"), nullable=False)
@@ -52,6 +56,9 @@ class Response(db.Model):
 class Answer(db.Model):
 
     __tablename__ = "answer"
+    __table_args__ = (
+        db.Index('ix_answer_response_question', 'response_id', 'question_id'),
+    )
 
     id = db.Column(db.Integer(), primary_key=True)
     response_id = db.Column(db.Integer(), db.ForeignKey("response.id"), nullable=False)
@@ -84,6 +91,11 @@ class Answer(db.Model):
 
 
 class ResponseReviewer(db.Model):
+    __table_args__ = (
+        db.Index('ix_response_reviewer_response', 'response_id'),
+        db.Index('ix_response_reviewer_reviewer_user', 'reviewer_user_id'),
+    )
+
     id = db.Column(db.Integer(), primary_key=True)
     response_id = db.Column(db.Integer(), db.ForeignKey('response.id'), nullable=False)
     reviewer_user_id = db.Column(db.Integer(), db.ForeignKey('app_user.id'), nullable=False)
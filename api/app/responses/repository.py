@@ -35,6 +35,16 @@ class ResponseRepository():
             .filter_by(event_id=event_id)\
             .first()
 
+    @staticmethod
+    def get_by_user_id_for_events(user_id, event_ids):
+        """Get the user's responses for several events as (event_id, Response), ordered by id."""
+        return db.session.query(ApplicationForm.event_id, Response)\
+            .filter(Response.user_id == user_id)\
+            .join(ApplicationForm, Response.application_form_id == ApplicationForm.id)\
+            .filter(ApplicationForm.event_id.in_(event_ids))\
+            .order_by(Response.id)\
+            .all()
+
     @staticmethod
     def get_submitted_by_user_id_for_event(user_id, event_id):
         return db.session.query(Response)\
@@ -1,17 +1,22 @@
+import csv
 import json
+import zlib
 from datetime import date, datetime
 
 import dateutil.parser
+import six
 from flask import g
 
 from app import app, db
 from app.applicationModel.models import ApplicationForm, Question, Section
+from app.applicationModel.repository import ApplicationFormRepository as application_form_repository
 from app.email_template.models import EmailTemplate
 from app.events.models import Event
 from app.organisation.models import Organisation
 from app.responses.models import Answer, Response
 from app.responses.repository import ResponseRepository as response_repository
 from app.users.models import AppUser, Country, UserCategory
+from app.utils import strings
 from app.utils.testing import ApiTestCase
 
 
@@ -364,6 +369,21 @@ class ResponseApiTest(ApiTestCase):
         self.assertEqual(answer['value'], 'This is the 2nd answer.')
         self.assertEqual(answer['question_id'], self.question2.id)
 
+    def test_confirmation_email_query_count_independent_of_question_count(self):
+        self._seed_data()
+        form_id, response_id = self.form.id, self.response.id
+
+        def add_answers(n):
+            for question in self.add_questions_in_sections(form_id, n):
+                self.add_answer(response_id, question.id, 'Answer to {}'.format(question.id))
+
+        def build_email_body():
+            response = response_repository.get_by_id(response_id)
+            application_form = application_form_repository.get_by_id_with_contents(form_id)
+            return strings.build_response_email_body(response.answers, 'en', application_form)
+
+        self.assert_query_budget(8, add_answers, build_email_body)
+
     def test_update_missing(self):
         """Test that 404 is returned if we try to update a response that doesn't exist."""
         
@@ -466,3 +486,83 @@ class ResponseApiTest(ApiTestCase):
             query_string={'id': self.response.id})
 
         self.assertEqual(response.status_code, 401)  # Unauthorized
+
+
+class ResponseExportTest(ApiTestCase):
+
+    def _seed_data(self):
+        self.event = self.add_event(key='indaba-2025')
+        self.form = self.create_application_form(self.event.id, True, False)
+        section = self.add_section(self.form.id)
+        choice = self.add_question(self.form.id, section.id, order=1, question_type='multi-choice')
+        self.add_question_translation(choice.id, 'en', 'Favourite colour',
+                                      options=[{'value': 'r', 'label': 'Red'}, {'value': 'b', 'label': 'Blue'}])
+        self.add_question_translation(choice.id, 'fr', 'Couleur preferee',
+                                      options=[{'value': 'r', 'label': 'Rouge'}, {'value': 'b', 'label': 'Bleu'}])
+        text = self.add_question(self.form.id, section.id, order=2)
+        self.add_question_translation(text.id, 'en', 'Motivation')
+
+        admin = self.add_user('admin@user.com')
+        self.event.add_event_role('admin', admin.id)
+        applicant1 = self.add_user('applicant1@user.com', 'Ann')
+        applicant2 = self.add_user('applicant2@user.com', 'Bob')
+        db.session.commit()
+
+        response1 = self.add_response(self.form.id, applicant1.id, is_submitted=True)
+        self.add_answer(response1.id, choice.id, 'b')
+        self.add_answer(response1.id, text.id, 'Because, "quoted"')
+        response2 = self.add_response(self.form.id, applicant2.id, language='fr')
+        self.add_answer(response2.id, choice.id, 'r')
+
+        self.event_id = self.event.id
+        self.headers = self.get_auth_header_for('admin@user.com')
+
+    def test_export_csv(self):
+        """Test that each response is a row with a column per question and option labels resolved."""
+        self._seed_data()
+        response = self.app.get('/api/v1/response-export', data={'event_id': self.event_id}, headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/csv')
+        rows = list(csv.DictReader(six.StringIO(response.get_data(as_text=True))))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['firstname'], 'Ann')
+        self.assertEqual(rows[0]['is_submitted'], 'True')
+        self.assertEqual(rows[0]['Favourite colour'], 'Blue')
+        self.assertEqual(rows[0]['Motivation'], 'Because, "quoted"')
+        self.assertEqual(rows[1]['Favourite colour'], 'Rouge')
+        self.assertEqual(rows[1]['Motivation'], '')
+
+    def test_export_ndjson_gzip(self):
+        """Test the gzipped NDJSON export."""
+        self._seed_data()
+        response = self.app.get('/api/v1/response-export',
+                                data={'event_id': self.event_id, 'format': 'ndjson', 'gzip': True},
+                                headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        lines = zlib.decompress(response.get_data(), 16 + zlib.MAX_WBITS).splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual([r['email'] for r in records], ['applicant1@user.com', 'applicant2@user.com'])
+        self.assertEqual(records[0]['answers'], {'Favourite colour': 'Blue', 'Motivation': 'Because, "quoted"'})
+        self.assertIsNone(records[1]['answers']['Motivation'])
+
+    def test_export_not_gzipped_if_false(self):
+        """Test that gzip=false and gzip=0 in the query string give an uncompressed export."""
+        self._seed_data()
+        for value in ('false', '0'):
+            response = self.app.get('/api/v1/response-export',
+                                    query_string={'event_id': self.event_id, 'format': 'ndjson', 'gzip': value},
+                                    headers=self.headers)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('Content-Encoding', response.headers)
+            self.assertEqual(len(response.get_data().splitlines()), 2)
+
+    def test_export_forbidden(self):
+        """Test that only event admins can export responses."""
+        self._seed_data()
+        response = self.app.get('/api/v1/response-export', data={'event_id': self.event_id},
+                                headers=self.get_auth_header_for('applicant1@user.com'))
+        self.assertEqual(response.status_code, 403)
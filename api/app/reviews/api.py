@@ -16,6 +16,7 @@ from app.reviews.repository import ReviewConfigurationRepository as review_confi
 from app.users.models import AppUser, Country, UserCategory
 from app.users.repository import UserRepository as user_repository
 from app.utils.auth import auth_required
+from app.utils.sql_instrumentation import query_budget
 from app.utils.errors import EVENT_NOT_FOUND, REVIEW_RESPONSE_NOT_FOUND, FORBIDDEN, USER_NOT_FOUND
 
 from app.utils import misc
@@ -108,6 +109,7 @@ class ReviewResponseUser():
 
 class ReviewAPI(ReviewMixin, restful.Resource):
 
+    @query_budget(10)
     @auth_required
     @marshal_with(review_fields)
     def get(self):
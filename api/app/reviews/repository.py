@@ -1,8 +1,9 @@
 from sqlalchemy.sql import exists
 from sqlalchemy import and_, func, cast, Date
+from sqlalchemy.orm import selectinload
 from app import db
-from app.applicationModel.models import ApplicationForm
-from app.responses.models import Response, ResponseReviewer
+from app.applicationModel.models import ApplicationForm, Question
+from app.responses.models import Answer, Response, ResponseReviewer
 from app.reviews.models import ReviewForm, ReviewResponse, ReviewScore, ReviewQuestion, ReviewConfiguration
 from app.users.models import AppUser
 from app.events.models import EventRole
@@ -110,6 +111,8 @@ class ReviewRepository():
                     .filter_by(id=None)
                     .order_by(ResponseReviewer.response_id)
                     .offset(skip)
+                    .options(selectinload(Response.answers).joinedload(Answer.question)
+                             .selectinload(Question.question_translations))
                     .first()
         )
         return response
@@ -197,6 +197,18 @@ class ReviewsApiTest(ApiTestCase):
         self.assertEqual(data['reviews_remaining_count'], 0)
         self.assertEqual(data['response']['id'], 0)
 
+    def test_review_query_count_independent_of_answer_count(self):
+        self.seed_static_data()
+        self.setup_one_reviewer_one_candidate()
+        header = self.get_auth_header_for('r1@r.com')
+
+        def add_answers(n):
+            for question in self.add_questions_in_sections(1, n):
+                self.add_answer(1, question.id, 'Answer to {}'.format(question.id))
+
+        self.assert_query_budget(
+            10, add_answers, lambda: self.app.get('/api/v1/review', headers=header, data={'event_id': 1}))
+
     @parameterized.expand([
         (True,), (False,)
     ])
@@ -0,0 +1,88 @@
+from flask import g
+import flask_restful as restful
+from flask_restful import fields, marshal
+
+from app import db
+from app.roster.mixins import RosterMixin, RosterChangesMixin
+from app.roster.repository import RosterRepository as roster_repository
+from app.users.repository import UserRepository as user_repository
+from app.utils.auth import auth_required
+from app.utils.errors import FORBIDDEN
+from app.utils.response_encoding import version_etag
+
+MAX_PER_PAGE = 500
+
+roster_entry_fields = {
+    'user_id': fields.Integer,
+    'registration_id': fields.Integer,
+    'firstname': fields.String,
+    'lastname': fields.String,
+    'email': fields.String,
+    'is_invited_guest': fields.Boolean,
+    'invited_guest_role': fields.String,
+    'confirmed': fields.Boolean,
+    'signed_in': fields.Boolean,
+    'created_at': fields.DateTime('iso8601'),
+    'removed': fields.Boolean,
+    'version': fields.Integer,
+}
+
+
+def _is_registration_volunteer(event_id):
+    user = user_repository.get_by_id(g.current_user['id'])
+    return user.is_registration_volunteer(event_id)
+
+
+class RosterAPI(RosterMixin, restful.Resource):
+    """A page of the attendee roster for an event, with optional prefix search on name and email."""
+
+    @auth_required
+    def get(self):
+        args = self.req_parser.parse_args()
+        event_id = args['event_id']
+        page = max(args['page'], 1)
+        per_page = min(max(args['per_page'], 1), MAX_PER_PAGE)
+
+        if not _is_registration_volunteer(event_id):
+            return FORBIDDEN
+
+        version = roster_repository.get_version(event_id)
+        db.session.commit()
+        not_modified = version_etag('roster', event_id, version, page, per_page, args['search'])
+        if not_modified is not None:
+            return not_modified
+
+        total, entries = roster_repository.search(event_id, args['search'], page, per_page)
+
+        return {
+            'version': version,
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'entries': marshal(entries, roster_entry_fields)
+        }, 200
+
+
+class RosterChangesAPI(RosterChangesMixin, restful.Resource):
+    """Roster entries that changed after since_version, so desks can sync without refetching the roster."""
+
+    @auth_required
+    def get(self):
+        args = self.req_parser.parse_args()
+        event_id = args['event_id']
+
+        if not _is_registration_volunteer(event_id):
+            return FORBIDDEN
+
+        version = roster_repository.get_version(event_id)
+        db.session.commit()
+        not_modified = version_etag('roster-changes', event_id, version, args['since_version'])
+        if not_modified is not None:
+            return not_modified
+
+        entries = roster_repository.get_changes_since(event_id, args['since_version'])
+
+        return {
+            'version': version,
+            'entries': marshal(entries, roster_entry_fields)
+        }, 200
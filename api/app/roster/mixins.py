@@ -0,0 +1,15 @@
+from flask_restful import reqparse
+
+
+class RosterMixin(object):
+    req_parser = reqparse.RequestParser()
+    req_parser.add_argument('event_id', type=int, required=True)
+    req_parser.add_argument('search', required=False)
+    req_parser.add_argument('page', type=int, required=False, default=1)
+    req_parser.add_argument('per_page', type=int, required=False, default=50)
+
+
+class RosterChangesMixin(object):
+    req_parser = reqparse.RequestParser()
+    req_parser.add_argument('event_id', type=int, required=True)
+    req_parser.add_argument('since_version', type=int, required=False, default=0)
@@ -0,0 +1,43 @@
+from app import db
+
+
+class RosterEntry(db.Model):
+    """A pre-computed row of an event's attendee roster, as used by registration desks.
+    Entries are never deleted, only marked as removed, so that the change feed can report them."""
+    __tablename__ = 'roster_entry'
+    __table_args__ = (
+        db.UniqueConstraint('event_id', 'user_id', name='uq_roster_entry_event_user'),
+        db.Index('ix_roster_entry_event_version', 'event_id', 'version'),
+    )
+
+    id = db.Column(db.Integer(), primary_key=True)
+    event_id = db.Column(db.Integer(), db.ForeignKey('event.id'), nullable=False)
+    user_id = db.Column(db.Integer(), db.ForeignKey('app_user.id'), nullable=False)
+    registration_id = db.Column(db.Integer(), nullable=True)
+    firstname = db.Column(db.String(100), nullable=False)
+    lastname = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(255), nullable=False)
+    is_invited_guest = db.Column(db.Boolean(), nullable=False)
+    invited_guest_role = db.Column(db.String(50), nullable=True)
+    confirmed = db.Column(db.Boolean(), nullable=False)
+    signed_in = db.Column(db.Boolean(), nullable=False)
+    created_at = db.Column(db.DateTime(), nullable=True)
+    removed = db.Column(db.Boolean(), nullable=False)
+    version = db.Column(db.Integer(), nullable=False)
+
+    def __init__(self, event_id, user_id):
+        self.event_id = event_id
+        self.user_id = user_id
+        self.removed = False
+
+
+class RosterVersion(db.Model):
+    """The latest roster version of an event. Its presence means the event's roster has been built."""
+    __tablename__ = 'roster_version'
+
+    event_id = db.Column(db.Integer(), db.ForeignKey('event.id'), primary_key=True)
+    version = db.Column(db.Integer(), nullable=False)
+
+    def __init__(self, event_id):
+        self.event_id = event_id
+        self.version = 0
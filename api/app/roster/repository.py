@@ -0,0 +1,174 @@
+from sqlalchemy import or_, func
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.attendance.models import Attendance
+from app.invitedGuest.models import InvitedGuest, GuestRegistration
+from app.registration.models import Offer, Registration, RegistrationForm
+from app.roster.models import RosterEntry, RosterVersion
+from app.users.models import AppUser
+
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+class RosterRepository():
+
+    @staticmethod
+    def get_version(event_id):
+        """Get the current roster version for an event, building the roster if it doesn't exist yet.
+        The caller commits the built roster."""
+        roster_version = db.session.query(RosterVersion).filter_by(event_id=event_id).first()
+        if roster_version is None:
+            RosterRepository.rebuild(event_id)
+            roster_version = db.session.query(RosterVersion).filter_by(event_id=event_id).first()
+        return roster_version.version
+
+    @staticmethod
+    def search(event_id, prefix=None, page=1, per_page=50):
+        """Get a page of the event's roster, optionally filtered to entries whose
+        firstname, lastname or email starts with prefix. Returns (total, entries)."""
+        query = db.session.query(RosterEntry).filter_by(event_id=event_id, removed=False)
+        if prefix:
+            pattern = _escape_like(prefix.lower()) + '%'
+            query = query.filter(or_(
+                func.lower(RosterEntry.firstname).like(pattern, escape='\\'),
+                func.lower(RosterEntry.lastname).like(pattern, escape='\\'),
+                func.lower(RosterEntry.email).like(pattern, escape='\\')))
+
+        total = query.count()
+        entries = query.order_by(RosterEntry.lastname, RosterEntry.firstname, RosterEntry.user_id)\
+                       .offset((page - 1) * per_page)\
+                       .limit(per_page)\
+                       .all()
+        return total, entries
+
+    @staticmethod
+    def get_changes_since(event_id, version):
+        """Get all entries (including removed ones) that changed after the given version."""
+        return db.session.query(RosterEntry)\
+                         .filter(RosterEntry.event_id == event_id, RosterEntry.version > version)\
+                         .order_by(RosterEntry.version, RosterEntry.user_id)\
+                         .all()
+
+    @staticmethod
+    def rebuild(event_id):
+        """Build or fully recompute the roster for an event, without committing."""
+        if db.session.query(RosterVersion).filter_by(event_id=event_id).first() is None:
+            savepoint = db.session.begin_nested()
+            try:
+                db.session.add(RosterVersion(event_id))
+                savepoint.commit()
+            except IntegrityError:
+                # A concurrent request built the roster first, recompute it from their version
+                savepoint.rollback()
+        RosterRepository._refresh(event_id, None)
+
+    @staticmethod
+    def refresh(event_id, user_ids):
+        """Recompute the roster entries of the given users after their registration,
+        guest status or attendance changed, without committing. Does nothing if the event's roster
+        hasn't been built, as it will be built in full when first read."""
+        if db.session.query(RosterVersion.event_id).filter_by(event_id=event_id).first() is None:
+            return
+        RosterRepository._refresh(event_id, user_ids)
+
+    @staticmethod
+    def refresh_user(user_id):
+        """Recompute a user's entries on every roster they appear in, e.g. after a profile change
+        or after they deleted their account, without committing."""
+        event_ids = [event_id for (event_id,) in db.session.query(RosterEntry.event_id).filter_by(user_id=user_id)]
+        for event_id in event_ids:
+            RosterRepository._refresh(event_id, [user_id])
+
+    @staticmethod
+    def _refresh(event_id, user_ids):
+        roster_version = db.session.query(RosterVersion)\
+                                   .filter_by(event_id=event_id)\
+                                   .with_for_update()\
+                                   .one()
+
+        def for_users(query, column):
+            if user_ids is None:
+                return query
+            return query.filter(column.in_(user_ids))
+
+        # Build the expected state of each entry from the source tables
+        computed = {}
+        guests = for_users(
+            db.session.query(InvitedGuest, AppUser, GuestRegistration)
+                      .join(AppUser, InvitedGuest.user_id == AppUser.id)
+                      .outerjoin(RegistrationForm, RegistrationForm.event_id == InvitedGuest.event_id)
+                      .outerjoin(GuestRegistration, (GuestRegistration.user_id == InvitedGuest.user_id)
+                                 & (GuestRegistration.registration_form_id == RegistrationForm.id))
+                      .filter(InvitedGuest.event_id == event_id, AppUser.is_deleted == False),
+            InvitedGuest.user_id)
+        for invited_guest, user, guest_registration in guests:
+            computed[user.id] = {
+                'user': user,
+                'registration_id': guest_registration.id if guest_registration else None,
+                'created_at': guest_registration.created_at if guest_registration else None,
+                'confirmed': True,
+                'is_invited_guest': True,
+                'invited_guest_role': invited_guest.role,
+            }
+
+        registrations = for_users(
+            db.session.query(Registration, Offer, AppUser)
+                      .join(Offer, Registration.offer_id == Offer.id)
+                      .join(AppUser, Offer.user_id == AppUser.id)
+                      .filter(Offer.event_id == event_id, AppUser.is_deleted == False),
+            Offer.user_id)
+        for registration, offer, user in registrations:
+            # A registration takes precedence over a guest registration
+            guest = computed.get(user.id, {})
+            computed[user.id] = {
+                'user': user,
+                'registration_id': registration.id,
+                'created_at': registration.created_at,
+                'confirmed': registration.confirmed,
+                'is_invited_guest': guest.get('is_invited_guest', False),
+                'invited_guest_role': guest.get('invited_guest_role'),
+            }
+
+        signed_in = set(user_id for (user_id,) in for_users(
+            db.session.query(Attendance.user_id).filter(Attendance.event_id == event_id),
+            Attendance.user_id))
+
+        existing = {entry.user_id: entry for entry in for_users(
+            db.session.query(RosterEntry).filter(RosterEntry.event_id == event_id),
+            RosterEntry.user_id)}
+
+        new_version = roster_version.version + 1
+        changed = False
+
+        for user_id, values in computed.items():
+            user = values.pop('user')
+            values.update({
+                'firstname': user.firstname,
+                'lastname': user.lastname,
+                'email': user.email,
+                'signed_in': user_id in signed_in,
+                'removed': False,
+            })
+            entry = existing.get(user_id)
+            if entry is None:
+                entry = RosterEntry(event_id, user_id)
+                db.session.add(entry)
+            elif all(getattr(entry, key) == value for key, value in values.items()):
+                continue
+            for key, value in values.items():
+                setattr(entry, key, value)
+            entry.version = new_version
+            changed = True
+
+        for user_id, entry in existing.items():
+            if user_id not in computed and not entry.removed:
+                entry.removed = True
+                entry.version = new_version
+                changed = True
+
+        if changed:
+            roster_version.version = new_version
+        db.session.flush()
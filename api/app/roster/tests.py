@@ -0,0 +1,160 @@
+import json
+
+from app import db
+from app.events.models import EventRole
+from app.registration.models import Registration
+from app.roster.repository import RosterRepository as roster_repository
+from app.utils.errors import FORBIDDEN
+from app.utils.testing import ApiTestCase
+
+
+class RosterApiTest(ApiTestCase):
+
+    def seed_static_data(self):
+        self.add_event()
+        self.volunteer = self.add_user('volunteer@mail.com')
+        db.session.add(EventRole('registration-volunteer', self.volunteer.id, 1))
+        db.session.commit()
+        form = self.create_registration_form()
+
+        self.attendees = []
+        for email, firstname, lastname, confirmed in [
+                ('ada@mail.com', 'Ada', 'Lovelace', True),
+                ('alan@mail.com', 'Alan', 'Turing', False),
+                ('grace@mail.com', 'Grace', 'Hopper', True)]:
+            user = self.add_user(email, firstname, lastname)
+            offer = self.add_offer(user.id)
+            db.session.add(Registration(offer.id, form.id, confirmed=confirmed))
+            db.session.commit()
+            self.attendees.append(user.id)
+
+        self.guest = self.add_user('guest@mail.com', 'Geoffrey', 'Hinton')
+        self.add_invited_guest(self.guest.id, role='Speaker')
+        self.no_registration = self.add_user('offer@mail.com', 'Offer', 'Only')
+        self.add_offer(self.no_registration.id)
+        self.add_email_template('attendance-confirmation')
+
+        self.header = self.get_auth_header_for('volunteer@mail.com')
+
+    def get_roster(self, **params):
+        params.setdefault('event_id', 1)
+        response = self.app.get('/api/v1/roster', headers=self.header, query_string=params)
+        return response.status_code, json.loads(response.data)
+
+    def get_changes(self, since_version):
+        response = self.app.get('/api/v1/roster/changes', headers=self.header,
+                                query_string={'event_id': 1, 'since_version': since_version})
+        return json.loads(response.data)
+
+    def test_roster_built_on_first_read(self):
+        self.seed_static_data()
+
+        status, data = self.get_roster()
+
+        self.assertEqual(status, 200)
+        self.assertEqual(data['version'], 1)
+        self.assertEqual(data['total'], 4)
+        self.assertEqual([e['lastname'] for e in data['entries']], ['Hinton', 'Hopper', 'Lovelace', 'Turing'])
+        guest = data['entries'][0]
+        self.assertTrue(guest['is_invited_guest'])
+        self.assertTrue(guest['confirmed'])
+        self.assertEqual(guest['invited_guest_role'], 'Speaker')
+        self.assertFalse(data['entries'][3]['confirmed'])
+        self.assertFalse(any(e['signed_in'] for e in data['entries']))
+
+    def test_prefix_search_and_pagination(self):
+        self.seed_static_data()
+
+        _, data = self.get_roster(search='g')
+        self.assertEqual(data['total'], 2)
+        self.assertEqual([e['firstname'] for e in data['entries']], ['Geoffrey', 'Grace'])
+
+        _, data = self.get_roster(search='TUR')
+        self.assertEqual([e['email'] for e in data['entries']], ['alan@mail.com'])
+
+        _, data = self.get_roster(search='%')
+        self.assertEqual(data['total'], 0)
+
+        _, data = self.get_roster(page=2, per_page=3)
+        self.assertEqual(data['total'], 4)
+        self.assertEqual([e['lastname'] for e in data['entries']], ['Turing'])
+
+    def test_changes_since_version(self):
+        self.seed_static_data()
+        _, data = self.get_roster()
+        version = data['version']
+
+        self.assertEqual(self.get_changes(version)['entries'], [])
+
+        self.app.post('/api/v1/attendance', headers=self.header,
+                      data={'event_id': 1, 'user_id': self.attendees[0]})
+
+        changes = self.get_changes(version)
+        self.assertEqual(changes['version'], version + 1)
+        self.assertEqual(len(changes['entries']), 1)
+        self.assertEqual(changes['entries'][0]['user_id'], self.attendees[0])
+        self.assertTrue(changes['entries'][0]['signed_in'])
+
+        self.assertEqual(self.get_changes(0)['version'], version + 1)
+        self.assertEqual(len(self.get_changes(0)['entries']), 4)
+
+    def test_removed_entries_are_reported(self):
+        self.seed_static_data()
+        _, data = self.get_roster()
+        version = data['version']
+
+        db.session.query(Registration).delete()
+        roster_repository.refresh(1, self.attendees)
+        db.session.commit()
+
+        changes = self.get_changes(version)
+        self.assertEqual(len(changes['entries']), 3)
+        self.assertTrue(all(e['removed'] for e in changes['entries']))
+        _, data = self.get_roster()
+        self.assertEqual(data['total'], 1)
+
+    def test_deleted_user_removed(self):
+        self.seed_static_data()
+        _, data = self.get_roster()
+        version = data['version']
+
+        response = self.app.delete('/api/v1/user', headers=self.get_auth_header_for('ada@mail.com'))
+        self.assertEqual(response.status_code, 200)
+
+        changes = self.get_changes(version)
+        self.assertEqual([(e['user_id'], e['removed']) for e in changes['entries']], [(self.attendees[0], True)])
+        _, data = self.get_roster()
+        self.assertEqual(data['total'], 3)
+
+    def test_unchanged_refresh_keeps_version(self):
+        self.seed_static_data()
+        version = roster_repository.get_version(1)
+
+        roster_repository.refresh(1, self.attendees)
+
+        self.assertEqual(roster_repository.get_version(1), version)
+
+    def test_non_volunteer_forbidden(self):
+        self.seed_static_data()
+        self.header = self.get_auth_header_for('ada@mail.com')
+
+        status, _ = self.get_roster()
+
+        self.assertEqual(status, FORBIDDEN[1])
+
+    def test_not_modified_until_roster_changes(self):
+        self.seed_static_data()
+        response = self.app.get('/api/v1/roster', headers=self.header, query_string={'event_id': 1})
+        headers = dict(self.header, **{'If-None-Match': response.headers['ETag']})
+
+        response = self.app.get('/api/v1/roster', headers=headers, query_string={'event_id': 1})
+        self.assertEqual(response.status_code, 304)
+        response = self.app.get('/api/v1/roster', headers=headers, query_string={'event_id': 1, 'search': 'g'})
+        self.assertEqual(response.status_code, 200)
+
+        self.app.post('/api/v1/attendance', headers=self.header,
+                      data={'event_id': 1, 'user_id': self.attendees[0]})
+
+        response = self.app.get('/api/v1/roster', headers=headers, query_string={'event_id': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['version'], 2)
@@ -16,6 +16,8 @@ from attendance import api as attendance_api
 from organisation import api as organisation_api
 from integration_tests import api as integration_tests_api
 from outcome import api as outcome_api
+from roster import api as roster_api
+from utils import metrics
 
 rest_api.add_resource(users_api.UserAPI, '/api/v1/user')
 rest_api.add_resource(users_api.UserCommentAPI, '/api/v1/user-comment')
@@ -29,6 +31,7 @@ rest_api.add_resource(users_api.EmailerAPI,
                       '/api/v1/admin/emailer')
 rest_api.add_resource(form_api.ApplicationFormAPI, '/api/v1/application-form')
 rest_api.add_resource(responses_api.ResponseAPI, '/api/v1/response')
+rest_api.add_resource(responses_api.ResponseExportAPI, '/api/v1/response-export')
 rest_api.add_resource(content_api.CountryContentAPI,
                       '/api/v1/content/countries')
 rest_api.add_resource(files_api.FileUploadAPI, '/api/v1/file')
@@ -42,6 +45,8 @@ rest_api.add_resource(content_api.DisabilityContentAPI,
                       '/api/v1/content/disability'),
 rest_api.add_resource(content_api.GenderContentAPI,
                       '/api/v1/content/gender'),
+rest_api.add_resource(content_api.ContentBundleAPI,
+                      '/api/v1/content/bundle'),
 rest_api.add_resource(events_api.EventsAPI,
                       '/api/v1/events'),
 rest_api.add_resource(events_api.EventAPI,
@@ -66,6 +71,7 @@ rest_api.add_resource(events_api.NotStartedReminderAPI,
                       '/api/v1/reminder-not-started')
 rest_api.add_resource(reviews_api.ReviewHistoryAPI, '/api/v1/reviewhistory')
 rest_api.add_resource(users_api.UserProfileList, '/api/v1/userprofilelist')
+rest_api.add_resource(users_api.UserProfileCount, '/api/v1/userprofilelist/count')
 rest_api.add_resource(users_api.UserProfile, '/api/v1/userprofile')
 rest_api.add_resource(invitedGuest_api.InvitedGuestAPI, '/api/v1/invitedGuest')
 rest_api.add_resource(invitedGuest_api.CreateUser,
@@ -83,6 +89,7 @@ rest_api.add_resource(reference_api.ReferenceRequestAPI,
 rest_api.add_resource(reference_api.ReferenceAPI,
                       '/api/v1/reference')
 rest_api.add_resource(registration_api.OfferAPI, '/api/v1/offer')
+rest_api.add_resource(registration_api.OfferBulkAPI, '/api/v1/offer/bulk')
 rest_api.add_resource(registration_api.RegistrationFormAPI,
                       '/api/v1/registration-form')
 rest_api.add_resource(registration_api.RegistrationSectionAPI,
@@ -104,10 +111,15 @@ rest_api.add_resource(registration_response.RegistrationConfirmAPI,
 rest_api.add_resource(invitation_letter_api.InvitationLetterAPI,
                       '/api/v1/invitation-letter')
 rest_api.add_resource(attendance_api.AttendanceAPI, '/api/v1/attendance')
+rest_api.add_resource(attendance_api.AttendanceBatchAPI, '/api/v1/attendance/batch')
+rest_api.add_resource(roster_api.RosterAPI, '/api/v1/roster')
+rest_api.add_resource(roster_api.RosterChangesAPI, '/api/v1/roster/changes')
 rest_api.add_resource(organisation_api.OrganisationApi, '/api/v1/organisation')
 rest_api.add_resource(users_api.PrivacyPolicyAPI, '/api/v1/privacypolicy')
 rest_api.add_resource(integration_tests_api.CreateIntegrationUser, '/api/v1/integration-tests/createUser')
 rest_api.add_resource(integration_tests_api.DeleteIntegrationUser, '/api/v1/integration-tests/deleteUser')
 rest_api.add_resource(outcome_api.OutcomeAPI, '/api/v1/outcome')
 rest_api.add_resource(outcome_api.OutcomeListAPI, '/api/v1/outcome-list')
+rest_api.add_resource(outcome_api.OutcomeBulkAPI, '/api/v1/outcome/bulk')
 rest_api.add_resource(users_api.EventAttendeeAPI, '/api/v1/validate-user-event-attendee')
+rest_api.add_resource(metrics.MetricsAPI, '/metrics')
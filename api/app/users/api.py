@@ -1,3 +1,6 @@
+import base64
+import json
+import multiprocessing
 import random
 import string
 from datetime import datetime
@@ -8,21 +11,24 @@ from flask_restful import fields, marshal, marshal_with, reqparse
 from sqlalchemy import func
 from sqlalchemy.exc import IntegrityError
 
-from app import LOGGER, bcrypt, db
+from app import LOGGER, db
 from app.events.models import EventRole
 import app.events.status as event_status
 from app.users.mixins import (AuthenticateMixin, PrivacyPolicyMixin,
-                              SignupMixin, UserProfileListMixin,
+                              SignupMixin, UserProfileListMixin, UserProfileCountMixin,
                               UserProfileMixin, EventAttendeeMixin)
 from app.users.models import AppUser, PasswordReset, UserComment
+from app.users.passwords import check_password, needs_rehash
+from app.responses.models import Response
 from app.users.repository import UserRepository as user_repository
+from app.roster.repository import RosterRepository as roster_repository
 from app.utils import errors, misc
 from app.utils.auth import admin_required, auth_required, generate_token, get_user_from_request
 from app.utils.emailer import email_user, send_mail
-from app.utils.errors import (ADD_VERIFY_TOKEN_FAILED, BAD_CREDENTIALS,
+from app.utils.errors import (ADD_VERIFY_TOKEN_FAILED, AUTHENTICATION_BUSY, BAD_CREDENTIALS,
                               EMAIL_IN_USE, EMAIL_NOT_VERIFIED,
                               EMAIL_VERIFY_CODE_NOT_VALID,
-                              ERROR_UPDATING_USER_PROFILE, FORBIDDEN,
+                              ERROR_UPDATING_USER_PROFILE, FORBIDDEN, INVALID_CURSOR,
                               MISSING_PASSWORD, POLICY_ALREADY_AGREED,
                               POLICY_NOT_AGREED, RESET_PASSWORD_CODE_EXPIRED,
                               RESET_PASSWORD_CODE_NOT_VALID, USER_DELETED,
@@ -97,7 +103,7 @@ class UserAPI(SignupMixin, restful.Resource):
         if not policy_agreed:
             return POLICY_NOT_AGREED
 
-        LOGGER.info("Registering email: {}".format(email))
+        LOGGER.info("Registering email: %s", email)
 
         user = AppUser(
             email=email,
@@ -128,7 +134,7 @@ class UserAPI(SignupMixin, restful.Resource):
                 user=user,
                 subject_parameters=dict(system=g.organisation.system_name))
 
-            LOGGER.debug("Sent verification email to {}".format(user.email))
+            LOGGER.debug("Sent verification email to %s", user.email)
         else:
             user.verified_email = True
             try:
@@ -161,6 +167,7 @@ class UserAPI(SignupMixin, restful.Resource):
         user.user_primaryLanguage = user_primaryLanguage
 
         try:
+            roster_repository.refresh_user(user.id)
             db.session.commit()
         except Exception as e:
             LOGGER.error("Exception updating user profile - {}".format(e))
@@ -178,7 +185,7 @@ class UserAPI(SignupMixin, restful.Resource):
                 user=user,
                 subject_parameters=dict(system=g.organisation.system_name))
 
-            LOGGER.debug("Sent re-verification email to {}".format(user.email))
+            LOGGER.debug("Sent re-verification email to %s", user.email)
 
         roles = db.session.query(EventRole).filter(
             EventRole.user_id == user.id).all()
@@ -191,17 +198,18 @@ class UserAPI(SignupMixin, restful.Resource):
         The function that lets the user delete the account
         '''
 
-        LOGGER.debug("Deleting user: {}".format(g.current_user['id']))
+        LOGGER.debug("Deleting user: %s", g.current_user['id'])
 
         user = db.session.query(AppUser).filter(
             AppUser.id == g.current_user['id']).first()
         if user:
             user.is_deleted = True
+            # Take the user off the rosters of the events they registered for
+            roster_repository.refresh_user(user.id)
             db.session.commit()
-            LOGGER.debug("Successfully deleted user {}".format(
-                g.current_user['id']))
+            LOGGER.debug("Successfully deleted user %s", g.current_user['id'])
         else:
-            LOGGER.debug("No user for id {}".format(g.current_user['id']))
+            LOGGER.debug("No user for id %s", g.current_user['id'])
 
         return {}, 200
 
@@ -218,6 +226,9 @@ class UserProfileView():
         self.submitted_timestamp = user_response.Response.submitted_timestamp
         self.is_withdrawn = user_response.Response.is_withdrawn
         self.withdrawn_timestamp = user_response.Response.withdrawn_timestamp
+        self.nationality_country = user_response.AppUser.nationality_country and user_response.AppUser.nationality_country.name
+        self.residence_country = user_response.AppUser.residence_country and user_response.AppUser.residence_country.name
+        self.user_category = user_response.AppUser.user_category and user_response.AppUser.user_category.name
 
 
 user_profile_list_fields = {
@@ -230,11 +241,42 @@ user_profile_list_fields = {
     'is_submitted': fields.Boolean,
     'submitted_timestamp': fields.DateTime('iso8601'),
     'is_withdrawn': fields.Boolean,
-    'withdrawn_timestamp': fields.DateTime('iso8601')
+    'withdrawn_timestamp': fields.DateTime('iso8601'),
+    'nationality_country': fields.String,
+    'residence_country': fields.String,
+    'user_category': fields.String
 }
 
+MAX_PROFILES_PER_PAGE = 500
+
+PROFILE_SORT_COLUMNS = {
+    'response_id': Response.id,
+    'firstname': AppUser.firstname,
+    'lastname': AppUser.lastname,
+    'email': AppUser.email
+}
+
+PROFILE_FILTERS = ('submitted', 'withdrawn', 'user_category_id', 'nationality_country_id', 'residence_country_id')
+
+
+def _encode_cursor(sort_value, response_id):
+    return base64.urlsafe_b64encode(json.dumps([sort_value, response_id]).encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(cursor):
+    """Get the (sort value, response id) in a cursor, or None if it isn't valid."""
+    try:
+        sort_value, response_id = json.loads(base64.urlsafe_b64decode(str(cursor)).decode('utf-8'))
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(response_id, int):
+        return None
+    return sort_value, response_id
+
 
 class UserProfileList(UserProfileListMixin, restful.Resource):
+    """The applicants to an event with their responses, optionally filtered and sorted.
+    If limit is given the list is paginated, with the cursor for the next page in the X-Next-Cursor header."""
 
     @marshal_with(user_profile_list_fields)
     @auth_required
@@ -247,11 +289,54 @@ class UserProfileList(UserProfileListMixin, restful.Resource):
         if not current_user.is_event_admin(event_id):
             return FORBIDDEN
 
-        user_responses = user_repository.get_all_with_responses_for(event_id)
+        after = None
+        if args['cursor']:
+            after = _decode_cursor(args['cursor'])
+            if after is None:
+                return INVALID_CURSOR
+
+        limit = args['limit']
+        if limit is not None:
+            limit = min(max(limit, 1), MAX_PROFILES_PER_PAGE)
+
+        user_responses = user_repository.get_page_with_responses_for(
+            event_id,
+            PROFILE_SORT_COLUMNS[args['sort']],
+            descending=args['descending'],
+            after=after,
+            # Fetch one more row to know whether there is a next page
+            limit=limit + 1 if limit is not None else None,
+            **{name: args[name] for name in PROFILE_FILTERS})
 
         views = [UserProfileView(user_response)
                  for user_response in user_responses]
-        return views
+
+        headers = {}
+        if limit is not None and len(views) > limit:
+            views = views[:limit]
+            headers['X-Next-Cursor'] = _encode_cursor(getattr(views[-1], args['sort']), views[-1].response_id)
+        return views, 200, headers
+
+
+class UserProfileCount(UserProfileCountMixin, restful.Resource):
+    """Counts of the applicants to an event, with the same filters as UserProfileList."""
+
+    @auth_required
+    def get(self):
+        args = self.req_parser.parse_args()
+        event_id = args['event_id']
+
+        current_user = user_repository.get_by_id(g.current_user['id'])
+        if not current_user.is_event_admin(event_id):
+            return FORBIDDEN
+
+        total, submitted, withdrawn = user_repository.count_responses_for(
+            event_id, **{name: args[name] for name in PROFILE_FILTERS})
+        return {
+            'total': total,
+            'submitted': int(submitted),
+            'withdrawn': int(withdrawn)
+        }, 200
 
 
 class UserProfile(UserProfileMixin, restful.Resource):
@@ -283,28 +368,35 @@ class AuthenticationAPI(AuthenticateMixin, restful.Resource):
 
         user = user_repository.get_by_email(args['email'], g.organisation.id)
 
-        LOGGER.debug("Authenticating user: {}".format(args['email']))
+        LOGGER.debug("Authenticating user: %s", args['email'])
 
         if user:
             if user.is_deleted:
-                LOGGER.debug(
-                    "Failed to authenticate, user {} deleted".format(args['email']))
+                LOGGER.debug("Failed to authenticate, user %s deleted", args['email'])
                 return USER_DELETED
 
             if not user.verified_email:
-                LOGGER.debug(
-                    "Failed to authenticate, email {} not verified".format(args['email']))
+                LOGGER.debug("Failed to authenticate, email %s not verified", args['email'])
                 return EMAIL_NOT_VERIFIED
 
-            if bcrypt.check_password_hash(user.password, args['password']):
-                LOGGER.debug(
-                    "Successful authentication for email: {}".format(args['email']))
+            try:
+                password_matches = check_password(user.password, args['password'])
+            except multiprocessing.TimeoutError:
+                LOGGER.warning("Timed out checking the password of %s", args['email'])
+                return AUTHENTICATION_BUSY
+
+            if password_matches:
+                LOGGER.debug("Successful authentication for email: %s", args['email'])
+                if needs_rehash(user.password):
+                    # BCRYPT_LOG_ROUNDS has changed since the password was set
+                    user.set_password(args['password'])
+                    db.session.commit()
                 roles = db.session.query(EventRole).filter(
                     EventRole.user_id == user.id).all()
                 return user_info(user, roles)
 
         else:
-            LOGGER.debug("User not found for {}".format(args['email']))
+            LOGGER.debug("User not found for %s", args['email'])
 
         return BAD_CREDENTIALS
 
@@ -323,7 +415,7 @@ class PasswordResetRequestAPI(restful.Resource):
         user = user_repository.get_by_email(args['email'], g.organisation.id)
 
         if not user:
-            LOGGER.debug("No user found for email {} and organisation {}".format(args['email'], g.organisation.name))
+            LOGGER.debug("No user found for email %s and organisation %s", args['email'], g.organisation.name)
             return USER_NOT_FOUND
 
         password_reset = PasswordReset(user=user)
@@ -384,20 +476,20 @@ class VerifyEmailAPI(restful.Resource):
 
         token = request.args.get('token')
 
-        LOGGER.debug("Verifying email for token: {}".format(token))
+        LOGGER.debug("Verifying email for token: %s", token)
 
         user = db.session.query(AppUser).filter(
             AppUser.verify_token == token).first()
 
         if not user:
-            LOGGER.debug("No user found for token: {}".format(token))
+            LOGGER.debug("No user found for token: %s", token)
             return EMAIL_VERIFY_CODE_NOT_VALID
 
         user.verify()
 
         db.session.commit()
 
-        LOGGER.debug("Email verified successfully for token: {}".format(token))
+        LOGGER.debug("Email verified successfully for token: %s", token)
 
         return {}, 201
 
@@ -406,12 +498,12 @@ class ResendVerificationEmailAPI(restful.Resource):
     def get(self):
         email = request.args.get('email')
 
-        LOGGER.debug("Resending verification email to: {}".format(email))
+        LOGGER.debug("Resending verification email to: %s", email)
         
         user = user_repository.get_by_email(email, g.organisation.id)
 
         if not user:
-            LOGGER.debug("User not found for email: {} in organisation: {}".format(email, g.organisation.name))
+            LOGGER.debug("User not found for email: %s in organisation: %s", email, g.organisation.name)
             return USER_NOT_FOUND
 
         if user.verify_token is None:
@@ -434,7 +526,7 @@ class ResendVerificationEmailAPI(restful.Resource):
             user=user,
             subject_parameters=dict(system=g.organisation.system_name))
 
-        LOGGER.debug("Resent email verification to: {}".format(email))
+        LOGGER.debug("Resent email verification to: %s", email)
 
         return {}, 201
 
@@ -29,10 +29,25 @@ class AuthenticateMixin(object):
     req_parser.add_argument('password', type=str, required=True)
 
 
-class UserProfileListMixin(object):
+class UserProfileCountMixin(object):
 
     req_parser = reqparse.RequestParser()
     req_parser.add_argument('event_id', type=int, required=True)
+    req_parser.add_argument('submitted', type=boolean, required=False)
+    req_parser.add_argument('withdrawn', type=boolean, required=False)
+    req_parser.add_argument('user_category_id', type=int, required=False)
+    req_parser.add_argument('nationality_country_id', type=int, required=False)
+    req_parser.add_argument('residence_country_id', type=int, required=False)
+
+
+class UserProfileListMixin(object):
+
+    req_parser = UserProfileCountMixin.req_parser.copy()
+    req_parser.add_argument('limit', type=int, required=False)
+    req_parser.add_argument('cursor', type=str, required=False)
+    req_parser.add_argument('sort', type=str, required=False, default='response_id',
+                            choices=('response_id', 'firstname', 'lastname', 'email'))
+    req_parser.add_argument('descending', type=boolean, required=False, default=False)
 
 
 class UserProfileMixin(object):
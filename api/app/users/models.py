@@ -1,7 +1,8 @@
 from datetime import datetime, timedelta
 
-from app import db, bcrypt, LOGGER
+from app import db, LOGGER
 from app.utils.misc import make_code
+from app.users.passwords import hash_password
 from flask_login import UserMixin
 from sqlalchemy.schema import UniqueConstraint
 
@@ -35,7 +36,11 @@ class AppUser(db.Model, UserMixin):
     policy_agreed_datetime = db.Column(db.DateTime(), nullable=True)
     organisation_id = db.Column(db.Integer(), db.ForeignKey('organisation.id'), nullable=False)
 
-    __table_args__ = (UniqueConstraint('email', 'organisation_id', name='org_email_unique'),)
+    __table_args__ = (
+        UniqueConstraint('email', 'organisation_id', name='org_email_unique'),
+        # Emails are unique ignoring case, and looked up by this index (see UserRepository.get_by_email)
+        db.Index('uq_app_user_organisation_email', organisation_id, db.func.lower(email), unique=True),
+    )
 
     nationality_country = db.relationship('Country', foreign_keys=[nationality_country_id])
     residence_country = db.relationship('Country', foreign_keys=[residence_country_id])
@@ -64,7 +69,7 @@ class AppUser(db.Model, UserMixin):
         self.agree_to_policy()
 
     def set_password(self, password):
-        self.password = bcrypt.generate_password_hash(password)
+        self.password = hash_password(password)
 
     def deactivate(self):
         self.active = False
@@ -0,0 +1,102 @@
+"""Password hashing, done in a pool of processes (or native threads under gevent) so bcrypt doesn't hold
+up the requests of a worker."""
+
+import multiprocessing
+import os
+import threading
+
+from app import app, bcrypt
+
+
+def _hash(password, rounds):
+    return bcrypt.generate_password_hash(password, rounds)
+
+
+def _check(pw_hash, password):
+    return bcrypt.check_password_hash(pw_hash, password)
+
+
+def get_rounds(pw_hash):
+    """The bcrypt cost factor a hash was made with, e.g. 12 for $2b$12$..."""
+    try:
+        return int(pw_hash.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasher():
+    """Runs bcrypt in a pool of processes, or in the calling thread if processes is 0.
+    With use_gevent, it runs in gevent's pool of native threads instead, since waiting on a
+    multiprocessing pool blocks every greenlet of a gevent worker. At most max_pending hashes
+    are queued at once, callers beyond that wait for a slot. A hash that takes longer than
+    PASSWORD_HASH_TIMEOUT raises multiprocessing.TimeoutError."""
+
+    def __init__(self, processes, max_pending, use_gevent=False):
+        self.processes = processes
+        self.use_gevent = use_gevent
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def start(self):
+        """Fork the hashing processes. Call this while the process has no other threads, as a
+        process forked from a multithreaded one can wait forever on a lock another thread held;
+        gunicorn.config.py calls it when a worker is forked. Otherwise the pool is forked on first use."""
+        if self.processes and not self.use_gevent:
+            self._get_pool()
+
+    def _get_pool(self):
+        # A pool can't be shared with forked processes, e.g. gunicorn workers forked from a preloaded app
+        with self._pool_lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = multiprocessing.Pool(self.processes)
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _run(self, func, *args):
+        if not self.processes:
+            return func(*args)
+        with self._slots:
+            if self.use_gevent:
+                return self._run_in_threadpool(func, args)
+            return self._get_pool().apply_async(func, args).get(app.config['PASSWORD_HASH_TIMEOUT'])
+
+    def _run_in_threadpool(self, func, args):
+        # Imported here as gevent is only installed for the gevent worker
+        import gevent
+        try:
+            # bcrypt releases the GIL, so greenlets keep running while it hashes
+            return gevent.get_hub().threadpool.spawn(func, *args).get(timeout=app.config['PASSWORD_HASH_TIMEOUT'])
+        except gevent.Timeout:
+            raise multiprocessing.TimeoutError()
+
+    def hash(self, password, rounds):
+        return self._run(_hash, password, rounds)
+
+    def check(self, pw_hash, password):
+        return self._run(_check, pw_hash, password)
+
+    def close(self):
+        with self._pool_lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.terminate()
+            self._pool = None
+
+
+password_hasher = PasswordHasher(app.config['PASSWORD_HASH_PROCESSES'], app.config['PASSWORD_HASH_MAX_PENDING'],
+                                 use_gevent=app.config['WORKER_CLASS'] == 'gevent')
+
+
+def hash_password(password):
+    """Hash a password with the current BCRYPT_LOG_ROUNDS."""
+    return password_hasher.hash(password, app.config['BCRYPT_LOG_ROUNDS'])
+
+
+def check_password(pw_hash, password):
+    return password_hasher.check(pw_hash, password)
+
+
+def needs_rehash(pw_hash):
+    """Whether a hash was made with a different cost factor than the current BCRYPT_LOG_ROUNDS."""
+    return get_rounds(pw_hash) != app.config['BCRYPT_LOG_ROUNDS']
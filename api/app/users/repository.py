@@ -4,7 +4,8 @@ from app.events.models import EventRole
 from app.responses.models import Response
 from app.users.models import AppUser
 from app.organisation.models import Organisation
-from sqlalchemy import func
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.orm import joinedload
 
 class UserRepository():
 
@@ -12,6 +13,12 @@ class UserRepository():
     def get_by_id(user_id):
         return db.session.query(AppUser).get(user_id)
 
+    @staticmethod
+    def get_by_ids(user_ids):
+        if not user_ids:
+            return []
+        return db.session.query(AppUser).filter(AppUser.id.in_(user_ids)).all()
+
     @staticmethod
     def get_by_id_with_response(user_id):
         return db.session.query(AppUser, Response)\
@@ -21,9 +28,11 @@ class UserRepository():
 
     @staticmethod
     def get_by_email(email, organisation_id):
+        # Matches the expression of the uq_app_user_organisation_email index, so the lookup uses it
         return db.session.query(AppUser)\
-            .filter(func.lower(AppUser.email) == func.lower(email))\
-            .filter_by(organisation_id=organisation_id).first()
+            .filter(AppUser.organisation_id == organisation_id,
+                    func.lower(AppUser.email) == func.lower(email))\
+            .first()
 
     @staticmethod
     def get_by_event_admin(user_id, event_admin_user_id):
@@ -54,10 +63,60 @@ class UserRepository():
                          .all()
     
     @staticmethod
-    def get_all_with_responses_for(event_id):
-        return db.session.query(AppUser, Response)\
-                         .filter_by(active=True, is_deleted=False)\
-                         .join(Response, Response.user_id==AppUser.id)\
-                         .join(ApplicationForm, ApplicationForm.id==Response.application_form_id)\
-                         .filter_by(event_id=event_id)\
-                         .all()
\ No newline at end of file
+    def _filter_responses_for(query, event_id, submitted=None, withdrawn=None, user_category_id=None,
+                              nationality_country_id=None, residence_country_id=None):
+        query = query.filter(AppUser.active == True, AppUser.is_deleted == False)\
+                     .join(ApplicationForm, ApplicationForm.id == Response.application_form_id)\
+                     .filter(ApplicationForm.event_id == event_id)
+        if submitted is not None:
+            query = query.filter(Response.is_submitted == submitted)
+        if withdrawn is not None:
+            query = query.filter(Response.is_withdrawn == withdrawn)
+        if user_category_id is not None:
+            query = query.filter(AppUser.user_category_id == user_category_id)
+        if nationality_country_id is not None:
+            query = query.filter(AppUser.nationality_country_id == nationality_country_id)
+        if residence_country_id is not None:
+            query = query.filter(AppUser.residence_country_id == residence_country_id)
+        return query
+
+    @staticmethod
+    def get_page_with_responses_for(event_id, sort_column, descending=False, after=None, limit=None, **filters):
+        """Get (AppUser, Response) for the responses to an event ordered by sort_column and then response id,
+        with the user's countries and category loaded. after is the (sort value, response id) of the last
+        row of the previous page, for keyset pagination."""
+        query = db.session.query(AppUser, Response)\
+                          .join(Response, Response.user_id == AppUser.id)\
+                          .options(joinedload(AppUser.nationality_country),
+                                   joinedload(AppUser.residence_country),
+                                   joinedload(AppUser.user_category))
+        query = UserRepository._filter_responses_for(query, event_id, **filters)
+
+        if after is not None:
+            after_value, after_id = after
+            if descending:
+                query = query.filter(or_(sort_column < after_value,
+                                         and_(sort_column == after_value, Response.id < after_id)))
+            else:
+                query = query.filter(or_(sort_column > after_value,
+                                         and_(sort_column == after_value, Response.id > after_id)))
+
+        if descending:
+            query = query.order_by(sort_column.desc(), Response.id.desc())
+        else:
+            query = query.order_by(sort_column, Response.id)
+
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    @staticmethod
+    def count_responses_for(event_id, **filters):
+        """Count the responses to an event as (total, submitted, withdrawn) with one aggregate query."""
+        query = db.session.query(
+            func.count(Response.id),
+            func.coalesce(func.sum(case([(Response.is_submitted == True, 1)], else_=0)), 0),
+            func.coalesce(func.sum(case([(Response.is_withdrawn == True, 1)], else_=0)), 0))\
+            .select_from(Response)\
+            .join(AppUser, AppUser.id == Response.user_id)
+        return UserRepository._filter_responses_for(query, event_id, **filters).one()
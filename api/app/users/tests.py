@@ -1,6 +1,7 @@
 import json
 from datetime import datetime, timedelta
 import copy
+import multiprocessing
 
 from app import app, db
 from app.applicationModel.models import ApplicationForm
@@ -9,8 +10,10 @@ from app.organisation.models import Organisation
 from app.responses.models import Response
 from app.users.models import (AppUser, Country, PasswordReset, UserCategory,
                               UserComment)
+from app.users.passwords import PasswordHasher, get_rounds
 from app.utils.errors import POLICY_ALREADY_AGREED, POLICY_NOT_AGREED
 from app.utils.testing import ApiTestCase
+from mock import patch
 
 USER_DATA = {
         'email': 'something@email.com',
@@ -76,6 +79,29 @@ class UserApiTest(ApiTestCase):
         response = self.app.post('/api/v1/user', data=USER_DATA)
         assert response.status_code == 409
 
+    def test_duplicate_registration_different_case(self):
+        self.seed_static_data()
+        response = self.app.post('/api/v1/user', data=USER_DATA)
+        assert response.status_code == 201
+
+        response = self.app.post('/api/v1/user', data=dict(USER_DATA, email=USER_DATA['email'].upper()))
+        assert response.status_code == 409
+
+    def test_authentication_email_case_insensitive(self):
+        self.seed_static_data()
+        response = self.app.post('/api/v1/user', data=USER_DATA)
+        user_id = json.loads(response.data)['id']
+        user = db.session.query(AppUser).get(user_id)
+        user.verify()
+        db.session.commit()
+
+        response = self.app.post('api/v1/authenticate', data={
+            'email': USER_DATA['email'].upper(),
+            'password': USER_DATA['password']
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['id'], user_id)
+
     def test_policy_not_agreed(self):
         self.seed_static_data()
         user_data = copy.deepcopy(USER_DATA)
@@ -140,6 +166,51 @@ class UserApiTest(ApiTestCase):
         response = self.app.post('/api/v1/authenticate', data=AUTH_DATA)
         assert response.status_code == 404
 
+    def test_authentication_rehashes_password(self):
+        self.seed_static_data()
+        response = self.app.post('/api/v1/user', data=USER_DATA)
+        user_id = json.loads(response.data)['id']
+        user = db.session.query(AppUser).get(user_id)
+        user.verify()
+        db.session.commit()
+
+        rounds = app.config['BCRYPT_LOG_ROUNDS']
+        app.config['BCRYPT_LOG_ROUNDS'] = rounds + 1
+        try:
+            response = self.app.post('/api/v1/authenticate', data=AUTH_DATA)
+            self.assertEqual(response.status_code, 200)
+        finally:
+            app.config['BCRYPT_LOG_ROUNDS'] = rounds
+
+        user = db.session.query(AppUser).get(user_id)
+        self.assertEqual(get_rounds(user.password), rounds + 1)
+
+        response = self.app.post('/api/v1/authenticate', data=AUTH_DATA)
+        self.assertEqual(response.status_code, 200)
+
+    def test_password_hasher_pool(self):
+        hasher = PasswordHasher(processes=1, max_pending=2)
+        try:
+            hasher.start()
+            self.assertIsNotNone(hasher._pool)
+            pw_hash = hasher.hash('secret', 4)
+            self.assertEqual(get_rounds(pw_hash), 4)
+            self.assertTrue(hasher.check(pw_hash, 'secret'))
+            self.assertFalse(hasher.check(pw_hash, 'wrong'))
+        finally:
+            hasher.close()
+
+    def test_authentication_busy_when_password_check_times_out(self):
+        self.seed_static_data()
+        response = self.app.post('/api/v1/user', data=USER_DATA)
+        user_id = json.loads(response.data)['id']
+        db.session.query(AppUser).get(user_id).verify()
+        db.session.commit()
+
+        with patch('app.users.api.check_password', side_effect=multiprocessing.TimeoutError):
+            response = self.app.post('/api/v1/authenticate', data=AUTH_DATA)
+        self.assertEqual(response.status_code, 503)
+
     def test_authentication_unverified_email(self):
         self.seed_static_data()
         response = self.app.post('/api/v1/user', data=USER_DATA)
@@ -395,6 +466,45 @@ class UserApiTest(ApiTestCase):
         self.assertEqual(data[1]['submitted_timestamp'], None)
         self.assertEqual(data[1]['is_withdrawn'], True)
 
+    def test_user_profile_list_pages(self):
+        self.seed_static_data()
+        self.setup_responses()
+        header = self.get_auth_header_for('ea@ea.com')
+
+        response = self.app.get('/api/v1/userprofilelist', headers=header,
+                                data={'event_id': 1, 'limit': 1, 'sort': 'lastname', 'descending': 'true'})
+        data = json.loads(response.data)
+        self.assertEqual([p['user_id'] for p in data], [2])
+        cursor = response.headers['X-Next-Cursor']
+
+        response = self.app.get('/api/v1/userprofilelist', headers=header,
+                                data={'event_id': 1, 'limit': 1, 'sort': 'lastname', 'descending': 'true', 'cursor': cursor})
+        data = json.loads(response.data)
+        self.assertEqual([p['user_id'] for p in data], [1])
+        self.assertNotIn('X-Next-Cursor', response.headers)
+
+        response = self.app.get('/api/v1/userprofilelist', headers=header,
+                                data={'event_id': 1, 'limit': 1, 'cursor': 'not a cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_user_profile_list_filters_and_count(self):
+        self.seed_static_data()
+        self.setup_responses()
+        header = self.get_auth_header_for('ea@ea.com')
+
+        response = self.app.get('/api/v1/userprofilelist', headers=header, data={'event_id': 1, 'submitted': 'true'})
+        data = json.loads(response.data)
+        self.assertEqual([p['user_id'] for p in data], [1])
+
+        response = self.app.get('/api/v1/userprofilelist/count', headers=header, data={'event_id': 1})
+        data = json.loads(response.data)
+        self.assertEqual(data, {'total': 2, 'submitted': 1, 'withdrawn': 1})
+
+        response = self.app.get('/api/v1/userprofilelist/count', headers=header,
+                                data={'event_id': 1, 'withdrawn': 'false'})
+        data = json.loads(response.data)
+        self.assertEqual(data, {'total': 1, 'submitted': 1, 'withdrawn': 0})
+
 class UserCommentAPITest(ApiTestCase):
 
     def seed_static_data(self):
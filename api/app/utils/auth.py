@@ -77,14 +77,14 @@ def event_admin_required(func):
     def wrapper(*args, **kwargs):
         req_parser = reqparse.RequestParser()
         req_parser.add_argument('event_id', type=int, required=True)
-        args = req_parser.parse_args()
+        event_id = req_parser.parse_args()['event_id']
 
         user = get_user_from_request()
         if user:
             user_info = user_repository.get_by_id(user['id'])
-            if user_info.is_event_admin(args['event_id']):
+            if user_info.is_event_admin(event_id):
                 g.current_user = user
-                return func(*args, event_id=args['event_id'], **kwargs)
+                return func(*args, event_id=event_id, **kwargs)
         
         return FORBIDDEN
 
@@ -0,0 +1,124 @@
+"""Create a new database from the models rather than by replaying every migration.
+
+    python run.py export_reference_data --directory reference_data   (against an existing database)
+    python run.py bootstrap --reference-data reference_data          (against the new, empty database)
+
+bootstrap creates the tables with db.create_all(), loads the reference data exported from an
+existing database and stamps the database with the head migration, so later migrations apply as usual.
+"""
+
+import csv
+import os
+
+from flask_migrate import stamp
+from sqlalchemy import inspect
+
+from app import db, LOGGER
+
+# Tables every environment needs, in foreign key order
+REFERENCE_TABLES = ('country', 'user_category', 'email_template')
+# Only the rows of a reference table matching its filter are exported, e.g. not the templates of
+# particular events, which don't exist in a new database
+REFERENCE_FILTERS = {
+    'email_template': 'event_id IS NULL'
+}
+
+
+def _is_postgres():
+    return db.engine.dialect.name == 'postgresql'
+
+
+def _csv_path(directory, table_name):
+    return os.path.join(directory, '{}.csv'.format(table_name))
+
+
+def _column_names(table):
+    return [column.name for column in table.columns]
+
+
+def export_reference_data(directory):
+    """Write each reference table to <directory>/<table>.csv, with a header row."""
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    for table_name in REFERENCE_TABLES:
+        table = db.metadata.tables[table_name]
+        columns = _column_names(table)
+        query = 'SELECT {} FROM {} WHERE {} ORDER BY id'.format(
+            ', '.join('"{}"'.format(c) for c in columns), table_name, REFERENCE_FILTERS.get(table_name, '1 = 1'))
+        with open(_csv_path(directory, table_name), 'wb') as output:
+            if _is_postgres():
+                cursor = db.session.connection().connection.cursor()
+                cursor.copy_expert('COPY ({}) TO STDOUT WITH CSV HEADER'.format(query), output)
+            else:
+                writer = csv.writer(output)
+                writer.writerow(columns)
+                for row in db.session.execute(query):
+                    writer.writerow([_csv_value(value) for value in row])
+        LOGGER.info('Exported %s', table_name)
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, unicode):
+        return value.encode('utf-8')
+    return value
+
+
+def _parse_csv_value(column, value):
+    if value == '':
+        return None if column.nullable else value
+    if isinstance(column.type, db.Boolean):
+        return value == 't'
+    if isinstance(column.type, db.Integer):
+        return int(value)
+    return value.decode('utf-8')
+
+
+def load_reference_data(directory):
+    """Load <directory>/<table>.csv into each reference table, with COPY on PostgreSQL.
+    Tables without a file are skipped."""
+    for table_name in REFERENCE_TABLES:
+        path = _csv_path(directory, table_name)
+        if not os.path.exists(path):
+            LOGGER.warning('No reference data for %s in %s', table_name, directory)
+            continue
+
+        table = db.metadata.tables[table_name]
+        with open(path, 'rb') as data:
+            columns = next(csv.reader(data))
+            if _is_postgres():
+                data.seek(0)
+                cursor = db.session.connection().connection.cursor()
+                cursor.copy_expert('COPY {} ({}) FROM STDIN WITH CSV HEADER'.format(
+                    table_name, ', '.join('"{}"'.format(c) for c in columns)), data)
+                # COPY doesn't advance the id sequence past the loaded ids
+                db.session.execute(
+                    "SELECT setval(pg_get_serial_sequence('{0}', 'id'), coalesce(max(id), 0) + 1, false) "
+                    "FROM {0}".format(table_name))
+            else:
+                rows = [{name: _parse_csv_value(table.c[name], value) for name, value in zip(columns, row)}
+                        for row in csv.reader(data)]
+                if rows:
+                    db.session.execute(table.insert(), rows)
+        LOGGER.info('Loaded %s', table_name)
+    db.session.commit()
+
+
+def bootstrap(reference_data=None, migrations_directory=None):
+    """Create the schema in an empty database, load the reference data and stamp the head migration."""
+    existing_tables = inspect(db.engine).get_table_names()
+    if existing_tables:
+        raise ValueError('The database already has tables ({}), upgrade it with "db upgrade" instead'.format(
+            ', '.join(sorted(existing_tables)[:5])))
+
+    db.create_all()
+    LOGGER.info('Created %d tables', len(db.metadata.tables))
+
+    if reference_data:
+        load_reference_data(reference_data)
+
+    stamp(directory=migrations_directory, revision='head')
@@ -0,0 +1,153 @@
+"""Caches, held in each worker's memory, of data that is built from the database and rarely changes.
+
+A cache's entries belong to groups (e.g. the organisation they were built for), and the cache
+registers which models each group is built from. A commit that changes one of those models drops
+the affected groups in the committing worker and increments their generation in redis. Every
+worker compares the generations an entry was built under with those in redis before using it, so
+the other workers drop it too. Without redis, entries only drop on this worker's own changes and
+after their TTL."""
+
+import time
+
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import LOGGER, redis
+
+# The group that stands for every group of a cache
+ALL = None
+
+# How long to stop asking redis for generations after it couldn't be reached
+REDIS_RETRY_SECONDS = 30
+
+_caches = []
+_redis_retry_at = 0
+
+
+class ModelCache():
+
+    def __init__(self, name, ttl_seconds=300):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        # key -> (group, generations, expires_at, value)
+        self._entries = {}
+        # [(model, function of a changed instance to the group it affects)]
+        self._dependencies = []
+        _caches.append(self)
+
+    def depends_on(self, model, group_of):
+        """Drop a group when an instance of model is changed. group_of(instance) gives the group, or ALL."""
+        self._dependencies.append((model, group_of))
+
+    def load(self, key, group, build):
+        """Get the value cached for key, which belongs to group, calling build() if it isn't cached
+        or was invalidated. build returns (value, max_age), with max_age None for the cache's TTL;
+        a value with a max_age of 0 or less isn't cached."""
+        generations = _get_generations(self.name, group)
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] == generations and entry[2] > now:
+            return entry[3]
+
+        value, max_age = build()
+        if max_age is None:
+            max_age = self.ttl_seconds
+        if max_age > 0:
+            self._entries[key] = (group, generations, now + max_age, value)
+        return value
+
+    def invalidate(self, group=ALL):
+        """Drop this worker's entries of a group."""
+        for key, entry in list(self._entries.items()):
+            if group is ALL or entry[0] == group:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def changed_groups(self, instances):
+        return set(group_of(instance)
+                   for model, group_of in self._dependencies
+                   for instance in instances if isinstance(instance, model))
+
+
+def clear_all():
+    for cache in _caches:
+        cache.clear()
+
+
+def _generation_key(name, group):
+    return 'cache:{}:{}'.format(name, '*' if group is ALL else group)
+
+
+def _redis_unavailable(error):
+    global _redis_retry_at
+    if not _redis_retry_at:
+        LOGGER.warn('Could not reach redis, cached data is only refreshed after its TTL: {}'.format(error))
+    _redis_retry_at = time.time() + REDIS_RETRY_SECONDS
+
+
+def _get_generations(name, group):
+    """The generations of the cache and of the group, or None if redis can't be reached."""
+    global _redis_retry_at
+    if _redis_retry_at > time.time():
+        return None
+    try:
+        generations = tuple(redis.mget([_generation_key(name, ALL), _generation_key(name, group)]))
+    except RedisError as e:
+        _redis_unavailable(e)
+        return None
+    _redis_retry_at = 0
+    return generations
+
+
+def _increment_generations(changes):
+    if _redis_retry_at > time.time():
+        return
+    try:
+        for cache, group in changes:
+            redis.incr(_generation_key(cache.name, group))
+    except RedisError as e:
+        _redis_unavailable(e)
+
+
+def _pending_changes(session):
+    return session.info.setdefault('changed_cache_groups', set())
+
+
+@event.listens_for(Session, 'before_flush')
+def _invalidate_flushed(session, flush_context, instances):
+    instances = list(session.new) + list(session.dirty) + list(session.deleted)
+    for cache in _caches:
+        for group in cache.changed_groups(instances):
+            _pending_changes(session).add((cache, group))
+            cache.invalidate(group)
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_committed(session):
+    if session.transaction.nested:
+        # Releasing a savepoint, other workers can't see the changes until the transaction commits
+        return
+    changes = session.info.pop('changed_cache_groups', ())
+    # Invalidate again in case an entry was rebuilt between the flush and the commit
+    for cache, group in changes:
+        cache.invalidate(group)
+    _increment_generations(changes)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _invalidate_rolled_back(session):
+    # Entries rebuilt between the flush and the rollback may hold the rolled back changes. Changes
+    # flushed before a rolled back savepoint may still be committed, so only forget them once the
+    # whole transaction is rolled back.
+    changes = session.info.get('changed_cache_groups', ())
+    for cache, group in changes:
+        cache.invalidate(group)
+
+    transaction = session.transaction
+    while transaction.parent is not None and not transaction.nested:
+        transaction = transaction.parent
+    if not transaction.nested:
+        session.info.pop('changed_cache_groups', None)
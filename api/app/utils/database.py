@@ -0,0 +1,15 @@
+from flask_sqlalchemy import SQLAlchemy
+
+
+class PooledSQLAlchemy(SQLAlchemy):
+    """SQLAlchemy with the PostgreSQL connection pool configured from the DB_POOL_* settings.
+    Flask-SQLAlchemy 2.3 has no SQLALCHEMY_ENGINE_OPTIONS, so the options are added here."""
+
+    def apply_driver_hacks(self, app, info, options):
+        super(PooledSQLAlchemy, self).apply_driver_hacks(app, info, options)
+        if info.drivername.startswith('postgres'):
+            options.setdefault('pool_size', app.config['DB_POOL_SIZE'])
+            options.setdefault('max_overflow', app.config['DB_MAX_OVERFLOW'])
+            options.setdefault('pool_timeout', app.config['DB_POOL_TIMEOUT'])
+            options.setdefault('pool_recycle', app.config['DB_POOL_RECYCLE'])
+            options.setdefault('pool_pre_ping', app.config['DB_POOL_PRE_PING'])
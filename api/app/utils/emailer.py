@@ -1,5 +1,8 @@
+import atexit
+import threading
 import traceback
-from app import LOGGER
+import Queue
+from app import app, LOGGER
 from config import SMTP_USERNAME, SMTP_PASSWORD, SMTP_SENDER_NAME, SMTP_SENDER_EMAIL, SMTP_HOST, SMTP_PORT, DEBUG
 import smtplib
 import email.utils
@@ -11,6 +14,7 @@ from flask import g, request
 from app.email_template.repository import EmailRepository as email_repository
 from app.users.repository import UserRepository as user_repository
 from app.events.repository import EventRepository as event_repository
+from app.utils.metrics import timed
 
 def email_user(
     email_template_key, 
@@ -19,9 +23,13 @@ def email_user(
     event=None,
     subject_parameters=None, 
     file_name='',
-    file_path=''
+    file_path='',
+    deferred=False,
+    on_sent=None
 ):
-    """Send an email to a specified user using an email template. Handles resolving the correct language."""
+    """Send an email to a specified user using an email template. Handles resolving the correct language.
+    If deferred is True, the email is rendered now but handed to the background mail sender.
+    on_sent is called without arguments once the email has been sent, e.g. to record when it was sent."""
     if user is None:
         raise ValueError('You must specify a user!')
 
@@ -48,7 +56,81 @@ def email_user(
         template_parameters['event_name'] = event.get_name(language) if event.has_specific_translation(language) else event.get_name('en')
 
     body_text = email_template.template.format(**template_parameters)
-    send_mail(recipient=user.email, subject=subject, body_text=body_text, file_name=file_name, file_path=file_path)
+    if deferred:
+        defer_mail(recipient=user.email, subject=subject, body_text=body_text, file_name=file_name, file_path=file_path,
+                   on_sent=on_sent)
+    else:
+        send_mail(recipient=user.email, subject=subject, body_text=body_text, file_name=file_name, file_path=file_path)
+        if on_sent is not None:
+            on_sent()
+
+
+_mail_queue = Queue.Queue()
+_mail_worker = None
+_mail_worker_lock = threading.Lock()
+
+
+def defer_mail(on_sent=None, **kwargs):
+    """Queue an email for the background mail sender so the request doesn't wait on SMTP.
+    Takes the same arguments as send_mail. on_sent is called in an app context once the email
+    has been sent, and not at all if sending fails. Emails are sent immediately when testing."""
+    # The sender thread runs outside of the request, so resolve the organisation now
+    kwargs['sender_name'] = kwargs.get('sender_name') or g.organisation.name
+    kwargs['sender_email'] = kwargs.get('sender_email') or g.organisation.email_from
+
+    if app.config.get('TESTING'):
+        send_mail(**kwargs)
+        if on_sent is not None:
+            on_sent()
+        return
+
+    _start_mail_worker()
+    _mail_queue.put((kwargs, on_sent))
+
+
+def _start_mail_worker():
+    global _mail_worker
+    with _mail_worker_lock:
+        if _mail_worker is None or not _mail_worker.is_alive():
+            _mail_worker = threading.Thread(target=_process_mail_queue, name='mail-sender')
+            _mail_worker.daemon = True
+            _mail_worker.start()
+
+
+def _send_queued_mail(kwargs, on_sent):
+    try:
+        send_mail(**kwargs)
+    except Exception:
+        # send_mail has already logged the failure
+        LOGGER.error('Failed to send deferred email to {}'.format(kwargs.get('recipient')))
+        return
+
+    if on_sent is not None:
+        try:
+            with app.app_context():
+                on_sent()
+        except Exception:
+            LOGGER.error('Failed to record the email sent to {}: {}'.format(
+                kwargs.get('recipient'), traceback.format_exc()))
+
+
+def _process_mail_queue():
+    while True:
+        kwargs, on_sent = _mail_queue.get()
+        _send_queued_mail(kwargs, on_sent)
+        _mail_queue.task_done()
+
+
+@atexit.register
+def _flush_mail_queue():
+    """Send anything still queued when the worker process shuts down."""
+    while True:
+        try:
+            kwargs, on_sent = _mail_queue.get_nowait()
+        except Queue.Empty:
+            return
+        _send_queued_mail(kwargs, on_sent)
+        _mail_queue.task_done()
 
 
 def send_mail(recipient, subject, body_text='', body_html='', charset='UTF-8', mail_type='AMZ', file_name='',
@@ -95,21 +177,18 @@ def send_mail(recipient, subject, body_text='', body_html='', charset='UTF-8', m
                 msg.attach(body_part1)
                 msg.attach(body_part2)
 
-                server = smtplib.SMTP(SMTP_HOST, SMTP_PORT)
-                server.ehlo()
-                server.starttls()
-                server.ehlo()
-                server.login(SMTP_USERNAME, SMTP_PASSWORD)
-                server.sendmail(sender_email, recipient, msg.as_string())
-                server.close()
+                with timed('smtp'):
+                    server = smtplib.SMTP(SMTP_HOST, SMTP_PORT)
+                    server.ehlo()
+                    server.starttls()
+                    server.ehlo()
+                    server.login(SMTP_USERNAME, SMTP_PASSWORD)
+                    server.sendmail(sender_email, recipient, msg.as_string())
+                    server.close()
             except Exception as e:
                 LOGGER.error("Exception {} while trying to send email: {}".format(e, traceback.format_exc()))
                 raise e
 
     else:
-        LOGGER.debug('Sender Name: {sender_name}'.format(sender_name=sender_name))
-        LOGGER.debug('Sender Email: {sender_email}'.format(sender_email=sender_email))
-        LOGGER.debug('Recipient : {recipient}'.format(recipient=recipient))
-        LOGGER.debug('Subject : {subject}'.format(subject=subject))
-        LOGGER.debug('Body Text : {body}'.format(body=body_text))
-        LOGGER.debug('Body HTML : {body}'.format(body=body_html))
+        LOGGER.debug('Sender Name: %s\nSender Email: %s\nRecipient : %s\nSubject : %s\nBody Text : %s\nBody HTML : %s',
+                     sender_name, sender_email, recipient, subject, body_text, body_html)
@@ -9,6 +9,8 @@ FORBIDDEN = ({'message': 'Access to this resource is forbidden'}, 403)
 RESET_PASSWORD_CODE_NOT_VALID = (
     {'message': 'Valid code is required to reset a password'}, 418)
 TOO_MANY_REQUESTS = ({'message': 'Too many requests'}, 429)
+AUTHENTICATION_BUSY = (
+    {'message': 'Too many people are logging in, please try again', 'type': 'AUTHENTICATION_BUSY'}, 503)
 EVENT_NOT_FOUND = ({'message': 'No event exists with that ID'}, 404)
 EVENT_WITH_KEY_NOT_FOUND = ({'message': 'No event exists with that KEY'}, 404)
 EVENT_WITH_TRANSLATION_NOT_FOUND = ({'message': 'Translation for event not found'}, 404)
@@ -111,6 +113,8 @@ OUTCOME_STATUS_NOT_VALID = (
     {'message': 'Invalid outcome status specified'}, 400)
 CANDIDATE_REJECTED = (
     {'message': 'The candidate has already been rejected for the event'}, 400)
+INVALID_CURSOR = (
+    {'message': 'Invalid pagination cursor'}, 400)
 
 FAILED_CREATE_INTEGRATION_TEST_USER = (
     {'message': 'Failed to create integration test user.'}, 500)
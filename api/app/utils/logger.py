@@ -1,4 +1,103 @@
+import atexit
+import json
+import logging
 import logging.config
+import random
+import threading
+import Queue
+
+from config import LOG_LEVEL, LOG_FORMAT, LOG_ASYNC
+
+# Attributes every LogRecord has, anything else was passed in extra
+_RECORD_ATTRIBUTES = set(logging.LogRecord('', 0, '', 0, '', (), None).__dict__) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, including the fields passed in extra."""
+
+    def format(self, record):
+        entry = {
+            'timestamp': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'location': '{}:{}'.format(record.filename, record.lineno),
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of high-volume messages, which are logged with extra={'sample_rate': <0 to 1>}."""
+
+    def filter(self, record):
+        sample_rate = getattr(record, 'sample_rate', None)
+        return sample_rate is None or random.random() < sample_rate
+
+
+class QueueHandler(logging.Handler):
+    """Puts records on a queue for a QueueListener to write, so logging never blocks the request thread.
+    Records are dropped if the queue is full. (Python 2 has no logging.handlers.QueueHandler.)"""
+
+    def __init__(self, queue):
+        logging.Handler.__init__(self)
+        self.queue = queue
+
+    def prepare(self, record):
+        # Format the message now, since its arguments may change before the listener writes it
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record):
+        try:
+            self.queue.put_nowait(self.prepare(record))
+        except Queue.Full:
+            pass
+        except Exception:
+            self.handleError(record)
+
+
+class QueueListener():
+    """Writes the records of a QueueHandler's queue to handlers from a background thread."""
+
+    _sentinel = None
+
+    def __init__(self, queue, handlers):
+        self.queue = queue
+        self.handlers = handlers
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._monitor, name='log-writer')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _monitor(self):
+        while True:
+            record = self.queue.get()
+            if record is self._sentinel:
+                return
+            for handler in self.handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+
+    def stop(self):
+        """Write the queued records and stop the thread."""
+        if self._thread is not None:
+            self.queue.put(self._sentinel)
+            self._thread.join()
+            self._thread = None
+
 
 LOGGING_APPLICATION_CONF = {
     'version': 1,  # required
@@ -9,18 +108,27 @@ LOGGING_APPLICATION_CONF = {
         },
         'sysout': {
             'format': '%(asctime)s\t%(levelname)s -- %(filename)s:%(lineno)s -- %(message)s',
+        },
+        'json': {
+            '()': JsonFormatter
+        }
+    },
+    'filters': {
+        'sampling': {
+            '()': SamplingFilter
         }
     },
     'handlers': {
         'console': {
             'level': 'DEBUG',
             'class': 'logging.StreamHandler',
-            'formatter': 'sysout'
+            'formatter': 'json' if LOG_FORMAT == 'json' else 'sysout'
         }
     },
     'loggers': {
         'app': {  # 'root' logge
-            'level': 'DEBUG',
+            'level': LOG_LEVEL,
+            'filters': ['sampling'],
             'handlers': ['console']
         }
     }
@@ -28,10 +136,12 @@ LOGGING_APPLICATION_CONF = {
 
 
 class Logger:
-    '''    
+    '''
     This class contains methods to use standard loggers
     '''
 
+    QUEUE_SIZE = 10000
+
     def get_logger(self):
         '''This method sets the configuration for the logger
         Returns:
@@ -41,7 +151,13 @@ class Logger:
         logging.config.dictConfig(LOGGING_APPLICATION_CONF)
         logger = logging.getLogger('app')
         handlers = logger.handlers
-        handler = logging.StreamHandler()
         logger.handlers = []
-        logger.addHandler(handlers[0])
+        if LOG_ASYNC:
+            queue = Queue.Queue(self.QUEUE_SIZE)
+            listener = QueueListener(queue, handlers)
+            listener.start()
+            atexit.register(listener.stop)
+            logger.addHandler(QueueHandler(queue))
+        else:
+            logger.addHandler(handlers[0])
         return logger
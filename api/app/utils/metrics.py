@@ -0,0 +1,107 @@
+"""Prometheus metrics of the API's requests and of its calls to the database, SMTP and Google Cloud Storage.
+
+Under gunicorn set PROMETHEUS_MULTIPROC_DIR to an empty directory shared by the workers, so the
+metrics of all workers are aggregated (see gunicorn.config.py)."""
+
+import hmac
+import os
+import time
+
+import flask_restful as restful
+from flask import Response, g, request
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest, multiprocess)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import app
+from app.utils.errors import UNAUTHORIZED, FORBIDDEN
+
+# Buckets in seconds, finer at the low end where most API requests fall
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REQUEST_DURATION = Histogram(
+    'baobab_request_duration_seconds', 'Time taken to handle a request',
+    ['method', 'route'], buckets=LATENCY_BUCKETS)
+REQUESTS = Counter(
+    'baobab_requests_total', 'Requests handled, by response status',
+    ['method', 'route', 'status'])
+REQUEST_ERRORS = Counter(
+    'baobab_request_errors_total', 'Requests that failed with a server error',
+    ['method', 'route'])
+REQUESTS_IN_PROGRESS = Gauge(
+    'baobab_requests_in_progress', 'Requests currently being handled',
+    ['method', 'route'], multiprocess_mode='livesum')
+EXTERNAL_CALL_DURATION = Histogram(
+    'baobab_external_call_duration_seconds', 'Time taken by calls to the database, SMTP and storage',
+    ['service'], buckets=LATENCY_BUCKETS)
+
+
+def timed(service):
+    """Time a call to an external service, as a context manager or a decorator."""
+    return EXTERNAL_CALL_DURATION.labels(service=service).time()
+
+
+def _route():
+    # The URL rule rather than the path, so ids in URLs don't create a series per id
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+@app.before_request
+def start_request_metrics():
+    g.metrics_labels = (request.method, _route())
+    g.metrics_start_time = time.time()
+    REQUESTS_IN_PROGRESS.labels(*g.metrics_labels).inc()
+
+
+@app.after_request
+def record_response_status(response):
+    g.metrics_status = response.status_code
+    return response
+
+
+@app.teardown_request
+def finish_request_metrics(exception=None):
+    labels = g.pop('metrics_labels', None)
+    if labels is None:
+        return
+    # after_request isn't called for unhandled exceptions
+    status = g.pop('metrics_status', 500 if exception is not None else 200)
+
+    REQUESTS_IN_PROGRESS.labels(*labels).dec()
+    REQUEST_DURATION.labels(*labels).observe(time.time() - g.pop('metrics_start_time'))
+    REQUESTS.labels(labels[0], labels[1], str(status)).inc()
+    if status >= 500:
+        REQUEST_ERRORS.labels(*labels).inc()
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_database_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_start_time', []).append(time.time())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _stop_database_timer(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get('metrics_start_time')
+    if start_times:
+        EXTERNAL_CALL_DURATION.labels(service='db').observe(time.time() - start_times.pop())
+
+
+class MetricsAPI(restful.Resource):
+    """The metrics in the Prometheus text format, for a scraper authenticated with METRICS_TOKEN."""
+
+    def get(self):
+        token = app.config['METRICS_TOKEN']
+        if not token:
+            return FORBIDDEN
+
+        authorization = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(str(authorization), str('Bearer ' + token)):
+            return UNAUTHORIZED
+
+        if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -1,4 +1,6 @@
 import uuid
+
+import six
 from flask import g
 
 
@@ -8,3 +10,9 @@ def get_baobab_host():
 
 def make_code():
     return str(uuid.uuid4())
+
+
+def is_id(value):
+    """Whether a value read from a JSON body is an integer id. JSON true and false are
+    read as bools, which Python also treats as ints."""
+    return isinstance(value, six.integer_types) and not isinstance(value, bool)
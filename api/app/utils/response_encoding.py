@@ -0,0 +1,93 @@
+"""Encodes API responses: JSON without whitespace, ETags and 304s for GETs, and gzip or brotli compression."""
+
+import hashlib
+import json
+import zlib
+
+from flask import Response, g, make_response, request
+
+from app import app, rest_api
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 6
+# Higher brotli qualities compress better but are too slow for responses built per request
+BROTLI_QUALITY = 5
+_COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html', 'text/plain', 'text/csv')
+
+
+@rest_api.representation('application/json')
+def output_json(data, code, headers=None):
+    """Serialize a resource's output. Unlike Flask-RESTful's own representation, this doesn't indent
+    and sort the keys in debug mode, so json always uses its C encoder and the output is smaller."""
+    response = make_response(json.dumps(data, separators=(',', ':')), code)
+    response.headers.extend(headers or {})
+    return response
+
+
+def version_etag(*version):
+    """Use a version of the requested resource as its ETag, for resources whose data has a version,
+    so the resource needn't be read to answer a conditional GET. version must change whenever the
+    response would, e.g. ('roster', event_id, roster_version, page). Returns a 304 response if the
+    client has this version, otherwise None and the response gets the ETag."""
+    etag = hashlib.sha1(':'.join(str(part) for part in version)).hexdigest()
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304, headers={'Cache-Control': 'no-cache'})
+        response.set_etag(etag)
+        return response
+    g.response_etag = etag
+    return None
+
+
+def _negotiate_encoding():
+    if brotli is not None and request.accept_encodings['br']:
+        return 'br'
+    if request.accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def _compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+@app.after_request
+def encode_response(response):
+    if (response.direct_passthrough or response.is_streamed or 'Content-Encoding' in response.headers
+            or response.mimetype not in _COMPRESSIBLE_MIMETYPES):
+        return response
+
+    if request.method == 'GET' and response.status_code == 200:
+        etag, _ = response.get_etag()
+        if etag is None:
+            etag = g.pop('response_etag', None) or hashlib.sha1(response.get_data()).hexdigest()
+            response.set_etag(etag)
+            if 'Cache-Control' not in response.headers:
+                # The response may be stored, but must be checked with its ETag before it's reused
+                response.headers['Cache-Control'] = 'no-cache'
+        if request.if_none_match.contains_weak(etag):
+            response.status_code = 304
+            response.set_data(b'')
+            del response.headers['Content-Length']
+            return response
+
+    if not app.config['COMPRESS_RESPONSES'] or (response.content_length or 0) < app.config['COMPRESSION_MIN_SIZE']:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = _negotiate_encoding()
+    if encoding is None:
+        return response
+    response.set_data(_compress(response.get_data(), encoding))
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag is not None and not weak:
+        # The compressed bytes differ from those the ETag was made for
+        response.set_etag(etag, weak=True)
+    return response
@@ -0,0 +1,135 @@
+import heapq
+import re
+import time
+from functools import wraps
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import app, LOGGER
+
+# Bound parameter lists such as "IN (?, ?, ?)" or "IN (%(id_1)s, %(id_2)s)" vary in length
+# with the number of values, so collapse them to compare statement shapes
+_IN_LIST = re.compile(r'IN \((?:[^()]|\([^()]*\))*\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def statement_shape(statement):
+    """The statement with IN lists and whitespace collapsed, so that statements that only differ
+    in their parameters have the same shape."""
+    return _IN_LIST.sub('IN (...)', _WHITESPACE.sub(' ', statement).strip())
+
+
+class QueryStats():
+    """The SQL statements executed while handling a request."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        # shape -> number of executions
+        self.shapes = {}
+        # min-heap of (duration, statement) holding the slowest statements
+        self.slowest = []
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.total_time += duration
+        shape = statement_shape(statement)
+        self.shapes[shape] = self.shapes.get(shape, 0) + 1
+
+        entry = (duration, shape)
+        if len(self.slowest) < app.config['SQL_SLOWEST_STATEMENTS']:
+            heapq.heappush(self.slowest, entry)
+        elif entry > self.slowest[0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def repeated_shapes(self, threshold):
+        """The statement shapes executed at least threshold times, most repeated first."""
+        repeated = [(count, shape) for shape, count in self.shapes.items() if count >= threshold]
+        return sorted(repeated, reverse=True)
+
+    def slowest_statements(self):
+        return sorted(self.slowest, reverse=True)
+
+
+def get_query_stats():
+    """The QueryStats of the current request, or None outside of a request."""
+    if not has_request_context():
+        return None
+    return g.get('sql_stats')
+
+
+def query_budget(max_queries):
+    """Declare the number of SQL statements an endpoint may execute per request.
+    An endpoint exceeding its budget fails with an AssertionError when TESTING, and logs a warning otherwise."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            g.sql_query_budget = max_queries
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.time())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get('query_start_time')
+    if not start_times:
+        return
+    duration = time.time() - start_times.pop()
+
+    if not app.config['SQL_INSTRUMENTATION'] or not has_request_context():
+        return
+    stats = g.get('sql_stats')
+    if stats is None:
+        stats = g.sql_stats = QueryStats()
+    stats.record(statement, duration)
+
+
+@app.after_request
+def report_query_stats(response):
+    stats = get_query_stats()
+    if stats is None:
+        return response
+
+    total_ms = stats.total_time * 1000
+    slowest = stats.slowest_statements()
+    response.headers.add('Server-Timing', 'db;dur={:.1f};desc="{} queries"'.format(total_ms, stats.count))
+    if slowest:
+        response.headers.add('Server-Timing', 'db-slowest;dur={:.1f}'.format(slowest[0][0] * 1000))
+
+    LOGGER.info('SQL %s %s: %d queries in %.1fms', request.method, request.path, stats.count, total_ms,
+                extra={
+                    'sample_rate': app.config['LOG_SAMPLE_RATE'],
+                    'sql_queries': stats.count,
+                    'sql_time_ms': round(total_ms, 1),
+                    'sql_slowest': [{'ms': round(duration * 1000, 1), 'statement': shape}
+                                    for duration, shape in slowest]
+                })
+
+    for count, shape in stats.repeated_shapes(app.config['SQL_N_PLUS_ONE_THRESHOLD']):
+        LOGGER.warning('Possible N+1 in %s %s: statement executed %d times: %s',
+                       request.method, request.path, count, shape)
+
+    budget = g.get('sql_query_budget')
+    if budget is not None and stats.count > budget:
+        message = '{} {} executed {} queries, more than its budget of {}'.format(
+            request.method, request.path, stats.count, budget)
+        if app.config['TESTING']:
+            raise AssertionError(message)
+        LOGGER.warning(message)
+
+    return response
+
+
+@app.teardown_request
+def clear_query_stats(exception=None):
+    # g outlives the request when an application context was pushed beforehand, e.g. in tests
+    g.pop('sql_stats', None)
+    g.pop('sql_query_budget', None)
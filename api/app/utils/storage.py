@@ -1,9 +1,7 @@
 """Utilities for interaction with Google Cloud Storage, and a mock version of it for loal development."""
 
-from google.cloud import storage
-from google.oauth2 import service_account
-from google.auth.credentials import AnonymousCredentials
-from google.api_core.client_options import ClientOptions
+# The Google Cloud libraries are imported when a bucket is first needed rather than with the app,
+# they take a large share of the app's import time and most requests don't use them
 from config import GCP_CREDENTIALS_DICT, GCP_PROJECT_NAME, GCP_BUCKET_NAME
 
 import requests
@@ -13,6 +11,10 @@ import os
 from app import LOGGER
 
 def _create_dummy_storage_client():
+    from google.cloud import storage
+    from google.auth.credentials import AnonymousCredentials
+    from google.api_core.client_options import ClientOptions
+
     fake_host = os.getenv('STORAGE_PORT_4443_TCP_ADDR')
     external_url = 'https://{}:4443'.format(fake_host)
     storage.blob._API_ACCESS_ENDPOINT = 'https://storage.gcs.{}.nip.io:4443'.format(fake_host)
@@ -43,6 +45,9 @@ def _create_dummy_storage_client():
 
 
 def _create_real_storage_client():
+    from google.cloud import storage
+    from google.oauth2 import service_account
+
     if GCP_CREDENTIALS_DICT['private_key'] == 'dummy':
         # Running on GCP, so no credentials needed
         storage_client = storage.Client(project=GCP_PROJECT_NAME)
@@ -31,16 +31,14 @@ def _get_answer_value(answer, question, question_translation):
 
     return answer.value
 
-def _find_answer(question, answers):
-    answer = [a for a in answers if a.question_id == question.id]
-    if answer:
-        return answer[0]
-    else:
-        return None
-
 def build_response_email_body(answers, language, application_form):
+    """The questions and answers of a response, one after the other. Load the application form with
+    ApplicationFormRepository.get_by_id_with_contents to avoid a query per section and question."""
     #stringifying the dictionary summary, with linebreaks between question/answer pairs
     stringified_summary = ""
+    answers_by_question = {}
+    for answer in answers:
+        answers_by_question.setdefault(answer.question_id, answer)
 
     for section in application_form.sections:
         if not section.questions:
@@ -56,9 +54,9 @@ def build_response_email_body(answers, language, application_form):
                 LOGGER.error('Missing {} translation for question {}.'.format(language, question.id))
                 question_translation = question.get_translation('en')
 
-            answer = _find_answer(question, answers)
+            answer = answers_by_question.get(question.id)
             if answer:
-                answer_value = _get_answer_value(answer, answer.question, question_translation)
+                answer_value = _get_answer_value(answer, question, question_translation)
                 stringified_summary += '{question}\n{answer}\n\n'.format(question=question_translation.headline, answer=answer_value)
 
     return stringified_summary
@@ -3,6 +3,7 @@ import os
 import random
 import unicodedata
 import unittest
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from sqlite3 import Connection as SQLite3Connection
 
@@ -21,6 +22,7 @@ from app.registration.models import Offer, RegistrationForm
 from app.responses.models import Answer, Response
 from app.users.models import AppUser, Country, UserCategory
 from app.email_template.models import EmailTemplate
+from app.utils import cache
 
 
 @event.listens_for(Engine, "connect")
@@ -28,9 +30,72 @@ def set_sqlite_pragma(dbapi_connection, connection_record):
     cursor = dbapi_connection.cursor()
     cursor.execute("PRAGMA foreign_keys=ON")
     cursor.close()
+    if isinstance(dbapi_connection, SQLite3Connection):
+        # Stop pysqlite from managing transactions itself so SAVEPOINTs work, see
+        # https://docs.sqlalchemy.org/en/13/dialects/sqlite.html#serializable-isolation-savepoints-transactional-ddl
+        dbapi_connection.isolation_level = None
+
+
+@event.listens_for(Engine, "begin")
+def begin_sqlite_transaction(connection):
+    if connection.dialect.name == 'sqlite':
+        connection.execute("BEGIN")
 
 titles = ('Mr', "Ms", 'Mrs', 'Dr', 'Prof', 'Rev', 'Mx')
 
+# bcrypt cost used in tests, the minimum, since hashing at the production cost dominates the test run time
+TEST_BCRYPT_LOG_ROUNDS = 4
+
+# The engine whose database has the schema, which is created once per process and emptied between tests
+_schema_engine = None
+
+
+def reset_database():
+    """Create the tables on first use and afterwards delete every row, which is much quicker than
+    dropping and recreating them. SQLite restarts ids at 1 in emptied tables."""
+    global _schema_engine
+    db.session.remove()
+    if _schema_engine is not db.engine:
+        db.reflect()
+        db.drop_all()
+        db.create_all()
+        _schema_engine = db.engine
+    else:
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+
+
+class QueryCounter():
+    """The SQL statements executed within a count_queries block."""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries():
+    """Count the SQL statements executed in the block, e.g.
+        with count_queries() as queries:
+            self.app.get('/api/v1/events', headers=headers)
+        self.assertLessEqual(queries.count, 5)
+    """
+    counter = QueryCounter()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        counter.statements.append(statement)
+
+    event.listen(db.engine, 'after_cursor_execute', record)
+    try:
+        yield counter
+    finally:
+        event.remove(db.engine, 'after_cursor_execute', record)
+
+
 def strip_accents(text):
     """
     Strip accents from input.
@@ -110,28 +175,38 @@ class ApiTestCase(unittest.TestCase):
                     is_admin=False,
                     post_create_fn=lambda x: None):
         firstnames, lastnames = self._get_names()
+        users = []
         for i in range(n):
             title = random.choice(titles)
             firstname = random.choice(firstnames)
             lastname = random.choice(lastnames)
             email = "{firstname}.{lastname}{num}@bestemail.com".format(firstname=firstname,
                                                                        lastname=lastname if lastname != "" else "x",
-                                                                       num=len(self.test_users))
+                                                                       num=len(self.test_users) + i)
             email = strip_accents(email)
-            try:
-                self.add_user(email, firstname, lastname, title, password, organisation_id, is_admin, post_create_fn)
-            except ProgrammingError as err:
-                LOGGER.debug("info not added for user: {} {} {} {}".format(email, firstname, lastname, title))
-                db.session.rollback()
+            user = AppUser(email, firstname, lastname, title, password, organisation_id, is_admin)
+            user.verify()
+            post_create_fn(user)
+            users.append(user)
+
+        # Added in one flush and commit rather than one per user
+        db.session.add_all(users)
+        try:
+            db.session.commit()
+        except ProgrammingError:
+            LOGGER.debug("%d users not added", n)
+            db.session.rollback()
+            return
+        self.test_users.extend(users)
 
     def setUp(self):
         app.config['TESTING'] = True
         app.config['DEBUG'] = True
         app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        app.config['BCRYPT_LOG_ROUNDS'] = TEST_BCRYPT_LOG_ROUNDS
         self.app = app.test_client()
-        db.reflect()
-        db.drop_all()
-        db.create_all()
+        reset_database()
+        cache.clear_all()
         LOGGER.setLevel('ERROR')
 
         # Add dummy metadata
@@ -211,14 +286,36 @@ class ApiTestCase(unittest.TestCase):
         header = {'Authorization': data['token']}
         return header
 
+    def assert_query_budget(self, budget, add_rows, send_request, sizes=(10, 100)):
+        """Check that a request's query count doesn't grow with the data, i.e. has no N+1.
+        For each of sizes, add_rows(n) adds n rows to reach that size and send_request() is counted,
+        which can also be any function that queries rather than a request.
+        Fails unless every count is the same and at most budget."""
+        counts = []
+        added = 0
+        for size in sizes:
+            add_rows(size - added)
+            added = size
+            # Start from an empty session, as a real request would, so loaded rows aren't reused
+            db.session.remove()
+            with count_queries() as queries:
+                response = send_request()
+            if hasattr(response, 'status_code'):
+                self.assertLess(response.status_code, 400, response.data)
+            counts.append(queries.count)
+
+        message = 'Query counts {} for sizes {}, budget {}:\n{}'.format(
+            counts, sizes, budget, '\n'.join(queries.statements))
+        self.assertEqual(len(set(counts)), 1, message)
+        self.assertLessEqual(counts[0], budget, message)
+
     def add_to_db(self, obj):
         db.session.add(obj)
         db.session.commit()
 
     def tearDown(self):
+        # The rows are deleted by the next test's setUp
         db.session.remove()
-        db.reflect()
-        db.drop_all()
 
     def create_application_form(self,
                             event_id = 1,
@@ -289,6 +386,20 @@ class ApiTestCase(unittest.TestCase):
         db.session.commit()
         return question_translation
     
+    def add_questions_in_sections(self, application_form_id, n, questions_per_section=10, language='en'):
+        """Add n translated questions to a form, in new sections of questions_per_section questions."""
+        questions = []
+        section_order = db.session.query(Section).filter_by(application_form_id=application_form_id).count()
+        for i in range(n):
+            if i % questions_per_section == 0:
+                section_order += 1
+                section = self.add_section(application_form_id, section_order)
+                self.add_section_translation(section.id, language, 'Section {}'.format(section_order))
+            question = self.add_question(application_form_id, section.id, i % questions_per_section + 1)
+            self.add_question_translation(question.id, language, 'Question {}'.format(question.id))
+            questions.append(question)
+        return questions
+
     def add_response(self, application_form_id, user_id, is_submitted=False, is_withdrawn=False, language='en'):
         response = Response(application_form_id, user_id, language)
         if is_submitted:
@@ -1,7 +1,27 @@
 # -*- coding: latin-1 -*-
-from app.utils.testing import ApiTestCase
+from app.utils.testing import ApiTestCase, count_queries
+from app.utils import emailer
 from app.utils.emailer import email_user
+from app.utils.sql_instrumentation import QueryStats, report_query_stats, statement_shape
+from app.users.models import AppUser
+from app.responses.models import ResponseReviewer
+from app.admin import AppUserView, ResponseReviewerView
+from app import app, db
+from flask import g
+from prometheus_client import REGISTRY
+from app.utils.logger import JsonFormatter, SamplingFilter, QueueHandler, QueueListener
+import json
+import logging
+import Queue
+import unittest
+import zlib
+import shutil
+import tempfile
+from app.utils import bootstrap, cache
+from app.users.models import Country, UserCategory
+from app.email_template.models import EmailTemplate
 from mock import patch
+from redis.exceptions import ConnectionError as RedisConnectionError
 from functools import partial
 
 class EmailerTest(ApiTestCase):
@@ -109,4 +129,346 @@ class EmailerTest(ApiTestCase):
             body_text=u'Modèle français Nom de lévénement en français bleu', 
             file_name='', 
             file_path='')
-    
\ No newline at end of file
+    
+
+    def test_on_sent_only_after_deferred_email_sent(self):
+        """Check that a queued email's on_sent callback runs only if the email was sent."""
+        sent = []
+        with patch('app.utils.emailer.send_mail'):
+            emailer._send_queued_mail({'recipient': 'a@b.com'}, lambda: sent.append('a@b.com'))
+        with patch('app.utils.emailer.send_mail', side_effect=Exception('SMTP unavailable')):
+            emailer._send_queued_mail({'recipient': 'c@d.com'}, lambda: sent.append('c@d.com'))
+        self.assertEqual(sent, ['a@b.com'])
+
+
+class SqlInstrumentationTest(ApiTestCase):
+    """Test the per-request SQL statistics."""
+
+    def test_statement_shape(self):
+        """Check statements that only differ in their IN list have the same shape."""
+        self.assertEqual(
+            statement_shape('SELECT id FROM app_user\n WHERE id IN (?, ?, ?)'),
+            statement_shape('SELECT id FROM app_user WHERE id IN (?)'))
+        self.assertNotEqual(
+            statement_shape('SELECT id FROM app_user WHERE id = ?'),
+            statement_shape('SELECT id FROM event WHERE id = ?'))
+
+    def test_repeated_and_slowest(self):
+        """Check repeated statements are counted and the slowest are kept."""
+        with app.test_request_context():
+            stats = QueryStats()
+            for i in range(5):
+                stats.record('SELECT * FROM event WHERE id = ?', 0.001 * i)
+            stats.record('SELECT * FROM app_user', 0.5)
+
+            self.assertEqual(stats.count, 6)
+            self.assertEqual(stats.repeated_shapes(5), [(5, 'SELECT * FROM event WHERE id = ?')])
+            self.assertEqual(len(stats.slowest_statements()), app.config['SQL_SLOWEST_STATEMENTS'])
+            self.assertEqual(stats.slowest_statements()[0], (0.5, 'SELECT * FROM app_user'))
+
+    def test_server_timing_header(self):
+        """Check requests report their queries in the Server-Timing header."""
+        self.add_user()
+        header = self.get_auth_header_for('user@user.com')
+        response = self.app.get('/api/v1/events?language=en', headers=header)
+        self.assertEqual(response.status_code, 200)
+        server_timing = response.headers.getlist('Server-Timing')
+        self.assertTrue(server_timing[0].startswith('db;dur='))
+        self.assertIn('queries', server_timing[0])
+
+    def test_query_budget_exceeded(self):
+        """Check an endpoint exceeding its query budget fails in testing."""
+        with app.test_request_context():
+            g.sql_query_budget = 1
+            db.session.query(AppUser).count()
+            db.session.query(AppUser).count()
+            with self.assertRaises(AssertionError):
+                report_query_stats(app.response_class())
+
+
+class MetricsTest(ApiTestCase):
+    """Test the request metrics and the /metrics endpoint."""
+
+    def setUp(self):
+        super(MetricsTest, self).setUp()
+        self.token = app.config['METRICS_TOKEN']
+        app.config['METRICS_TOKEN'] = 'metrics-token'
+
+    def tearDown(self):
+        app.config['METRICS_TOKEN'] = self.token
+        super(MetricsTest, self).tearDown()
+
+    def _requests_total(self, status):
+        return REGISTRY.get_sample_value(
+            'baobab_requests_total',
+            {'method': 'GET', 'route': '/api/v1/events', 'status': status}) or 0
+
+    def test_requests_counted(self):
+        """Check requests are counted per route and status."""
+        before = self._requests_total('401')
+        self.app.get('/api/v1/events?language=en')
+        self.assertEqual(self._requests_total('401'), before + 1)
+        self.assertEqual(REGISTRY.get_sample_value(
+            'baobab_requests_in_progress', {'method': 'GET', 'route': '/api/v1/events'}), 0)
+
+    def test_metrics_endpoint(self):
+        """Check the metrics are exposed with the token."""
+        self.app.get('/api/v1/events?language=en')
+        response = self.app.get('/metrics', headers={'Authorization': 'Bearer metrics-token'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('baobab_request_duration_seconds_bucket', response.data)
+        self.assertIn('baobab_external_call_duration_seconds_count{service="db"}', response.data)
+
+    def test_metrics_endpoint_unauthorized(self):
+        """Check the metrics need the token, and are disabled without one."""
+        response = self.app.get('/metrics', headers={'Authorization': 'Bearer wrong'})
+        self.assertEqual(response.status_code, 401)
+
+        app.config['METRICS_TOKEN'] = None
+        response = self.app.get('/metrics', headers={'Authorization': 'Bearer metrics-token'})
+        self.assertEqual(response.status_code, 403)
+
+
+class LoggingTest(unittest.TestCase):
+    """Test the log formatting, sampling and queueing."""
+
+    def _record(self, msg, *args, **extra):
+        record = logging.LogRecord('app', logging.INFO, 'tests.py', 1, msg, args, None)
+        record.__dict__.update(extra)
+        return record
+
+    def test_json_formatter(self):
+        """Check records are formatted as JSON with their extra fields."""
+        entry = json.loads(JsonFormatter().format(self._record('%d queries', 3, sql_queries=3)))
+        self.assertEqual(entry['message'], '3 queries')
+        self.assertEqual(entry['level'], 'INFO')
+        self.assertEqual(entry['sql_queries'], 3)
+
+    def test_sampling_filter(self):
+        """Check only messages with a sample rate are sampled."""
+        sampling = SamplingFilter()
+        self.assertTrue(sampling.filter(self._record('kept')))
+        self.assertTrue(sampling.filter(self._record('kept', sample_rate=1)))
+        self.assertFalse(sampling.filter(self._record('dropped', sample_rate=0)))
+
+    def test_queue_listener(self):
+        """Check queued records are written by the listener with their message formatted."""
+        class ListHandler(logging.Handler):
+            def __init__(self):
+                logging.Handler.__init__(self)
+                self.records = []
+
+            def emit(self, record):
+                self.records.append(record)
+
+        queue = Queue.Queue()
+        target = ListHandler()
+        listener = QueueListener(queue, [target])
+        listener.start()
+        args = ['first']
+        QueueHandler(queue).handle(self._record('value: %s', args))
+        args[0] = 'changed'
+        listener.stop()
+
+        self.assertEqual([r.getMessage() for r in target.records], ["value: ['first']"])
+
+
+class BootstrapTest(ApiTestCase):
+    """Test exporting and loading reference data."""
+
+    def setUp(self):
+        super(BootstrapTest, self).setUp()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        super(BootstrapTest, self).tearDown()
+
+    def test_reference_data_round_trip(self):
+        """Check exported reference data loads back, without event specific templates."""
+        db.session.add(Country(u'C\xf4te d\u2019Ivoire'))
+        self.add_email_template('verify-email', u'Bienvenue {name}', language='fr')
+        self.add_event()
+        self.add_email_template('verify-email', 'Event template', event_id=1)
+        db.session.commit()
+
+        countries = [c.name for c in db.session.query(Country).order_by(Country.id)]
+        bootstrap.export_reference_data(self.directory)
+        db.session.query(EmailTemplate).delete()
+        db.session.query(Country).delete()
+        db.session.query(UserCategory).delete()
+        db.session.commit()
+
+        bootstrap.load_reference_data(self.directory)
+        self.assertEqual([c.name for c in db.session.query(Country).order_by(Country.id)], countries)
+        self.assertIn(u'C\xf4te d\u2019Ivoire', countries)
+        templates = db.session.query(EmailTemplate).all()
+        self.assertEqual([(t.template, t.event_id, t.language) for t in templates], [(u'Bienvenue {name}', None, 'fr')])
+
+    def test_bootstrap_existing_database(self):
+        """Check bootstrap refuses to run against a database that has tables."""
+        with self.assertRaises(ValueError):
+            bootstrap.bootstrap()
+
+
+class ResponseEncodingTest(ApiTestCase):
+
+    def setUp(self):
+        super(ResponseEncodingTest, self).setUp()
+        self.add_user('user@mail.com')
+        self.header = self.get_auth_header_for('user@mail.com')
+
+    def test_etag_and_not_modified(self):
+        response = self.app.get('/api/v1/user', headers=self.header)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+
+        response = self.app.get('/api/v1/user', headers=dict(self.header, **{'If-None-Match': etag}))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+
+        # The weak ETag of a compressed response matches too
+        response = self.app.get('/api/v1/user', headers=dict(self.header, **{'If-None-Match': 'W/' + etag}))
+        self.assertEqual(response.status_code, 304)
+
+        response = self.app.get('/api/v1/user', headers=dict(self.header, **{'If-None-Match': '"other"'}))
+        self.assertEqual(response.status_code, 200)
+
+    def test_gzip_above_threshold(self):
+        uncompressed = self.app.get('/api/v1/content/disability')
+        self.assertGreater(len(uncompressed.data), 100)
+        headers = {'Accept-Encoding': 'gzip, deflate'}
+
+        with patch.dict(app.config, COMPRESSION_MIN_SIZE=100):
+            response = self.app.get('/api/v1/content/disability', headers=headers)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertEqual(zlib.decompress(response.data, 16 + zlib.MAX_WBITS), uncompressed.data)
+        self.assertEqual(response.headers['ETag'], 'W/' + uncompressed.headers['ETag'])
+
+        with patch.dict(app.config, COMPRESSION_MIN_SIZE=len(uncompressed.data) + 1):
+            response = self.app.get('/api/v1/content/disability', headers=headers)
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(response.data, uncompressed.data)
+
+    def test_json_is_compact(self):
+        response = self.app.get('/api/v1/content/title')
+        self.assertNotIn(b', ', response.data)
+        self.assertNotIn(b'\n', response.data)
+
+
+
+class FakeRedis(object):
+
+    def __init__(self):
+        self.values = {}
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def incr(self, key):
+        self.values[key] = self.values.get(key, 0) + 1
+
+
+class ModelCacheTest(ApiTestCase):
+
+    def setUp(self):
+        super(ModelCacheTest, self).setUp()
+        self.redis = FakeRedis()
+        for patcher in (patch.object(cache, 'redis', self.redis),
+                        patch.object(cache, '_caches', []),
+                        patch.object(cache, '_redis_retry_at', 0)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.countries = cache.ModelCache('countries')
+        self.countries.depends_on(Country, lambda country: 'all')
+
+    def load(self, countries):
+        return countries.load('names', 'all', lambda: ([c.name for c in db.session.query(Country).all()], None))
+
+    def test_commit_invalidates_other_workers(self):
+        # A worker's cache with the same name that isn't told about this worker's changes
+        other_worker = cache.ModelCache('countries')
+        self.assertEqual(self.load(other_worker), ['South Africa'])
+        self.assertEqual(self.load(self.countries), ['South Africa'])
+
+        db.session.add(Country('Kenya'))
+        db.session.commit()
+
+        self.assertEqual(self.load(self.countries), ['South Africa', 'Kenya'])
+        self.assertEqual(self.load(other_worker), ['South Africa', 'Kenya'])
+
+    def test_rollback_drops_entries_built_after_flush(self):
+        self.load(self.countries)
+        db.session.add(Country('Kenya'))
+        db.session.flush()
+        self.assertEqual(self.load(self.countries), ['South Africa', 'Kenya'])
+
+        db.session.rollback()
+        self.assertEqual(self.load(self.countries), ['South Africa'])
+        self.assertEqual(db.session.info.get('changed_cache_groups'), None)
+
+    def test_cached_without_redis(self):
+        with patch.object(self.redis, 'mget', side_effect=RedisConnectionError()):
+            self.assertEqual(self.load(self.countries), ['South Africa'])
+            with count_queries() as queries:
+                self.assertEqual(self.load(self.countries), ['South Africa'])
+            self.assertEqual(queries.count, 0)
+
+
+class AdminPortalTest(ApiTestCase):
+
+    def test_admin_portal_not_served_unless_enabled(self):
+        if app.config['ADMIN_ENABLED']:
+            raise unittest.SkipTest('ADMIN_ENABLED is set')
+        self.assertNotIn('admin', app.blueprints)
+        self.assertEqual(self.app.get('/admin/').status_code, 404)
+
+    def test_large_table_view_pages_by_key(self):
+        self.add_n_users(7)
+        ids = [user_id for user_id, in db.session.query(AppUser.id).order_by(AppUser.id.desc())]
+        view = AppUserView(AppUser, db.session)
+        view.page_size = 3
+
+        for page in range(4):
+            count, users = view.get_list(page, None, None, None, [])
+            self.assertEqual(count, 7)
+            self.assertEqual([u.id for u in users], ids[page * 3:page * 3 + 3])
+
+        count, users = view.get_list(1, 'id', False, None, [])
+        self.assertEqual([u.id for u in users], sorted(ids)[3:6])
+
+    def test_large_table_view_loads_listed_columns_and_relationships(self):
+        self.add_n_users(3)
+        event = self.add_event()
+        form = self.create_application_form(event.id)
+        candidate, reviewers = self.test_users[0], self.test_users[1:]
+        reviewer_emails = sorted(u.email for u in reviewers)
+        response = self.add_response(form.id, candidate.id)
+        for reviewer in reviewers:
+            db.session.add(ResponseReviewer(response.id, reviewer.id))
+        db.session.commit()
+        db.session.remove()
+
+        _, users = AppUserView(AppUser, db.session).get_list(0, None, None, None, [])
+        self.assertIn('email', vars(users[0]))
+        self.assertNotIn('password', vars(users[0]))
+
+        with count_queries() as queries:
+            count, reviewers = ResponseReviewerView(ResponseReviewer, db.session).get_list(0, None, None, None, [])
+            self.assertEqual(sorted(r.user.email for r in reviewers), reviewer_emails)
+        # The page and the estimated count
+        self.assertEqual(queries.count, 2)
+
+    def test_large_table_view_filters_without_counting(self):
+        self.add_n_users(3)
+        view = AppUserView(AppUser, db.session)
+        email = self.test_users[1].email
+        filter_index = next(i for i, f in enumerate(view._filters)
+                            if f.column.name == 'email' and f.operation() == 'equals')
+
+        count, users = view.get_list(0, None, None, None, [(filter_index, 'email', email)])
+        self.assertIsNone(count)
+        self.assertEqual([u.email for u in users], [email])
@@ -0,0 +1,271 @@
+"""Benchmark the critical API paths against a seeded event and write a report to compare changes against.
+
+Run from the api directory against the database in DATABASE_URL, e.g. the docker-compose PostgreSQL:
+    python -m benchmarks.run --output before.json
+    python -m benchmarks.run --output after.json --compare before.json
+
+The first run seeds the database with the event in benchmarks/seed.py, later runs reuse it. Requests go
+through the Flask test client by default, or to a running server with --url (which must use the same database).
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from sqlalchemy import inspect
+
+from app import app, db
+from benchmarks import seed
+
+_QUERY_COUNT = re.compile(r'desc="(\d+) queries"')
+METRICS = ('throughput', 'p50', 'p95', 'p99', 'queries')
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(int(len(sorted_values) * fraction), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+class TestClient():
+    """Sends requests to the app in this process."""
+
+    def __init__(self):
+        self._client = app.test_client()
+
+    def request(self, method, path, **kwargs):
+        response = self._client.open(path, method=method, **kwargs)
+        return response.status_code, ', '.join(response.headers.get_all('Server-Timing')), response.get_json()
+
+
+class HttpClient():
+    """Sends requests to a running server."""
+
+    def __init__(self, url):
+        import requests
+        self._url = url.rstrip('/')
+        self._session = requests.Session()
+
+    def request(self, method, path, query_string=None, **kwargs):
+        response = self._session.request(method, self._url + path, params=query_string, **kwargs)
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        return response.status_code, response.headers.get('Server-Timing', ''), body
+
+
+class Scenario():
+    """An endpoint to benchmark. request(client, index) sends one request for the index'th request thread."""
+
+    def __init__(self, name, request):
+        self.name = name
+        self.request = request
+
+
+def _headers(token=None):
+    headers = {'Origin': seed.ORIGIN}
+    if token:
+        headers['Authorization'] = token
+    return headers
+
+
+def _authenticate(client, email):
+    status, _, body = client.request('POST', '/api/v1/authenticate', headers=_headers(),
+                                     data={'email': email, 'password': seed.PASSWORD})
+    if status != 200:
+        raise RuntimeError('Could not authenticate {}: {} {}'.format(email, status, body))
+    return body['token']
+
+
+def scenarios(client, data, candidates):
+    """The benchmarked endpoints, with candidates logged in from the seeded applicants."""
+    candidates = [(email, response_id, _authenticate(client, email))
+                  for email, response_id in data.candidates[:candidates]]
+    reviewers = [_authenticate(client, email) for email in data.reviewer_emails]
+    admin = _authenticate(client, data.admin_email)
+
+    def candidate(index):
+        return candidates[index % len(candidates)]
+
+    def authenticate(client, index):
+        email = candidate(index)[0]
+        return client.request('POST', '/api/v1/authenticate', headers=_headers(),
+                              data={'email': email, 'password': seed.PASSWORD})
+
+    def application_form(client, index):
+        return client.request('GET', '/api/v1/application-form', headers=_headers(candidate(index)[2]),
+                              query_string={'event_id': data.event_id, 'language': 'en'})
+
+    def save_response(client, index):
+        # Saving a draft, submitting also sends a confirmation email
+        _, response_id, token = candidate(index)
+        return client.request('PUT', '/api/v1/response', headers=_headers(token), json={
+            'id': response_id,
+            'is_submitted': False,
+            'application_form_id': data.application_form_id,
+            'language': 'en',
+            'answers': [{'question_id': question_id, 'value': 'Saved at {}'.format(time.time())}
+                        for question_id in data.question_ids]
+        })
+
+    def review(client, index):
+        return client.request('GET', '/api/v1/review', headers=_headers(reviewers[index % len(reviewers)]),
+                              query_string={'event_id': data.event_id})
+
+    def event_stats(client, index):
+        return client.request('GET', '/api/v1/eventstats', headers=_headers(admin),
+                              query_string={'event_id': data.event_id})
+
+    def events(client, index):
+        return client.request('GET', '/api/v1/events', headers=_headers(candidate(index)[2]),
+                              query_string={'language': 'en'})
+
+    return [
+        Scenario('authenticate', authenticate),
+        Scenario('application-form', application_form),
+        Scenario('response-put', save_response),
+        Scenario('review', review),
+        Scenario('eventstats', event_stats),
+        Scenario('events', events)
+    ]
+
+
+def run_scenario(scenario, make_client, concurrency, duration):
+    """Send requests from concurrency threads for duration seconds, returning the scenario's results."""
+    latencies = []
+    query_counts = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.time() + duration
+
+    def worker(index):
+        client = make_client()
+        while time.time() < deadline:
+            start = time.time()
+            try:
+                status, server_timing, _ = scenario.request(client, index)
+                ok = status < 400
+            except Exception:
+                status, server_timing, ok = None, '', False
+            elapsed = time.time() - start
+            queries = _QUERY_COUNT.search(server_timing or '')
+            with lock:
+                latencies.append(elapsed)
+                if queries:
+                    query_counts.append(int(queries.group(1)))
+                if not ok:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(concurrency)]
+    started = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'throughput': round(len(latencies) / elapsed, 1),
+        'p50': round(_percentile(latencies, 0.5) * 1000, 1),
+        'p95': round(_percentile(latencies, 0.95) * 1000, 1),
+        'p99': round(_percentile(latencies, 0.99) * 1000, 1),
+        'queries': round(float(sum(query_counts)) / len(query_counts), 1) if query_counts else None
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD']).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _delta(current, baseline):
+    if current is None or not baseline:
+        return ''
+    return '{:+.0f}%'.format((current - baseline) * 100.0 / baseline)
+
+
+def print_report(report, baseline=None):
+    print('{:<18}{:>9}{:>7}{:>11}{:>9}{:>9}{:>9}{:>9}'.format(
+        'scenario', 'requests', 'errors', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms', 'queries'))
+    for name, result in report['scenarios'].items():
+        print('{:<18}{:>9}{:>7}{:>11}{:>9}{:>9}{:>9}{:>9}'.format(
+            name, result['requests'], result['errors'],
+            *[result[metric] if result[metric] is not None else '-' for metric in METRICS]))
+        previous = (baseline or {}).get('scenarios', {}).get(name)
+        if previous:
+            print('{:<34}{:>11}{:>9}{:>9}{:>9}{:>9}'.format(
+                '  vs {}'.format(baseline['meta'].get('commit')),
+                *[_delta(result[metric], previous.get(metric)) for metric in METRICS]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='benchmark a running server instead of the app in this process')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=int, default=20, help='seconds per scenario')
+    parser.add_argument('--scenario', action='append', help='only run the named scenario, can be repeated')
+    parser.add_argument('--candidates', type=int, default=100, help='number of applicants to log in as')
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--questions', type=int, default=60)
+    parser.add_argument('--reviewers', type=int, default=20)
+    parser.add_argument('--offers', type=int, default=1000)
+    parser.add_argument('--output', help='write the report to this JSON file')
+    parser.add_argument('--compare', help='a previous report to show the change against')
+    args = parser.parse_args()
+
+    with app.app_context():
+        if not inspect(db.engine).get_table_names():
+            db.create_all()
+        data = seed.find()
+        if data is None:
+            print('Seeding {} users and a {} question application form'.format(args.users, args.questions))
+            data = seed.seed(args.users, args.questions, args.reviewers, args.offers)
+        dialect = db.engine.dialect.name
+
+    def make_client():
+        return HttpClient(args.url) if args.url else TestClient()
+
+    report = {
+        'meta': {
+            'commit': _git_commit(),
+            'date': datetime.now().isoformat(),
+            'target': args.url or 'in-process',
+            'database': dialect,
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'applicants': len(data.candidates),
+            'questions': len(data.question_ids)
+        },
+        'scenarios': OrderedDict()
+    }
+    for scenario in scenarios(make_client(), data, args.candidates):
+        if args.scenario and scenario.name not in args.scenario:
+            continue
+        print('Running {} for {}s'.format(scenario.name, args.duration))
+        report['scenarios'][scenario.name] = run_scenario(scenario, make_client, args.concurrency, args.duration)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""Seed a database with an event the size of a real call for applications."""
+
+import random
+from datetime import datetime, timedelta
+
+from app import db
+from app.applicationModel.models import ApplicationForm, Question, QuestionTranslation, Section, SectionTranslation
+from app.events.models import Event, EventRole, EventType
+from app.organisation.models import Organisation
+from app.registration.models import Offer
+from app.responses.models import Answer, Response, ResponseReviewer
+from app.reviews.models import ReviewForm, ReviewQuestion
+from app.users.models import AppUser, Country, UserCategory
+from app.users.passwords import hash_password
+
+DOMAIN = 'benchmark'
+# A request Origin that the organisation resolver maps to DOMAIN
+ORIGIN = 'https://www.benchmark.org'
+EVENT_KEY = 'BENCHMARK'
+PASSWORD = 'benchmark'
+QUESTIONS_PER_SECTION = 10
+REVIEWERS_PER_RESPONSE = 3
+BATCH_SIZE = 5000
+
+
+class BenchmarkData():
+    """The ids and logins of a seeded event."""
+
+    def __init__(self, event_id, application_form_id, question_ids, admin_email, reviewer_emails,
+                 candidates):
+        self.event_id = event_id
+        self.application_form_id = application_form_id
+        self.question_ids = question_ids
+        self.admin_email = admin_email
+        self.reviewer_emails = reviewer_emails
+        # [(email, response_id)] of the candidates that have applied
+        self.candidates = candidates
+
+
+def _insert(table, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.session.execute(table.insert(), rows[start:start + BATCH_SIZE])
+
+
+def _user_rows(emails, organisation_id, password_hash, now):
+    return [{
+        'email': email,
+        'firstname': 'Bench',
+        'lastname': 'Mark {}'.format(i),
+        'user_title': 'Mx',
+        'password': password_hash,
+        'active': True,
+        'is_admin': False,
+        'is_deleted': False,
+        'verified_email': True,
+        'policy_agreed_datetime': now,
+        'organisation_id': organisation_id
+    } for i, email in enumerate(emails)]
+
+
+def find():
+    """The BenchmarkData of an already seeded database, or None."""
+    organisation = db.session.query(Organisation).filter_by(domain=DOMAIN).first()
+    if organisation is None:
+        return None
+    event = db.session.query(Event).filter_by(key=EVENT_KEY).one()
+    form = db.session.query(ApplicationForm).filter_by(event_id=event.id).one()
+    question_ids = [q.id for q in db.session.query(Question.id).filter_by(application_form_id=form.id)
+                    .order_by(Question.id)]
+    admin = (db.session.query(AppUser.email).join(EventRole, EventRole.user_id == AppUser.id)
+             .filter(EventRole.event_id == event.id, EventRole.role == 'admin').first())
+    reviewers = [u.email for u in db.session.query(AppUser.email).join(EventRole, EventRole.user_id == AppUser.id)
+                 .filter(EventRole.event_id == event.id, EventRole.role == 'reviewer').order_by(AppUser.id)]
+    candidates = [(email, response_id) for email, response_id in
+                  db.session.query(AppUser.email, Response.id).join(Response, Response.user_id == AppUser.id)
+                  .filter(Response.application_form_id == form.id).order_by(Response.id)]
+    return BenchmarkData(event.id, form.id, question_ids, admin.email, reviewers, candidates)
+
+
+def seed(users=10000, questions=60, reviewers=20, offers=1000, application_rate=0.8):
+    """Add an organisation with an event whose application form has the given number of questions,
+    the given number of users of whom application_rate have applied and answered every question, reviewers
+    assigned to every response and offers to some of the applicants. Returns its BenchmarkData."""
+    random.seed(0)
+    now = datetime.now()
+
+    db.session.add(Country('South Africa'))
+    db.session.add(UserCategory('Postdoc'))
+    organisation = Organisation('Benchmark', 'Baobab', 'org.png', 'org_big.png', 'org_icon.png', DOMAIN,
+                                'www.benchmark.org', 'benchmark@benchmark.org', 'benchmark.org',
+                                'PrivacyPolicy.pdf', [{'code': 'en', 'description': 'English'}])
+    db.session.add(organisation)
+    db.session.flush()
+
+    event = Event({'en': 'Benchmark Event'}, {'en': 'An event to benchmark the API with'},
+                  now + timedelta(days=60), now + timedelta(days=65), EVENT_KEY, organisation.id,
+                  'benchmark@benchmark.org', 'www.benchmark.org',
+                  now - timedelta(days=1), now + timedelta(days=30),
+                  now - timedelta(days=1), now + timedelta(days=30),
+                  now - timedelta(days=1), now + timedelta(days=30),
+                  now - timedelta(days=1), now + timedelta(days=30),
+                  now - timedelta(days=1), now + timedelta(days=30),
+                  EventType.EVENT, False)
+    db.session.add(event)
+    db.session.flush()
+
+    form = ApplicationForm(event.id, True, False)
+    db.session.add(form)
+    db.session.flush()
+
+    question_ids = []
+    for section_order in range((questions + QUESTIONS_PER_SECTION - 1) // QUESTIONS_PER_SECTION):
+        section = Section(form.id, section_order + 1)
+        db.session.add(section)
+        db.session.flush()
+        db.session.add(SectionTranslation(section.id, 'en', 'Section {}'.format(section_order + 1),
+                                          'About section {}'.format(section_order + 1)))
+        for order in range(min(QUESTIONS_PER_SECTION, questions - len(question_ids))):
+            question = Question(form.id, section.id, order + 1, 'short-text' if order % 2 else 'long-text')
+            db.session.add(question)
+            db.session.flush()
+            db.session.add(QuestionTranslation(question.id, 'en', 'Question {}'.format(question.id),
+                                               description='Please answer question {}'.format(question.id)))
+            question_ids.append(question.id)
+
+    review_form = ReviewForm(form.id, now + timedelta(days=30))
+    db.session.add(review_form)
+    db.session.flush()
+    for order, question_id in enumerate(question_ids[:10]):
+        db.session.add(ReviewQuestion(review_form.id, question_id, None, 'Score', 'multi-choice', None,
+                                      [{'value': str(v), 'label': str(v)} for v in range(5)],
+                                      True, order + 1, None, None, 1.0))
+
+    # Hash the password once, hashing it per user would take most of the seeding time
+    password_hash = hash_password(PASSWORD)
+    admin_email = 'admin@benchmark.org'
+    reviewer_emails = ['reviewer{}@benchmark.org'.format(i) for i in range(reviewers)]
+    candidate_emails = ['candidate{}@benchmark.org'.format(i) for i in range(users)]
+    _insert(AppUser.__table__, _user_rows([admin_email] + reviewer_emails + candidate_emails,
+                                          organisation.id, password_hash, now))
+    user_ids = dict(db.session.query(AppUser.email, AppUser.id).filter_by(organisation_id=organisation.id))
+
+    roles = [{'role': 'admin', 'user_id': user_ids[admin_email], 'event_id': event.id}]
+    roles += [{'role': 'reviewer', 'user_id': user_ids[email], 'event_id': event.id} for email in reviewer_emails]
+    _insert(EventRole.__table__, roles)
+
+    applicants = candidate_emails[:int(users * application_rate)]
+    _insert(Response.__table__, [{
+        'application_form_id': form.id,
+        'user_id': user_ids[email],
+        'is_submitted': True,
+        'submitted_timestamp': now,
+        'is_withdrawn': False,
+        'started_timestamp': now,
+        'language': 'en'
+    } for email in applicants])
+    response_ids = dict(db.session.query(Response.user_id, Response.id).filter_by(application_form_id=form.id))
+
+    answers = []
+    for email in applicants:
+        response_id = response_ids[user_ids[email]]
+        answers.extend({'response_id': response_id, 'question_id': question_id,
+                        'value': 'Answer to question {} by {}'.format(question_id, email)}
+                       for question_id in question_ids)
+        if len(answers) >= BATCH_SIZE:
+            _insert(Answer.__table__, answers)
+            answers = []
+    _insert(Answer.__table__, answers)
+
+    reviewer_ids = [user_ids[email] for email in reviewer_emails]
+    if reviewer_ids:
+        _insert(ResponseReviewer.__table__, [
+            {'response_id': response_ids[user_ids[email]], 'reviewer_user_id': reviewer_id, 'active': True}
+            for email in applicants
+            for reviewer_id in random.sample(reviewer_ids, min(REVIEWERS_PER_RESPONSE, len(reviewer_ids)))])
+
+    _insert(Offer.__table__, [{
+        'user_id': user_ids[email],
+        'event_id': event.id,
+        'offer_date': now,
+        'expiry_date': now + timedelta(days=10),
+        'payment_required': False,
+        'travel_award': i % 2 == 0,
+        'accommodation_award': i % 3 == 0
+    } for i, email in enumerate(applicants[:offers])])
+
+    db.session.commit()
+    return BenchmarkData(event.id, form.id, question_ids, admin_email, reviewer_emails,
+                         [(email, response_ids[user_ids[email]]) for email in applicants])
@@ -0,0 +1,87 @@
+"""Measure how long a fresh process takes to import the app, which every gunicorn worker and test run pays.
+
+Run from the api directory with the environment of the server, e.g.
+    python -m benchmarks.startup --runs 5 --output before.json
+    python -m benchmarks.startup --runs 5 --output after.json --compare before.json
+
+Each run imports the app in a new interpreter. The modules whose first import took longest, including the
+modules they imported, are listed from the median run.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+# Run in a new interpreter: times every first import of a module and prints the results as JSON
+_IMPORT_PROFILER = """
+import __builtin__
+import json
+import sys
+import time
+
+durations = {}
+original_import = __builtin__.__import__
+
+def timed_import(name, *args, **kwargs):
+    if name in sys.modules:
+        return original_import(name, *args, **kwargs)
+    start = time.time()
+    try:
+        return original_import(name, *args, **kwargs)
+    finally:
+        durations.setdefault(name, time.time() - start)
+
+__builtin__.__import__ = timed_import
+start = time.time()
+import app
+total = time.time() - start
+__builtin__.__import__ = original_import
+print(json.dumps({'total': total, 'modules': len(sys.modules), 'imports': durations}))
+"""
+
+
+def measure():
+    """Import the app in a new interpreter, returning its total import time and per module import times."""
+    output = subprocess.check_output([sys.executable, '-c', _IMPORT_PROFILER])
+    # The app may print before the profiler's output
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help='number of slowest imports to list')
+    parser.add_argument('--output', help='write the report to this JSON file')
+    parser.add_argument('--compare', help='a previous report to show the change against')
+    args = parser.parse_args()
+
+    runs = sorted((measure() for _ in range(args.runs)), key=lambda run: run['total'])
+    median = runs[len(runs) // 2]
+    slowest = sorted(median['imports'].items(), key=lambda item: item[1], reverse=True)[:args.top]
+    report = {
+        'median_ms': round(median['total'] * 1000, 1),
+        'min_ms': round(runs[0]['total'] * 1000, 1),
+        'modules': median['modules'],
+        'slowest_imports': [[name, round(duration * 1000, 1)] for name, duration in slowest]
+    }
+
+    print('App import: median {}ms, min {}ms over {} runs, {} modules loaded'.format(
+        report['median_ms'], report['min_ms'], args.runs, report['modules']))
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        print('Previously: median {}ms, {} modules loaded ({:+.0f}%)'.format(
+            baseline['median_ms'], baseline['modules'],
+            (report['median_ms'] - baseline['median_ms']) * 100.0 / baseline['median_ms']))
+    print('Slowest imports:')
+    for name, duration in report['slowest_imports']:
+        print('  {:>8.1f}ms  {}'.format(duration, name))
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -38,3 +38,59 @@ GCP_BUCKET_NAME = os.getenv('GCP_BUCKET_NAME', None)
 FILE_SIZE_LIMIT = int(os.getenv('FILE_SIZE_LIMIT', None))
 
 BOABAB_HOST = os.getenv('BOABAB_HOST', None)
+
+# Compress responses of at least COMPRESSION_MIN_SIZE bytes with gzip, or brotli if it's installed
+COMPRESS_RESPONSES = os.getenv('COMPRESS_RESPONSES', 'true').lower() == 'true'
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+
+# How long browsers may use the reference lists at /api/v1/content before checking their ETag again
+CONTENT_CACHE_MAX_AGE = int(os.getenv('CONTENT_CACHE_MAX_AGE', 300))
+
+# Serve the Flask-Admin portal at /admin. Off by default so API workers don't import and build it.
+ADMIN_ENABLED = os.getenv('ADMIN_ENABLED', 'false').lower() == 'true'
+# Admin list queries on PostgreSQL are cancelled after this long, 0 for no limit
+ADMIN_STATEMENT_TIMEOUT_MS = int(os.getenv('ADMIN_STATEMENT_TIMEOUT_MS', 5000))
+
+# Per-request SQL statistics, reported in the Server-Timing header and the logs
+SQL_INSTRUMENTATION = os.getenv('SQL_INSTRUMENTATION', 'true').lower() == 'true'
+# A statement shape executed this many times in one request is logged as a possible N+1
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv('SQL_N_PLUS_ONE_THRESHOLD', 10))
+SQL_SLOWEST_STATEMENTS = 3
+
+# Bearer token the Prometheus scraper sends to /metrics, which is disabled when unset
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', None)
+
+# Concurrency of the API server, read by gunicorn.config.py. WORKER_CLASS is sync, gthread (WORKER_THREADS
+# threads per worker) or gevent (up to WORKER_CONNECTIONS greenlets per worker). sync stays the default until a
+# worker class is measured to do better, see Load Testing in README.md.
+WORKER_CLASS = os.getenv('WORKER_CLASS', 'sync')
+WORKERS = int(os.getenv('WORKERS', 4))
+WORKER_THREADS = int(os.getenv('WORKER_THREADS', 8))
+WORKER_CONNECTIONS = int(os.getenv('WORKER_CONNECTIONS', 100))
+
+# Database connections kept open per worker. By default one per request a worker handles at once,
+# capped at 10 since gevent workers mostly wait on SMTP, storage and conversions rather than the database.
+# WORKERS * (DB_POOL_SIZE + DB_MAX_OVERFLOW) must stay below the database's max_connections.
+_WORKER_CONCURRENCY = {'gthread': WORKER_THREADS, 'gevent': WORKER_CONNECTIONS}.get(WORKER_CLASS, 1)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', min(_WORKER_CONCURRENCY, 10)))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 5))
+DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 10))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+# Test connections before use, so connections dropped by the database or a proxy are replaced
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+
+# Logging: LOG_FORMAT is text or json (one object per line, with the fields passed in extra).
+# With LOG_ASYNC records are written by a background thread so requests don't wait on stdout.
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'DEBUG' if DEBUG else 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+LOG_ASYNC = os.getenv('LOG_ASYNC', 'false' if DEBUG else 'true').lower() == 'true'
+# Fraction of high-volume per-request messages that are logged
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 0.1))
+
+# bcrypt cost factor for new password hashes. Passwords hashed with a different cost are rehashed on login.
+BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+# Processes per worker that hash passwords (0 hashes in the request thread), how many hashes may
+# be waiting for them, and how long a request waits for its hash in seconds
+PASSWORD_HASH_PROCESSES = int(os.getenv('PASSWORD_HASH_PROCESSES', 0 if DEBUG else 2))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 32))
+PASSWORD_HASH_TIMEOUT = int(os.getenv('PASSWORD_HASH_TIMEOUT', 30))
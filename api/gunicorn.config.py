@@ -1,5 +1,36 @@
-"""Gunicorn configuration."""
+"""Gunicorn configuration.
+
+The worker class and counts are set in config.py. With the gevent worker don't enable preload_app:
+the app has to be imported after gevent has patched the standard library, so that Redis, SMTP and
+storage sockets and the mail queue cooperate with the other greenlets."""
+
+# Only the setting names are imported, gunicorn would read a module named config as its config setting
+from config import WORKER_CLASS, WORKERS, WORKER_THREADS, WORKER_CONNECTIONS
 
 forwarded_allow_ips = '*'
 secure_scheme_headers = {'X-Forwarded-Proto': 'https'}
-workers = 4
+worker_class = WORKER_CLASS
+workers = WORKERS
+threads = WORKER_THREADS if worker_class == 'gthread' else 1
+worker_connections = WORKER_CONNECTIONS
+
+
+def post_fork(server, worker):
+    if worker_class == 'gevent':
+        # psycopg2 is a C extension gevent can't patch, make it wait on the database cooperatively
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+    else:
+        # Fork the password hashing processes before the worker starts its request threads
+        from app.users.passwords import password_hasher
+        password_hasher.start()
+
+
+def worker_exit(server, worker):
+    # With PROMETHEUS_MULTIPROC_DIR set the metrics of each worker are kept in files there,
+    # drop the live gauges of a worker that is exiting. Called in the worker itself (gunicorn 19.5
+    # has no child_exit hook), so a worker killed with SIGKILL keeps its gauges until the next deploy.
+    import os
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""Measure the throughput and latency of an API endpoint under concurrent load.
+
+Used to compare worker classes (see "Load Testing" in README.md), e.g.
+    python loadtest.py http://localhost:5000/api/v1/events?language=en --concurrency 32 --duration 30 \
+        --header "Authorization: <token>"
+
+or login throughput, which is bound by password hashing (see PASSWORD_HASH_PROCESSES in config.py):
+    python loadtest.py http://localhost:5000/api/v1/authenticate --concurrency 32 \
+        --data email=user@example.com --data password=<password>
+"""
+
+import argparse
+import threading
+import time
+
+import requests
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(int(len(sorted_values) * fraction), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def run(url, concurrency, duration, headers, data=None):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.time() + duration
+
+    def client():
+        session = requests.Session()
+        while time.time() < deadline:
+            start = time.time()
+            try:
+                if data:
+                    ok = session.post(url, headers=headers, data=data).status_code < 500
+                else:
+                    ok = session.get(url, headers=headers).status_code < 500
+            except requests.RequestException:
+                ok = False
+            elapsed = time.time() - start
+            with lock:
+                latencies.append(elapsed)
+                if not ok:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - started
+
+    latencies.sort()
+    print('{} requests in {:.1f}s with {} clients, {} errors'.format(len(latencies), elapsed, concurrency, errors[0]))
+    print('Throughput: {:.1f} requests/s'.format(len(latencies) / elapsed))
+    print('Latency p50: {:.0f}ms  p95: {:.0f}ms  p99: {:.0f}ms'.format(
+        _percentile(latencies, 0.5) * 1000, _percentile(latencies, 0.95) * 1000, _percentile(latencies, 0.99) * 1000))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('url')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=int, default=30, help='seconds')
+    parser.add_argument('--header', action='append', default=[], help='"Name: value", can be repeated')
+    parser.add_argument('--data', action='append', default=[], help='name=value form field to POST, can be repeated')
+    args = parser.parse_args()
+
+    run(args.url, args.concurrency, args.duration,
+        dict(header.split(': ', 1) for header in args.header),
+        dict(field.split('=', 1) for field in args.data))
@@ -0,0 +1,21 @@
+"""Index responses by application form and user
+
+Revision ID: 3b8f6e2d41c7
+Revises: 9c4e1d7b2a60
+Create Date: 2026-10-19 15:02:48.927415
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '3b8f6e2d41c7'
+down_revision = '9c4e1d7b2a60'
+
+from alembic import op
+
+
+def upgrade():
+    op.create_index('ix_response_application_form_user', 'response', ['application_form_id', 'user_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_response_application_form_user', table_name='response')
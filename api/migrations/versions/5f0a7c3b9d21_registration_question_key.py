@@ -0,0 +1,32 @@
+"""Add key to registration questions and index registration answer lookups
+
+Revision ID: 5f0a7c3b9d21
+Revises: a2e511c2bb53
+Create Date: 2026-10-19 10:04:12.118520
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '5f0a7c3b9d21'
+down_revision = 'a2e511c2bb53'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.add_column('registration_question', sa.Column('key', sa.String(length=255), nullable=True))
+    op.create_index('ix_registration_question_form_key', 'registration_question', ['registration_form_id', 'key'], unique=False)
+    op.create_index('ix_registration_answer_registration_question', 'registration_answer', ['registration_id', 'registration_question_id'], unique=False)
+    op.create_index('ix_offer_user_event', 'offer', ['user_id', 'event_id'], unique=False)
+
+    # Give existing questions the keys that used to be matched on their headline
+    op.execute("""UPDATE registration_question SET key = 'tshirt_size' WHERE lower(headline) = 't-shirt size'""")
+    op.execute("""UPDATE registration_question SET key = 'bringing_poster' WHERE lower(headline) = 'will you be bringing a poster?'""")
+
+
+def downgrade():
+    op.drop_index('ix_offer_user_event', table_name='offer')
+    op.drop_index('ix_registration_answer_registration_question', table_name='registration_answer')
+    op.drop_index('ix_registration_question_form_key', table_name='registration_question')
+    op.drop_column('registration_question', 'key')
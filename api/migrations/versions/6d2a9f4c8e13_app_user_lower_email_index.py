@@ -0,0 +1,34 @@
+"""Make user emails unique per organisation ignoring case
+
+Revision ID: 6d2a9f4c8e13
+Revises: 3b8f6e2d41c7
+Create Date: 2026-10-19 16:05:12.518204
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '6d2a9f4c8e13'
+down_revision = '3b8f6e2d41c7'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    # Accounts whose emails only differ in case have to be merged by hand first, see the README
+    conflicts = op.get_bind().execute(sa.text("""
+        SELECT array_agg(id ORDER BY id) FROM app_user
+        GROUP BY organisation_id, lower(email)
+        HAVING count(*) > 1
+    """)).fetchall()
+    if conflicts:
+        raise Exception('Accounts whose emails only differ in case must be merged before upgrading. '
+                        'Conflicting user ids: {}'.format('; '.join(
+                            ', '.join(str(user_id) for user_id in user_ids) for user_ids, in conflicts)))
+
+    op.create_index('uq_app_user_organisation_email', 'app_user', ['organisation_id', sa.text('lower(email)')],
+                    unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_app_user_organisation_email', table_name='app_user')
@@ -0,0 +1,30 @@
+"""Allow only one latest outcome per user and event
+
+Revision ID: 9c4e1d7b2a60
+Revises: 5f0a7c3b9d21
+Create Date: 2026-10-19 14:21:37.402118
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '9c4e1d7b2a60'
+down_revision = '5f0a7c3b9d21'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    # Keep only the most recent of any duplicate latest outcomes
+    op.execute("""
+        UPDATE outcome SET latest = false
+        WHERE latest AND id NOT IN (
+            SELECT max(id) FROM outcome WHERE latest GROUP BY event_id, user_id
+        )
+    """)
+    op.create_index('uq_outcome_event_user_latest', 'outcome', ['event_id', 'user_id'], unique=True,
+                    postgresql_where=sa.text('latest'))
+
+
+def downgrade():
+    op.drop_index('uq_outcome_event_user_latest', table_name='outcome')
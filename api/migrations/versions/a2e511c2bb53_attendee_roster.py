@@ -0,0 +1,51 @@
+"""Add pre-computed attendee roster
+
+Revision ID: a2e511c2bb53
+Revises: cb503c2afd08
+Create Date: 2026-10-19 09:12:31.402114
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = 'a2e511c2bb53'
+down_revision = 'cb503c2afd08'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.create_table('roster_version',
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['event.id'], ),
+    sa.PrimaryKeyConstraint('event_id')
+    )
+    op.create_table('roster_entry',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('registration_id', sa.Integer(), nullable=True),
+    sa.Column('firstname', sa.String(length=100), nullable=False),
+    sa.Column('lastname', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('is_invited_guest', sa.Boolean(), nullable=False),
+    sa.Column('invited_guest_role', sa.String(length=50), nullable=True),
+    sa.Column('confirmed', sa.Boolean(), nullable=False),
+    sa.Column('signed_in', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('removed', sa.Boolean(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['event.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['app_user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('event_id', 'user_id', name='uq_roster_entry_event_user')
+    )
+    op.create_index('ix_roster_entry_event_version', 'roster_entry', ['event_id', 'version'], unique=False)
+    # Rosters are built on first access, so there is nothing to backfill
+
+
+def downgrade():
+    op.drop_index('ix_roster_entry_event_version', table_name='roster_entry')
+    op.drop_table('roster_entry')
+    op.drop_table('roster_version')
@@ -0,0 +1,27 @@
+"""Index answers by response, response reviewers by response and reviewer, and responses by user
+
+Revision ID: a7c3e5f91d24
+Revises: 6d2a9f4c8e13
+Create Date: 2026-10-19 17:21:40.362518
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e5f91d24'
+down_revision = '6d2a9f4c8e13'
+
+from alembic import op
+
+
+def upgrade():
+    op.create_index('ix_answer_response_question', 'answer', ['response_id', 'question_id'], unique=False)
+    op.create_index('ix_response_reviewer_response', 'response_reviewer', ['response_id'], unique=False)
+    op.create_index('ix_response_reviewer_reviewer_user', 'response_reviewer', ['reviewer_user_id'], unique=False)
+    op.create_index('ix_response_user', 'response', ['user_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_response_user', table_name='response')
+    op.drop_index('ix_response_reviewer_reviewer_user', table_name='response_reviewer')
+    op.drop_index('ix_response_reviewer_response', table_name='response_reviewer')
+    op.drop_index('ix_answer_response_question', table_name='answer')
@@ -0,0 +1,27 @@
+"""Make attendance unique per event and user
+
+Revision ID: c5d81e4a7f30
+Revises: a7c3e5f91d24
+Create Date: 2026-10-19 19:12:33.804127
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = 'c5d81e4a7f30'
+down_revision = 'a7c3e5f91d24'
+
+from alembic import op
+
+
+def upgrade():
+    # Users checked in twice by concurrent desks keep their first check-in
+    op.execute("""
+        DELETE FROM attendance a
+        USING attendance b
+        WHERE a.event_id = b.event_id AND a.user_id = b.user_id AND a.id > b.id
+    """)
+    op.create_unique_constraint('uq_attendance_event_user', 'attendance', ['event_id', 'user_id'])
+
+
+def downgrade():
+    op.drop_constraint('uq_attendance_event_user', 'attendance', type_='unique')
@@ -1,4 +1,8 @@
 import { getContent } from "../../services/content";
-export const getTitleOptions = getContent("title");
-export const getGenderOptions = getContent("gender");
-export const getCountries = getContent("countries");
+// The lists are fetched together in one request
+const contentBundle = getContent("bundle");
+const fromBundle = (type) =>
+  contentBundle.then((bundle) => (bundle.error ? bundle : bundle[type]));
+export const getTitleOptions = fromBundle("title");
+export const getGenderOptions = fromBundle("gender");
+export const getCountries = fromBundle("countries");